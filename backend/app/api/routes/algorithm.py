@@ -1,30 +1,144 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.schemas.algorithm import (
   AlgorithmRunRequest,
   StepHighlight,
   AlgorithmRunCreated,
   AlgorithmRunInfo,
+  AlgorithmResult,
+  BatchComputeRequest,
+  BatchComputeResult,
+  AllPairsRequest,
+  AllPairsRunCreated,
+  DistanceMatrixChunk,
+  AlgorithmRunUpdateRequest,
+  AlgorithmRunUpdated,
+  MultiAlgorithmRunRequest,
+  AlgorithmRunGroup,
+  ViewportStep,
+  ClusterSummary,
 )
 from app.services.algorithm_runner import (
   create_algorithm_run,
+  compute,
+  compute_batch,
   get_step,
   get_run_total_steps,
+  get_run_result,
+  get_run_request,
+  create_all_pairs_run,
+  get_matrix,
+  update_algorithm_run,
+  StaleRunError,
+  RunNotFound,
+  create_run_group,
+  get_run_group,
+  get_run_graph,
 )
+from app.services.spatial import viewport_step, cluster_summary
+from app.services.admission import AdmissionError
+from app.services.graph_store import GraphNotFound
 
 router = APIRouter(prefix="/api/algorithms", tags=["algorithms"])
 
+
+def _client_id(request: Request) -> str:
+    """X-Client-Id header, else the caller's address."""
+    if request.headers.get("x-client-id"):
+        return request.headers["x-client-id"]
+    return request.client.host if request.client else "anonymous"
+
+
+def _admission_error(e: AdmissionError) -> HTTPException:
+    headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+
 @router.post("/run", response_model=AlgorithmRunCreated)
-def start_algorithm_run(payload: AlgorithmRunRequest):
+def start_algorithm_run(payload: AlgorithmRunRequest, request: Request):
     """
         Creates a "run" object, and actually runs it based on the payload.
+    Runs over budget get 413 (or a lower trace level), a busy server
+    503 and a client with too many runs 429, both with Retry-After.
     """
-    run_id = create_algorithm_run(payload)
+    try:
+        run_id = create_algorithm_run(payload, _client_id(request))
+    except GraphNotFound:
+        raise HTTPException(status_code=404, detail="Graph not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionError as e:
+        raise _admission_error(e)
     total = get_run_total_steps(run_id)
+    result = get_run_result(run_id)
 
     return AlgorithmRunCreated(
         run_id=run_id,
         algorithm=payload.algorithm,
         total_steps=total,
+        engine=result.engine,
+        engine_reason=result.engine_reason,
+        trace_level=get_run_request(run_id).trace_level,
+    )
+
+
+@router.post("/run-group", response_model=AlgorithmRunGroup)
+def start_algorithm_run_group(payload: MultiAlgorithmRunRequest, request: Request):
+    """
+        Runs several algorithms on the same graph (parsed once, run in
+    parallel worker processes). Each run can be played back with its
+    run_id like a normal run.
+    """
+    if not payload.algorithms:
+        raise HTTPException(status_code=400, detail="No algorithms requested")
+
+    try:
+        return create_run_group(payload, _client_id(request))
+    except GraphNotFound:
+        raise HTTPException(status_code=404, detail="Graph not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionError as e:
+        raise _admission_error(e)
+
+
+@router.get("/run-group/{group_id}", response_model=AlgorithmRunGroup)
+def get_algorithm_run_group(group_id: str):
+    try:
+        return get_run_group(group_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Run group not found")
+
+
+@router.post("/run/update", response_model=AlgorithmRunUpdated)
+def update_algorithm_run_after_edits(payload: AlgorithmRunUpdateRequest, request: Request):
+    """
+        Applies small edits to the graph of a previous run and repairs
+    its shortest path tree / MST instead of recomputing it. Returns a
+    new run whose steps only show the delta.
+    """
+    try:
+        run_id, incremental, changed = update_algorithm_run(payload, _client_id(request))
+    except RunNotFound:
+        raise HTTPException(status_code=404, detail="Run not found")
+    except StaleRunError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionError as e:
+        raise _admission_error(e)
+
+    result = get_run_result(run_id)
+    return AlgorithmRunUpdated(
+        run_id=run_id,
+        algorithm=result.algorithm,
+        total_steps=get_run_total_steps(run_id),
+        engine=result.engine,
+        engine_reason=result.engine_reason,
+        trace_level=get_run_request(run_id).trace_level,
+        previous_run_id=payload.previous_run_id,
+        incremental=incremental,
+        changed=changed,
     )
 
 
@@ -68,3 +182,161 @@ def get_algorithm_step(run_id: str, step_index: int):
         raise HTTPException(status_code=404, detail="Step not found")
 
     return step
+
+
+def _step_and_graph(run_id: str, step_index: int):
+    try:
+        return get_step(run_id, step_index), get_run_graph(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Run not found")
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Step not found")
+
+
+def _bbox_params(
+    min_x: Optional[float] = None,
+    min_y: Optional[float] = None,
+    max_x: Optional[float] = None,
+    max_y: Optional[float] = None,
+):
+    """The optional viewport query parameters, as a bbox or None."""
+    values = (min_x, min_y, max_x, max_y)
+    if all(v is None for v in values):
+        return None
+    if any(v is None for v in values):
+        raise HTTPException(status_code=400, detail="Give all of min_x, min_y, max_x, max_y")
+    return values
+
+
+@router.get("/run/{run_id}/step/{step_index}/viewport", response_model=ViewportStep)
+def get_algorithm_step_in_viewport(
+    run_id: str,
+    step_index: int,
+    min_x: float,
+    min_y: float,
+    max_x: float,
+    max_y: float,
+):
+    """
+        Same as the step, but only with the nodes / edges inside the
+    bounding box, for drawing a zoomed in part of a huge graph.
+    """
+    step, graph = _step_and_graph(run_id, step_index)
+    return viewport_step(graph, step, (min_x, min_y, max_x, max_y))
+
+
+@router.get("/run/{run_id}/step/{step_index}/clusters", response_model=ClusterSummary)
+def get_algorithm_step_clusters(
+    run_id: str,
+    step_index: int,
+    resolution: int = Query(32, ge=1, le=512),
+    min_x: Optional[float] = None,
+    min_y: Optional[float] = None,
+    max_x: Optional[float] = None,
+    max_y: Optional[float] = None,
+):
+    """
+        Zoomed out view of a step: nodes grouped on a grid, with the
+    visited / highlighted count of every cluster.
+    """
+    bbox = _bbox_params(min_x, min_y, max_x, max_y)
+    step, graph = _step_and_graph(run_id, step_index)
+    return cluster_summary(graph, resolution, bbox, step)
+
+
+@router.get("/run/{run_id}/result", response_model=AlgorithmResult)
+def get_algorithm_result(run_id: str):
+    """
+        Returns the compact result of a run (distances, parents,
+    path, MST edges...), without the steps.
+    """
+    try:
+        return get_run_result(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+
+@router.post("/compute", response_model=AlgorithmResult)
+def compute_algorithm(payload: AlgorithmRunRequest, request: Request):
+    """
+        Runs the algorithm in non-tracing mode and returns only
+    the result. Nothing is stored, so there is no run_id.
+    Admitted like /run (413 / 429 / 503).
+    """
+    try:
+        return compute(payload, _client_id(request))
+    except GraphNotFound:
+        raise HTTPException(status_code=404, detail="Graph not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionError as e:
+        raise _admission_error(e)
+
+
+@router.post("/compute/batch", response_model=BatchComputeResult)
+def compute_algorithm_batch(payload: BatchComputeRequest, request: Request):
+    """
+        Same as /compute, but for many start/target pairs
+    on the same graph.
+    """
+    try:
+        results = compute_batch(payload, _client_id(request))
+    except GraphNotFound:
+        raise HTTPException(status_code=404, detail="Graph not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionError as e:
+        raise _admission_error(e)
+
+    return BatchComputeResult(
+        algorithm=payload.algorithm,
+        results=results,
+    )
+
+
+@router.post("/all-pairs", response_model=AllPairsRunCreated)
+def start_all_pairs_run(payload: AllPairsRequest, request: Request):
+    """
+        Distances from many sources (all nodes by default). The matrix
+    is kept in the run store and read back in chunks of rows.
+    Admitted like /run, with one run slot per worker process.
+    """
+    try:
+        run_id = create_all_pairs_run(payload, _client_id(request))
+    except GraphNotFound:
+        raise HTTPException(status_code=404, detail="Graph not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionError as e:
+        raise _admission_error(e)
+
+    matrix = get_matrix(run_id)
+    return AllPairsRunCreated(
+        run_id=run_id,
+        method=matrix.method,
+        node_ids=matrix.node_ids,
+        sources=matrix.sources,
+        has_negative_cycle=matrix.has_negative_cycle,
+    )
+
+
+@router.get("/all-pairs/{run_id}/rows", response_model=DistanceMatrixChunk)
+def get_all_pairs_rows(run_id: str, offset: int = 0, limit: int = 100):
+    """
+        Returns rows [offset, offset + limit) of the distance matrix.
+    """
+    try:
+        matrix = get_matrix(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    if offset < 0 or limit <= 0:
+        raise HTTPException(status_code=400, detail="Invalid offset / limit")
+
+    return DistanceMatrixChunk(
+        run_id=run_id,
+        offset=offset,
+        total_rows=len(matrix.sources),
+        sources=matrix.sources[offset:offset + limit],
+        rows=matrix.rows(offset, limit),
+    )
@@ -0,0 +1,327 @@
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.schemas.graph import (
+  GraphCreate,
+  GraphFileFormat,
+  GraphImportPath,
+  GraphInfo,
+  GraphEditRequest,
+  HierarchyInfo,
+  LayoutRequest,
+  LayoutResult,
+  LayoutFrame,
+  RouteRequest,
+  RouteResult,
+  RouteResponse,
+)
+from app.schemas.algorithm import GraphType, ClusterSummary
+from app.services.graph_store import (
+  GRAPH_NAMES,
+  register_graph,
+  add_graph,
+  get_graph,
+  delete_graph,
+)
+from app.services.graph_import import detect_format, import_stream, import_path
+from app.services.contraction import build_hierarchy, get_hierarchy
+from app.services.layout import force_layout
+from app.services.spatial import cluster_summary
+from app.services.algorithms.dijkstra import dijkstra_csr
+
+router = APIRouter(prefix="/api/graphs", tags=["graphs"])
+
+
+def graph_info(graph_id: str) -> GraphInfo:
+    graph = get_graph(graph_id)
+    return GraphInfo(
+        graph_id=graph_id,
+        name=GRAPH_NAMES[graph_id],
+        content_hash=graph.content_hash,
+        version=graph.version,
+        node_count=len(graph.nodes),
+        edge_count=len(graph.edges),
+    )
+
+
+@router.post("", response_model=GraphInfo)
+def create_graph(payload: GraphCreate):
+    """
+        Uploads a graph once. Algorithm runs can then reference
+    it with graph_id instead of re-sending nodes / edges.
+    """
+    try:
+        graph_id = register_graph(payload.nodes, payload.edges, payload.name, payload.columnar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return graph_info(graph_id)
+
+
+@router.post("/import", response_model=GraphInfo)
+def import_graph_file(
+    file: UploadFile = File(...),
+    format: Optional[GraphFileFormat] = Form(None),
+    name: Optional[str] = Form(None),
+    weight_column: Optional[int] = Form(None, ge=2),
+):
+    """
+        Multipart upload of an edge list / DIMACS / GraphML file
+    (optionally gzipped). The upload is spooled to disk and parsed
+    in chunks, then registered like POST /api/graphs. Edge lists are
+    unweighted unless weight_column says which column holds the weight.
+    """
+    fmt = format or detect_format(file.filename)
+    try:
+        graph = import_stream(file.file, fmt, weight_column)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return graph_info(add_graph(graph, name or file.filename))
+
+
+@router.post("/import/path", response_model=GraphInfo)
+def import_graph_path(payload: GraphImportPath):
+    """
+        Imports a file that is already on the server (memory mapped),
+    only from inside GRAPH_IMPORT_DIR.
+    """
+    if settings.graph_import_dir is None:
+        raise HTTPException(status_code=403, detail="Server side import is disabled")
+
+    try:
+        graph = import_path(payload.path, settings.graph_import_dir, payload.format, payload.weight_column)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return graph_info(add_graph(graph, payload.name or payload.path))
+
+
+@router.get("/{graph_id}", response_model=GraphInfo)
+def get_graph_info(graph_id: str):
+    try:
+        return graph_info(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+
+@router.delete("/{graph_id}")
+def remove_graph(graph_id: str):
+    try:
+        delete_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    return {"deleted": graph_id}
+
+
+@router.post("/{graph_id}/edits", response_model=GraphInfo)
+def edit_graph(graph_id: str, payload: GraphEditRequest):
+    """
+        Applies add / remove / update edits in order. The cached
+    adjacency is patched, not rebuilt. The edits are checked first,
+    if one is invalid none is applied.
+    """
+    try:
+        graph = get_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    try:
+        graph.check_edits(payload.edits)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for edit in payload.edits:
+        graph.apply_edit(edit)
+
+    return graph_info(graph_id)
+
+
+@router.post("/{graph_id}/layout", response_model=LayoutResult)
+def compute_layout(graph_id: str, payload: LayoutRequest):
+    """
+        Force-directed layout (Fruchterman-Reingold + Barnes-Hut).
+    The positions are kept with the graph, a later call refines them and
+    A* uses them for its heuristic. With stream_every the intermediate
+    positions are streamed as NDJSON LayoutFrame lines.
+    """
+    try:
+        graph = get_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    frames = force_layout(
+        graph,
+        iterations=payload.iterations,
+        theta=payload.theta,
+        spacing=payload.spacing,
+        refine=payload.refine,
+        seed=payload.seed,
+    )
+
+    if payload.stream_every is not None:
+        def stream():
+            first = True
+            for iteration, pos in frames:
+                done = iteration == payload.iterations
+                if iteration % payload.stream_every and not done:
+                    continue
+                frame = LayoutFrame(
+                    iteration=iteration,
+                    positions=pos.tolist(),
+                    node_ids=list(graph.nodes) if first else None,
+                    done=done,
+                )
+                first = False
+                yield frame.model_dump_json(exclude_none=True) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    started = time.perf_counter()
+    iterations = 0
+    for iterations, _ in frames:
+        pass
+
+    return LayoutResult(
+        graph_id=graph_id,
+        node_ids=graph.nodes,
+        positions=[list(graph.positions[n]) for n in graph.nodes] if iterations else [],
+        iterations=iterations,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+@router.get("/{graph_id}/layout", response_model=LayoutResult)
+def get_layout(graph_id: str):
+    """Stored positions, only for nodes that have one."""
+    try:
+        graph = get_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    placed = [n for n in graph.nodes if n in graph.positions]
+    return LayoutResult(
+        graph_id=graph_id,
+        node_ids=placed,
+        positions=[list(graph.positions[n]) for n in placed],
+    )
+
+
+@router.get("/{graph_id}/clusters", response_model=ClusterSummary)
+def get_graph_clusters(
+    graph_id: str,
+    resolution: int = Query(32, ge=1, le=512),
+    min_x: Optional[float] = None,
+    min_y: Optional[float] = None,
+    max_x: Optional[float] = None,
+    max_y: Optional[float] = None,
+):
+    """
+        Coarse view of the positioned nodes for zoomed out rendering:
+    one cluster per non empty grid cell, edges merged into links.
+    """
+    try:
+        graph = get_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    bbox = (min_x, min_y, max_x, max_y)
+    if any(v is None for v in bbox):
+        if any(v is not None for v in bbox):
+            raise HTTPException(status_code=400, detail="Give all of min_x, min_y, max_x, max_y")
+        bbox = None
+
+    return cluster_summary(graph, resolution, bbox)
+
+
+@router.post("/{graph_id}/hierarchy", response_model=HierarchyInfo)
+def create_hierarchy(graph_id: str, graph_type: GraphType = GraphType.directed):
+    """
+        Builds a contraction hierarchy for repeated point-to-point
+    queries. It is kept with the graph until the next edit.
+    """
+    try:
+        graph = get_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    try:
+        ch = build_hierarchy(graph, graph_type == GraphType.undirected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return HierarchyInfo(
+        graph_id=graph_id,
+        graph_type=graph_type,
+        version=ch.version,
+        node_count=len(ch.rank),
+        shortcut_count=ch.shortcut_count,
+        build_ms=ch.build_seconds * 1000,
+    )
+
+
+@router.post("/{graph_id}/route", response_model=RouteResponse)
+def route_queries(graph_id: str, payload: RouteRequest):
+    """
+        Point-to-point shortest paths over the contraction hierarchy.
+    With compare=true every query is also timed with a plain Dijkstra.
+    """
+    try:
+        graph = get_graph(graph_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Graph not found")
+
+    both_directions = payload.graph_type == GraphType.undirected
+    ch = get_hierarchy(graph, both_directions)
+    if ch is None:
+        raise HTTPException(status_code=409, detail="No hierarchy for this graph, build it first")
+
+    csr = graph.csr(both_directions) if payload.compare else None
+    results = []
+    for q in payload.queries:
+        if q.start_node_id is None or q.target_node_id is None:
+            raise HTTPException(status_code=400, detail="Every query needs a start and a target")
+
+        started = time.perf_counter()
+        try:
+            dist, path, path_edges, settled = ch.query(q.start_node_id, q.target_node_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query_ms = (time.perf_counter() - started) * 1000
+
+        dijkstra_ms = None
+        if csr is not None:
+            started = time.perf_counter()
+            dijkstra_csr(
+                csr.indptr, csr.targets, csr.weights,
+                csr.index[q.start_node_id], csr.index[q.target_node_id],
+            )
+            dijkstra_ms = (time.perf_counter() - started) * 1000
+
+        results.append(RouteResult(
+            start_node_id=q.start_node_id,
+            target_node_id=q.target_node_id,
+            total_weight=dist,
+            path=path,
+            path_edges=path_edges,
+            settled_nodes=settled,
+            query_ms=query_ms,
+            dijkstra_ms=dijkstra_ms,
+        ))
+
+    count = max(len(results), 1)
+    return RouteResponse(
+        graph_id=graph_id,
+        results=results,
+        avg_query_ms=sum(r.query_ms for r in results) / count,
+        avg_dijkstra_ms=(
+            sum(r.dijkstra_ms for r in results) / count if payload.compare else None
+        ),
+    )
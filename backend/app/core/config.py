@@ -0,0 +1,39 @@
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+        Server settings, read from the environment or backend/.env
+    (e.g. GRAPH_IMPORT_DIR=/data/graphs).
+    """
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # folder /api/graphs/import/path may read from, None disables it
+    graph_import_dir: Optional[str] = None
+
+    # stored run steps: steps per compressed chunk, "zlib" or "lzma",
+    # decompressed chunks kept in memory (all runs together)
+    trace_chunk_steps: int = 64
+    trace_codec: str = "zlib"
+    trace_cache_chunks: int = 32
+
+    # admission of algorithm runs (see services/admission.py):
+    # estimated operations / uncompressed step memory allowed per run
+    max_run_ops: float = 2e9
+    max_trace_bytes: int = 512 * 2 ** 20
+    # over the trace budget: "downgrade" the trace level or "reject"
+    trace_policy: Literal["downgrade", "reject"] = "downgrade"
+    # runs at the same time, in total and per client
+    max_concurrent_runs: int = 4
+    max_client_runs: int = 2
+    # how long a run waits for a free slot before a 503
+    queue_timeout_s: float = 10.0
+
+    # processes of the shared worker pool (all-pairs, run groups),
+    # None = one per CPU
+    worker_processes: Optional[int] = None
+
+
+settings = Settings()
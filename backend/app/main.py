@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import algorithm
+from app.api.routes import algorithm, graph
 
 app = FastAPI()
 
@@ -19,4 +19,5 @@ app.add_middleware(
 )
 
 # ROUTES
-app.include_router(algorithm.router)
\ No newline at end of file
+app.include_router(algorithm.router)
+app.include_router(graph.router)
\ No newline at end of file
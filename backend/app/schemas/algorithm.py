@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Union
 from enum import Enum
 
 class GraphType(str, Enum):
@@ -15,9 +15,42 @@ class AlgorithmName(str, Enum):
     prim = "prim"
     bellmanford = "bellmanford"
     astar = "astar"
+    johnson = "johnson"
+    # connected components, strongly connected for directed graphs
+    components = "components"
+    # MST in rounds of cheapest outgoing edges
+    boruvka = "boruvka"
+    # shortest / longest paths in a directed acyclic graph
+    dag = "dag"
+
+class TraceLevel(str, Enum):
+    # no steps at all, only the result (used by the compute API)
+    none = "none"
+    # only the result and the final step
+    summary = "summary"
+    # one step per settled node / iteration
+    coarse = "coarse"
+    # every step (default)
+    verbose = "verbose"
+
+class DijkstraEngine(str, Enum):
+    # picked from the edge weights (see dijkstra.select_engine), opt-in:
+    # ties and step order can differ from the heap
+    auto = "auto"
+    # binary heap, any non-negative weights (default)
+    heap = "heap"
+    # FIFO queue, all weights equal and positive
+    bfs = "bfs"
+    # Dial's bucket queue, small non-negative integer weights
+    dial = "dial"
+    # deque, weights 0 / 1 only
+    zero_one = "zero_one"
 
 class Node(BaseModel):
     id: int
+    # canvas / layout position, used by the A* heuristic
+    x: Optional[float] = None
+    y: Optional[float] = None
 
 class Edge(BaseModel):
     id: int
@@ -25,15 +58,122 @@ class Edge(BaseModel):
     to_node: int
     weight: Optional[float] = None
 
+class ColumnarEdges(BaseModel):
+    """
+        Edges as parallel columns instead of one object per edge.
+    A column is a JSON array or a base64 string of little endian
+    int64 (ids) / float64 (weights). Only the container type is checked
+    here, the values are validated in bulk with NumPy when the graph
+    is built (see graph_store.graph_from_columns).
+    """
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_node: Union[str, list] = Field(alias="from")
+    to_node: Union[str, list] = Field(alias="to")
+    # missing = every weight is 1
+    weight: Optional[Union[str, list]] = None
+    # missing = 0 .. E - 1
+    edge_id: Optional[Union[str, list]] = None
+    # missing = every node used by an edge
+    nodes: Optional[Union[str, list]] = None
+
+class GraphEditOp(str, Enum):
+    add_node = "add_node"
+    remove_node = "remove_node"
+    add_edge = "add_edge"
+    remove_edge = "remove_edge"
+    # change the weight of edge_id
+    update_edge = "update_edge"
+
+class GraphEdit(BaseModel):
+    op: GraphEditOp
+    # add_node
+    node: Optional[Node] = None
+    # add_edge
+    edge: Optional[Edge] = None
+    # remove_node / remove_edge / update_edge
+    node_id: Optional[int] = None
+    edge_id: Optional[int] = None
+    # update_edge
+    weight: Optional[float] = None
+
 class AlgorithmRunRequest(BaseModel):
     algorithm: AlgorithmName
     graph_type: GraphType
-    nodes: List[Node]
-    edges: List[Edge]
+    # either inline nodes / edges, inline columns, or a registered
+    # graph (see /api/graphs)
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    columnar: Optional[ColumnarEdges] = None
+    graph_id: Optional[str] = None
     start_node_id: Optional[int] = None
     target_node_id: Optional[int] = None
+    trace_level: TraceLevel = TraceLevel.verbose
+    # only used by dijkstra
+    engine: DijkstraEngine = DijkstraEngine.heap
+    # dijkstra / bellmanford: run the fastest engine that gives the
+    # same answer (see engine_selection), reported in the result
+    fast_path: bool = False
+    # only used by dag: longest instead of shortest paths, without a
+    # start node the result's path is the critical path
+    longest: bool = False
     # + other parameters
 
+class MultiAlgorithmRunRequest(BaseModel):
+    """
+        Several algorithms on the same graph and start / target.
+    The graph is parsed once and the runs share it.
+    """
+    algorithms: List[AlgorithmName]
+    graph_type: GraphType
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    columnar: Optional[ColumnarEdges] = None
+    graph_id: Optional[str] = None
+    start_node_id: Optional[int] = None
+    target_node_id: Optional[int] = None
+    trace_level: TraceLevel = TraceLevel.verbose
+    engine: DijkstraEngine = DijkstraEngine.heap
+    fast_path: bool = False
+    longest: bool = False
+    # None = one process per algorithm (up to the CPU count),
+    # 1 = run them one after the other in the server process
+    workers: Optional[int] = None
+
+class ComputeQuery(BaseModel):
+    start_node_id: Optional[int] = None
+    target_node_id: Optional[int] = None
+
+class BatchComputeRequest(BaseModel):
+    algorithm: AlgorithmName
+    graph_type: GraphType
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    columnar: Optional[ColumnarEdges] = None
+    graph_id: Optional[str] = None
+    queries: List[ComputeQuery]
+
+class AllPairsMethod(str, Enum):
+    # one run per source, fanned out over a process pool
+    dijkstra = "dijkstra"
+    bfs = "bfs"
+    # vectorized with NumPy, for small dense graphs
+    floyd_warshall = "floyd_warshall"
+    # Bellman-Ford reweighting + Dijkstra per source, for negative weights
+    johnson = "johnson"
+
+class AllPairsRequest(BaseModel):
+    method: AllPairsMethod = AllPairsMethod.dijkstra
+    graph_type: GraphType
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    columnar: Optional[ColumnarEdges] = None
+    graph_id: Optional[str] = None
+    # None = every node (all-pairs)
+    sources: Optional[List[int]] = None
+    # None = one per CPU
+    workers: Optional[int] = None
+
 class StepHighlight(BaseModel):
     step_index: int
     total_steps: int
@@ -48,10 +188,142 @@ class StepHighlight(BaseModel):
     visited_nodes: List[int] = []
     visited_edges: List[int] = []
 
+class ViewportStep(StepHighlight):
+    """
+        A step with only the nodes / edges inside a bounding box
+    (edges also when they cross it). Nodes without a position are
+    never inside.
+    """
+    # [min_x, min_y, max_x, max_y]
+    bbox: List[float]
+    # highlighted / visited elements left out
+    omitted_nodes: int = 0
+    omitted_edges: int = 0
+
+class ClusterCell(BaseModel):
+    # grid cell of the cluster
+    cell_x: int
+    cell_y: int
+    # mean position of its nodes
+    x: float
+    y: float
+    node_count: int
+    # only filled for a step summary
+    visited_count: int = 0
+    highlight_count: int = 0
+
+class ClusterLink(BaseModel):
+    # indexes into ClusterSummary.clusters
+    source: int
+    target: int
+    edge_count: int
+    visited_count: int = 0
+
+class ClusterSummary(BaseModel):
+    """Coarse view of a graph (or a step) for zoomed out rendering."""
+    bbox: List[float]
+    resolution: int
+    node_count: int
+    clusters: List[ClusterCell]
+    links: List[ClusterLink]
+
+class AlgorithmResult(BaseModel):
+    """
+        Compact result of a run, without the step trace.
+    The arrays are aligned with node_ids; None means unreachable
+    (or no parent). Arrays that make no sense for an algorithm
+    (e.g. distances for MST) are left empty.
+    """
+    algorithm: AlgorithmName
+    start_node_id: Optional[int] = None
+    target_node_id: Optional[int] = None
+
+    node_ids: List[int] = []
+    distances: List[Optional[float]] = []
+    parents: List[Optional[int]] = []
+    parent_edges: List[Optional[int]] = []
+
+    # start -> target path, only when a target is known
+    path: List[int] = []
+    path_edges: List[int] = []
+    # path cost for shortest paths, tree weight for MST
+    total_weight: Optional[float] = None
+
+    # MST edges / BFS and DFS tree edges
+    tree_edges: List[int] = []
+    has_negative_cycle: bool = False
+
+    # component label per node (aligned with node_ids)
+    component_labels: List[int] = []
+
+    # implementation actually used, when an algorithm has several
+    engine: Optional[str] = None
+    # why the fast path picked that engine
+    engine_reason: Optional[str] = None
+    # nodes taken off the frontier / settled (node scans for
+    # Bellman-Ford), None for edge based algorithms like Kruskal
+    nodes_expanded: Optional[int] = None
+
+class BatchComputeResult(BaseModel):
+    algorithm: AlgorithmName
+    results: List[AlgorithmResult]
+
+class AllPairsRunCreated(BaseModel):
+    run_id: str
+    method: AllPairsMethod
+    # matrix shape is len(sources) x len(node_ids)
+    node_ids: List[int]
+    sources: List[int]
+    has_negative_cycle: bool = False
+
+class DistanceMatrixChunk(BaseModel):
+    run_id: str
+    offset: int
+    total_rows: int
+    # one row per source, aligned with node_ids; None = unreachable
+    sources: List[int]
+    rows: List[List[Optional[float]]]
+
 class AlgorithmRunCreated(BaseModel):
     run_id: str
     algorithm: AlgorithmName
     total_steps: int
+    # see AlgorithmResult
+    engine: Optional[str] = None
+    engine_reason: Optional[str] = None
+    # trace level used, lower than requested when admission downgraded it
+    trace_level: Optional[TraceLevel] = None
+
+class AlgorithmRunSummary(AlgorithmRunCreated):
+    nodes_expanded: Optional[int] = None
+    # time spent in the algorithm itself
+    elapsed_ms: float
+    # path cost / MST weight
+    total_weight: Optional[float] = None
+
+class AlgorithmRunGroup(BaseModel):
+    group_id: str
+    # same order as the requested algorithms
+    runs: List[AlgorithmRunSummary]
+    # wall time of the whole request, parsing included
+    elapsed_ms: float
+
+class AlgorithmRunUpdateRequest(BaseModel):
+    """
+        Edits applied to the graph of a previous run. The previous
+    result is repaired instead of recomputed when the algorithm
+    supports it (bfs, dijkstra, kruskal, prim).
+    """
+    previous_run_id: str
+    edits: List[GraphEdit]
+    trace_level: TraceLevel = TraceLevel.verbose
+
+class AlgorithmRunUpdated(AlgorithmRunCreated):
+    previous_run_id: str
+    # False when the run was recomputed from scratch
+    incremental: bool
+    # nodes whose distance / parent changed, or MST edges swapped
+    changed: int
 
 # Maybe we will delete this in the future
 class AlgorithmRunInfo(BaseModel):
@@ -1,31 +1,133 @@
-# from pydantic import BaseModel
-# from typing import Any
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
+from app.schemas.algorithm import (
+    Node,
+    Edge,
+    ColumnarEdges,
+    GraphType,
+    ComputeQuery,
+    GraphEdit,
+)
 
-# class GraphBase(BaseModel):
-#     name: str
-#     is_directed: bool = False
-#     is_weighted: bool = False
-#     data: Any  # dict nodes/edges
 
+class GraphBase(BaseModel):
+    name: Optional[str] = None
 
-# class GraphCreate(GraphBase):
-#     pass
 
+class GraphCreate(GraphBase):
+    # either nodes / edges or columnar
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    columnar: Optional[ColumnarEdges] = None
 
-# class GraphUpdate(GraphBase):
-#     pass
 
+class GraphFileFormat(str, Enum):
+    # "u v [extra columns]" per line (SNAP style)
+    edgelist = "edgelist"
+    # DIMACS shortest path (.gr)
+    dimacs = "dimacs"
+    graphml = "graphml"
 
-# class Graph(GraphBase):
-#     id: int
-#     owner_id: int
 
-#     class Config:
-#         orm_mode = True
+class GraphImportPath(GraphBase):
+    # relative to the server's GRAPH_IMPORT_DIR
+    path: str
+    # None = guessed from the file extension
+    format: Optional[GraphFileFormat] = None
+    # edge lists: 0 based column holding the weight, None = all weights 1
+    weight_column: Optional[int] = Field(None, ge=2)
+
+
+class GraphInfo(GraphBase):
+    graph_id: str
+    content_hash: str
+    # bumped on every edit
+    version: int
+    node_count: int
+    edge_count: int
+
+
+class GraphEditRequest(BaseModel):
+    edits: List[GraphEdit]
+
+
+class HierarchyInfo(BaseModel):
+    graph_id: str
+    graph_type: GraphType
+    # graph version the hierarchy was built for
+    version: int
+    node_count: int
+    shortcut_count: int
+    build_ms: float
+
+
+# layout defaults, shared with services/layout.py
+DEFAULT_LAYOUT_ITERATIONS = 100
+# a cell of width w at distance d is one body when w / d < theta
+DEFAULT_THETA = 0.8
+# ideal edge length (FR's k), in canvas units
+DEFAULT_SPACING = 50.0
+
+
+class LayoutRequest(BaseModel):
+    iterations: int = Field(DEFAULT_LAYOUT_ITERATIONS, ge=1, le=5000)
+    # Barnes-Hut opening angle, 0 = exact repulsion
+    theta: float = Field(DEFAULT_THETA, ge=0.0, le=2.0)
+    # ideal edge length in canvas units
+    spacing: float = Field(DEFAULT_SPACING, gt=0.0)
+    # start from the stored positions (new nodes are placed next to
+    # their neighbors) instead of a random layout
+    refine: bool = True
+    # stream the positions every N iterations as NDJSON
+    stream_every: Optional[int] = Field(None, ge=1)
+    seed: Optional[int] = None
+
+
+class LayoutResult(BaseModel):
+    graph_id: str
+    node_ids: List[int]
+    # [x, y] per node, aligned with node_ids
+    positions: List[List[float]]
+    iterations: int = 0
+    elapsed_ms: float = 0.0
+
+
+class LayoutFrame(BaseModel):
+    # one NDJSON line of a streamed layout, node_ids only in the first one
+    iteration: int
+    positions: List[List[float]]
+    node_ids: Optional[List[int]] = None
+    done: bool = False
+
+
+class RouteRequest(BaseModel):
+    graph_type: GraphType
+    queries: List[ComputeQuery]
+    # also time a plain Dijkstra (stopping at the target) per query
+    compare: bool = False
+
+
+class RouteResult(BaseModel):
+    start_node_id: int
+    target_node_id: int
+    total_weight: Optional[float] = None
+    path: List[int] = []
+    path_edges: List[int] = []
+    settled_nodes: int
+    query_ms: float
+    dijkstra_ms: Optional[float] = None
+
+
+class RouteResponse(BaseModel):
+    graph_id: str
+    results: List[RouteResult]
+    avg_query_ms: float
+    avg_dijkstra_ms: Optional[float] = None
 
 """
     Here we will declare the actual objects
 that backend use. This object is not the same 
 with the one from the model.
-"""
\ No newline at end of file
+"""
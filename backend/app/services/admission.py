@@ -0,0 +1,241 @@
+"""
+    Admission control for algorithm runs. Before a run starts its cost
+is estimated from V, E and the expected number of steps:
+
+- more operations than the budget -> rejected (413),
+- step snapshots bigger than the trace budget -> the trace level is
+  lowered until they fit, or the run is rejected (trace_policy),
+- a client already running max_client_runs -> 429,
+- the server running max_concurrent_runs -> the run waits up to
+  queue_timeout_s for a slot, then 503. A run using several worker
+  processes (run groups, all-pairs) takes one slot per process.
+
+/compute, /compute/batch and /all-pairs have no trace, only the
+operations budget and the slots apply.
+
+429 / 503 carry a Retry-After hint: when the first running run is
+expected to finish.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, AllPairsMethod, TraceLevel
+from app.services.graph_store import PreparedGraph
+from app.services.engine_selection import FAST_PATH_ALGORITHMS, choose_engine
+from app.services.algorithms.dag import topological_order
+from app.core.config import Settings, settings
+
+# rough speed of the pure Python algorithms, for time estimates
+OPS_PER_SECOND = 5_000_000
+# one id in a step's lists, before the trace is compressed
+BYTES_PER_ID = 8
+# Floyd-Warshall runs its inner loops in NumPy, roughly this much
+# faster per operation than the pure Python algorithms
+NUMPY_SPEEDUP = 100
+
+# fast path engines (see engine_selection) priced like these algorithms
+FAST_PATH_COSTS = {
+    "bfs": AlgorithmName.bfs,
+    "zero_one": AlgorithmName.bfs,
+    "dag": AlgorithmName.dag,
+    "dial": AlgorithmName.dijkstra,
+    "heap": AlgorithmName.dijkstra,
+    "bellmanford": AlgorithmName.bellmanford,
+}
+
+# most detailed first
+TRACE_LEVELS = [TraceLevel.verbose, TraceLevel.coarse, TraceLevel.summary, TraceLevel.none]
+
+
+class AdmissionError(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class RunCost:
+    """Estimated work (basic graph operations) and step trace of a run."""
+    def __init__(self, ops: float, steps: int, trace_bytes: float):
+        self.ops = ops
+        self.steps = steps
+        self.trace_bytes = trace_bytes
+
+    @property
+    def seconds(self) -> float:
+        return self.ops / OPS_PER_SECOND
+
+
+def _log(x: int) -> float:
+    return math.log2(x + 2)
+
+
+def estimate_cost(algorithm: AlgorithmName, trace_level: TraceLevel, n: int, m: int) -> RunCost:
+    """
+        Operations are worst case orders of growth (Bellman-Ford: V * E).
+    Steps are what a trace level usually keeps: coarse ~ one per node,
+    verbose ~ one per node and edge. Each step stores its visited lists,
+    about V ids, except components: a step only lists its component.
+    """
+    if algorithm in (AlgorithmName.bfs, AlgorithmName.dfs, AlgorithmName.components, AlgorithmName.dag):
+        ops, coarse, verbose = n + m, n, n + m
+    elif algorithm in (AlgorithmName.dijkstra, AlgorithmName.astar):
+        ops, coarse, verbose = (n + m) * _log(n), n, n + m
+    elif algorithm == AlgorithmName.bellmanford:
+        ops, coarse, verbose = n * m, n, n + m
+    elif algorithm == AlgorithmName.johnson:
+        # potentials + one Dijkstra from the start, a few steps
+        ops, coarse, verbose = n * m + (n + m) * _log(n), 5, 5
+    elif algorithm == AlgorithmName.kruskal:
+        ops, coarse, verbose = m * _log(m), n, m
+    elif algorithm == AlgorithmName.prim:
+        ops, coarse, verbose = min(m * _log(m), n * n + m), n, n + m
+    elif algorithm == AlgorithmName.boruvka:
+        ops, coarse, verbose = m * _log(n), int(_log(n)), n
+    else:
+        ops, coarse, verbose = (n + m) * _log(n), n, n + m
+
+    steps = {
+        TraceLevel.none: 0,
+        TraceLevel.summary: 1,
+        TraceLevel.coarse: coarse,
+        TraceLevel.verbose: verbose,
+    }[trace_level]
+    if algorithm == AlgorithmName.components:
+        return RunCost(ops, steps, min(steps, 1) * 2 * (n + m) * BYTES_PER_ID)
+    return RunCost(ops, steps, steps * n * BYTES_PER_ID)
+
+
+def estimate_all_pairs(method: AllPairsMethod, n: int, m: int, sources: int) -> RunCost:
+    """All the work of an /all-pairs run, summed over its worker processes."""
+    if method == AllPairsMethod.floyd_warshall:
+        ops = n ** 3 / NUMPY_SPEEDUP
+    elif method == AllPairsMethod.bfs:
+        ops = sources * (n + m)
+    elif method == AllPairsMethod.johnson:
+        ops = n * m + sources * (n + m) * _log(n)
+    else:
+        ops = sources * (n + m) * _log(n)
+    return RunCost(ops, 0, 0)
+
+
+def _mib(size: float) -> str:
+    return f"{size / 2 ** 20:.0f} MiB"
+
+
+class Admission:
+    """Budgets and run slots, shared by all the request threads."""
+    def __init__(self, config: Settings):
+        self.config = config
+        self.changed = threading.Condition()
+        # key: slot id, value: (client, started at, expected seconds, slots)
+        self.active: Dict[int, tuple[str, float, float, int]] = {}
+        self.next_slot = 0
+
+    def plan(self, req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[AlgorithmRunRequest, RunCost]:
+        """
+            Checks the budgets. Returns the request to run (with a lower
+        trace level when downgraded) and its cost.
+        Raises AdmissionError.
+        """
+        n, m = len(graph.nodes), len(graph.edges)
+        algorithm = req.algorithm
+        if req.fast_path and algorithm in FAST_PATH_ALGORITHMS:
+            engine, _ = choose_engine(req, graph)
+            algorithm = FAST_PATH_COSTS.get(engine, algorithm)
+        elif algorithm == AlgorithmName.dag and topological_order(graph) is None:
+            # a cycle: fake_dag falls back to Bellman-Ford
+            algorithm = AlgorithmName.bellmanford
+
+        cost = estimate_cost(algorithm, req.trace_level, n, m)
+        self.check(req.algorithm.value, cost, graph)
+
+        if cost.trace_bytes <= self.config.max_trace_bytes:
+            return req, cost
+        if self.config.trace_policy == "downgrade":
+            for level in TRACE_LEVELS[TRACE_LEVELS.index(req.trace_level) + 1:]:
+                lower = estimate_cost(algorithm, level, n, m)
+                if lower.trace_bytes <= self.config.max_trace_bytes:
+                    return req.model_copy(update={"trace_level": level}), lower
+        raise AdmissionError(
+            413,
+            f"The {req.trace_level.value} trace would take about {_mib(cost.trace_bytes)}, "
+            f"the limit is {_mib(self.config.max_trace_bytes)}; ask for a lower trace_level",
+        )
+
+    def check(self, name: str, cost: RunCost, graph: PreparedGraph):
+        """Raises AdmissionError (413) when cost is over the operations budget."""
+        if cost.ops > self.config.max_run_ops:
+            raise AdmissionError(
+                413,
+                f"{name} on {len(graph.nodes)} nodes / {len(graph.edges)} edges needs about "
+                f"{cost.ops:.3g} operations, the limit is {self.config.max_run_ops:.3g}",
+            )
+
+    def plan_many(self, req: AlgorithmRunRequest, graph: PreparedGraph, runs: int) -> RunCost:
+        """runs times req without a trace (batch compute). Raises AdmissionError."""
+        _, one = self.plan(req.model_copy(update={"trace_level": TraceLevel.none}), graph)
+        cost = RunCost(one.ops * runs, 0, 0)
+        self.check(f"{runs} x {req.algorithm.value}", cost, graph)
+        return cost
+
+    def plan_all_pairs(self, method: AllPairsMethod, graph: PreparedGraph, sources: int) -> RunCost:
+        """Raises AdmissionError."""
+        cost = estimate_all_pairs(method, len(graph.nodes), len(graph.edges), sources)
+        self.check(f"all-pairs {method.value} from {sources} sources", cost, graph)
+        return cost
+
+    def _retry_after(self) -> int:
+        now = time.monotonic()
+        left = [started + seconds - now for _, started, seconds, _ in self.active.values()]
+        return max(1, math.ceil(min(left, default=1)))
+
+    @contextmanager
+    def slot(self, client: Optional[str], costs: List[RunCost], slots: int = 1):
+        """
+            Holds run slots while the block runs: one run for the client,
+        `slots` for the server (one per worker process the run uses, at
+        most max_concurrent_runs). Raises AdmissionError (429 / 503).
+        """
+        client = client or "anonymous"
+        slots = max(1, min(slots, self.config.max_concurrent_runs))
+        deadline = time.monotonic() + self.config.queue_timeout_s
+        with self.changed:
+            while True:
+                running = sum(1 for c, _, _, _ in self.active.values() if c == client)
+                if running >= self.config.max_client_runs:
+                    raise AdmissionError(
+                        429,
+                        f"Client already has {running} runs in progress (limit {self.config.max_client_runs})",
+                        self._retry_after(),
+                    )
+                used = sum(s for _, _, _, s in self.active.values())
+                if used + slots <= self.config.max_concurrent_runs:
+                    break
+
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise AdmissionError(
+                        503,
+                        f"Server busy: {used} of {self.config.max_concurrent_runs} run slots in use",
+                        self._retry_after(),
+                    )
+                self.changed.wait(left)
+
+            slot_id = self.next_slot
+            self.next_slot += 1
+            self.active[slot_id] = (client, time.monotonic(), sum(c.seconds for c in costs), slots)
+
+        try:
+            yield
+        finally:
+            with self.changed:
+                del self.active[slot_id]
+                self.changed.notify_all()
+
+
+ADMISSION = Admission(settings)
@@ -1,9 +1,23 @@
+import time
 import uuid
-from typing import Dict, List
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, List, Optional
+
+import numpy as np
+
 from app.schemas.algorithm import (
   AlgorithmRunRequest,
   StepHighlight,
   AlgorithmName,
+  AlgorithmResult,
+  BatchComputeRequest,
+  TraceLevel,
+  AllPairsRequest,
+  GraphType,
+  AlgorithmRunUpdateRequest,
+  MultiAlgorithmRunRequest,
+  AlgorithmRunSummary,
+  AlgorithmRunGroup,
 )
 
 # all algorithms implemented
@@ -14,47 +28,425 @@ from app.services.algorithms.dijkstra import fake_dijkstra
 from app.services.algorithms.prim import fake_prim
 from app.services.algorithms.bellmanford import fake_bellman_ford
 from app.services.algorithms.astar import fake_astar
+from app.services.algorithms.johnson import fake_johnson
+from app.services.algorithms.components import fake_components
+from app.services.algorithms.boruvka import fake_boruvka
+from app.services.algorithms.dag import fake_dag
+from app.services.algorithms.result import with_target
+from app.services.algorithms.incremental import can_repair, repair_run
+from app.services.graph_store import PreparedGraph, resolve_graph
+from app.services.all_pairs import DistanceMatrix, compute_all_pairs, pool_workers
+from app.services.engine_selection import FAST_PATH_ALGORITHMS, run_fast_path
+from app.services.admission import ADMISSION
+from app.services.trace_store import CompressedTrace, ChunkCache, read_step
+from app.services.worker_pool import Attached, SharedBlocks, get_pool, pool_size
+from app.core.config import settings
 
 # possibly we will save this in the actual DB
-# key: run_id, value: steps
-RUNS: Dict[str, List[StepHighlight]] = {}
+# key: run_id, value: steps (compressed, see trace_store)
+RUNS: Dict[str, CompressedTrace] = {}
+# decompressed chunks of the steps read last
+STEP_CACHE = ChunkCache(settings.trace_cache_chunks)
+# key: run_id, value: compact result of the run
+RESULTS: Dict[str, AlgorithmResult] = {}
+# key: run_id, value: (request, graph, graph version after the run),
+# needed to repair a run after edits
+RUN_INPUTS: Dict[str, tuple[AlgorithmRunRequest, PreparedGraph, int]] = {}
+# key: run_id, value: distance matrix of an all-pairs / multi-source run
+MATRICES: Dict[str, DistanceMatrix] = {}
+# key: group_id, value: summaries of a multi-algorithm run
+RUN_GROUPS: Dict[str, AlgorithmRunGroup] = {}
+
+# algorithms whose result does not depend on the target,
+# so one run per start node can answer many targets
+SINGLE_SOURCE = {
+  AlgorithmName.bfs,
+  AlgorithmName.dfs,
+  AlgorithmName.dijkstra,
+  AlgorithmName.bellmanford,
+  AlgorithmName.johnson,
+}
+
+def run_algorithm(
+    req: AlgorithmRunRequest,
+    graph: Optional[PreparedGraph] = None,
+) -> tuple[List[StepHighlight], AlgorithmResult]:
+    """
+        Raises GraphNotFound if req.graph_id is unknown and
+    ValueError if the inline graph is invalid.
+    """
+    if graph is None:
+        graph = resolve_graph(req)
+
+    if req.fast_path and req.algorithm in FAST_PATH_ALGORITHMS:
+        return run_fast_path(req, graph)
 
-def create_algorithm_run(req: AlgorithmRunRequest) -> str:
     if req.algorithm == AlgorithmName.bfs:
-        steps = fake_bfs(req)
+        return fake_bfs(req, graph)
     elif req.algorithm == AlgorithmName.dfs:
-        steps = fake_dfs(req)
+        return fake_dfs(req, graph)
     elif req.algorithm == AlgorithmName.kruskal:
-        steps = fake_kruskal(req)
+        return fake_kruskal(req, graph)
     elif req.algorithm == AlgorithmName.dijkstra:
-        steps = fake_dijkstra(req)
+        return fake_dijkstra(req, graph)
     elif req.algorithm == AlgorithmName.prim:
-        steps = fake_prim(req)
+        return fake_prim(req, graph)
     elif req.algorithm == AlgorithmName.bellmanford:
-        steps = fake_bellman_ford(req)      
+        return fake_bellman_ford(req, graph)
     elif req.algorithm == AlgorithmName.astar:
-        steps = fake_astar(req)   
-    else:
-        print("ERROR: this algorithm is not implemented.")
+        return fake_astar(req, graph)
+    elif req.algorithm == AlgorithmName.johnson:
+        return fake_johnson(req, graph)
+    elif req.algorithm == AlgorithmName.components:
+        return fake_components(req, graph)
+    elif req.algorithm == AlgorithmName.boruvka:
+        return fake_boruvka(req, graph)
+    elif req.algorithm == AlgorithmName.dag:
+        return fake_dag(req, graph)
+
+    raise ValueError(f"Algorithm {req.algorithm} is not implemented.")
+
+
+def check_nodes(graph: PreparedGraph, start: Optional[int], target: Optional[int]):
+  """Raises ValueError if the start or target node is not in the graph."""
+  for name, node in (("Start", start), ("Target", target)):
+    if node is not None and not graph.has_node(node):
+      raise ValueError(f"{name} node {node} is not in the graph")
 
+
+class RunNotFound(KeyError):
+    """Unknown run_id."""
+
+
+class StaleRunError(Exception):
+    """The graph of a run was edited since, the run can't be repaired."""
+
+
+def _compress(steps: List[StepHighlight]) -> CompressedTrace:
+    return CompressedTrace(steps, settings.trace_chunk_steps, settings.trace_codec)
+
+
+def _store_run(req: AlgorithmRunRequest, graph: PreparedGraph, trace: CompressedTrace, result) -> str:
     run_id = str(uuid.uuid4())
-    RUNS[run_id] = steps
+    RUNS[run_id] = trace
+    RESULTS[run_id] = result
+    RUN_INPUTS[run_id] = (req, graph, graph.version)
     return run_id
 
 
+def create_algorithm_run(req: AlgorithmRunRequest, client: Optional[str] = None) -> str:
+    """
+        Raises AdmissionError when the run is over budget or no run
+    slot is free (see admission), the trace level may be lowered.
+    """
+    graph = resolve_graph(req)
+    check_nodes(graph, req.start_node_id, req.target_node_id)
+    req, cost = ADMISSION.plan(req, graph)
+    with ADMISSION.slot(client, [cost]):
+        steps, result = run_algorithm(req, graph)
+    return _store_run(req, graph, _compress(steps), result)
+
+
+def _run_timed(req: AlgorithmRunRequest, graph: PreparedGraph):
+  """(compressed steps, result, elapsed ms), the steps are compressed where they are made."""
+  t = time.perf_counter()
+  steps, result = run_algorithm(req, graph)
+  elapsed_ms = (time.perf_counter() - t) * 1000
+  return _compress(steps), result, elapsed_ms
+
+
+# ---- run group workers (shared pool, see worker_pool) -----------------
+# The graph goes to the workers as shared memory columns. A worker
+# rebuilds it once per group and keeps the last one for the next tasks.
+
+_WORKER_GRAPH: tuple[Optional[str], Optional[PreparedGraph]] = (None, None)
+
+
+def _share_graph(graph: PreparedGraph, shared: SharedBlocks) -> Dict[str, int]:
+  """Writes the graph's columns to shared blocks, returns their lengths."""
+  nodes = np.array(graph.nodes, dtype=np.int64)
+  edge_ids, froms, tos, weights = graph.edge_arrays()
+  placed = [n for n in graph.nodes if n in graph.positions]
+
+  shared.add("nodes", nodes.tobytes())
+  shared.add("edge_ids", edge_ids.tobytes())
+  shared.add("froms", nodes[froms].tobytes())
+  shared.add("tos", nodes[tos].tobytes())
+  shared.add("weights", weights.tobytes())
+  shared.add("placed", np.array(placed, dtype=np.int64).tobytes())
+  shared.add("xy", np.array([graph.positions[n] for n in placed], dtype=np.float64).tobytes())
+  return {"n": len(nodes), "m": len(edge_ids), "p": len(placed)}
+
+
+def _worker_graph(names: Dict[str, str], sizes: Dict[str, int]) -> PreparedGraph:
+  global _WORKER_GRAPH
+  key, graph = _WORKER_GRAPH
+  if key == names["nodes"]:
+    return graph
+
+  n, m, p = sizes["n"], sizes["m"], sizes["p"]
+  with Attached(names) as shared:
+    column = lambda name, fmt, count: np.array(shared.cast(name, fmt)[:count])
+    nodes = column("nodes", "q", n)
+    graph = PreparedGraph.from_arrays(
+      nodes,
+      column("edge_ids", "q", m),
+      column("froms", "q", m),
+      column("tos", "q", m),
+      column("weights", "d", m),
+    )
+    xy = column("xy", "d", 2 * p).reshape(p, 2)
+    graph.positions = dict(zip(column("placed", "q", p).tolist(), map(tuple, xy.tolist())))
+
+  _WORKER_GRAPH = (names["nodes"], graph)
+  return graph
+
+
+def _run_in_worker(names: Dict[str, str], sizes: Dict[str, int], req: AlgorithmRunRequest):
+  return _run_timed(req, _worker_graph(names, sizes))
+
+
+def create_run_group(req: MultiAlgorithmRunRequest, client: Optional[str] = None) -> AlgorithmRunGroup:
+  """
+      Runs every requested algorithm on one parsed graph, in parallel on
+  the shared worker pool. The workers get the graph through shared
+  memory and send back compressed steps. Each run is stored like a
+  normal /run. Every run is checked against the budgets, the group
+  takes one run slot per worker process.
+  """
+  started = time.perf_counter()
+  graph = resolve_graph(req)
+  check_nodes(graph, req.start_node_id, req.target_node_id)
+
+  run_reqs = [
+    AlgorithmRunRequest(
+      algorithm=algorithm,
+      graph_type=req.graph_type,
+      graph_id=req.graph_id,
+      start_node_id=req.start_node_id,
+      target_node_id=req.target_node_id,
+      trace_level=req.trace_level,
+      engine=req.engine,
+      fast_path=req.fast_path,
+      longest=req.longest,
+    )
+    for algorithm in req.algorithms
+  ]
+  planned = [ADMISSION.plan(r, graph) for r in run_reqs]
+  run_reqs = [r for r, _ in planned]
+
+  workers = min(req.workers or pool_size(), pool_size(), len(run_reqs))
+  with ADMISSION.slot(client, [cost for _, cost in planned], workers):
+    if workers <= 1:
+      outputs = [_run_timed(r, graph) for r in run_reqs]
+    else:
+      with SharedBlocks() as shared:
+        sizes = _share_graph(graph, shared)
+        pool = get_pool()
+        # at most `workers` runs in flight, the pool is shared
+        outputs = [None] * len(run_reqs)
+        queue = list(enumerate(run_reqs))
+        running = {}
+        while queue or running:
+          while queue and len(running) < workers:
+            i, r = queue.pop(0)
+            running[pool.submit(_run_in_worker, shared.names, sizes, r)] = i
+          done, _ = wait(running, return_when=FIRST_COMPLETED)
+          for f in done:
+            outputs[running.pop(f)] = f.result()
+
+  runs = []
+  for run_req, (trace, result, elapsed_ms) in zip(run_reqs, outputs):
+    run_id = _store_run(run_req, graph, trace, result)
+    runs.append(AlgorithmRunSummary(
+      run_id=run_id,
+      algorithm=run_req.algorithm,
+      total_steps=len(trace),
+      nodes_expanded=result.nodes_expanded,
+      elapsed_ms=elapsed_ms,
+      total_weight=result.total_weight,
+      engine=result.engine,
+      engine_reason=result.engine_reason,
+      trace_level=run_req.trace_level,
+    ))
+
+  group = AlgorithmRunGroup(
+    group_id=str(uuid.uuid4()),
+    runs=runs,
+    elapsed_ms=(time.perf_counter() - started) * 1000,
+  )
+  RUN_GROUPS[group.group_id] = group
+  return group
+
+
+def get_run_group(group_id: str) -> AlgorithmRunGroup:
+  if group_id not in RUN_GROUPS:
+    raise KeyError("Run group not found")
+
+  return RUN_GROUPS[group_id]
+
+
+def update_algorithm_run(req: AlgorithmRunUpdateRequest, client: Optional[str] = None) -> tuple[str, bool, int]:
+    """
+        Applies the edits to the previous run's graph and repairs its
+    result when possible, otherwise recomputes. For a registered graph
+    the edits are applied to the stored graph. Admitted like a new run.
+    The edits are checked first: a ValueError leaves the graph as it was.
+    Returns (run_id, incremental, changed).
+    """
+    if req.previous_run_id not in RUN_INPUTS:
+        raise RunNotFound("Run not found")
+
+    prev_req, graph, version = RUN_INPUTS[req.previous_run_id]
+    if graph.version != version:
+        raise StaleRunError("The graph was edited after this run")
+    graph.check_edits(req.edits)
+
+    run_req = prev_req.model_copy(update={"trace_level": req.trace_level})
+    previous = RESULTS[req.previous_run_id]
+    run_req, cost = ADMISSION.plan(run_req, graph)
+
+    with ADMISSION.slot(client, [cost]):
+        if can_repair(run_req, graph, previous, req.edits):
+            steps, result, changed = repair_run(run_req, graph, previous, req.edits)
+            incremental = True
+        else:
+            for edit in req.edits:
+                graph.apply_edit(edit)
+            steps, result = run_algorithm(run_req, graph)
+            changed = len(result.node_ids)
+            incremental = False
+
+    return _store_run(run_req, graph, _compress(steps), result), incremental, changed
+
+
+def _compute(req: AlgorithmRunRequest, graph: Optional[PreparedGraph] = None) -> AlgorithmResult:
+  _, result = run_algorithm(
+    req.model_copy(update={"trace_level": TraceLevel.none}),
+    graph,
+  )
+  return result
+
+
+def compute(req: AlgorithmRunRequest, client: Optional[str] = None) -> AlgorithmResult:
+  """
+      Runs the algorithm without building any step, nothing is stored.
+  Admitted like a run (operations budget and a run slot).
+  """
+  graph = resolve_graph(req)
+  check_nodes(graph, req.start_node_id, req.target_node_id)
+  req, cost = ADMISSION.plan(req.model_copy(update={"trace_level": TraceLevel.none}), graph)
+  with ADMISSION.slot(client, [cost]):
+    return _compute(req, graph)
+
+
+def compute_batch(req: BatchComputeRequest, client: Optional[str] = None) -> List[AlgorithmResult]:
+  """
+      Answers many start/target pairs on the same graph.
+  Single-source algorithms run once per distinct start node.
+  The whole batch is admitted as one run costing all its runs.
+  """
+  base = AlgorithmRunRequest(
+    algorithm=req.algorithm,
+    graph_type=req.graph_type,
+    graph_id=req.graph_id,
+    trace_level=TraceLevel.none,
+  )
+  # parsed once for all the queries
+  graph = resolve_graph(req)
+  for q in req.queries:
+    check_nodes(graph, q.start_node_id, q.target_node_id)
+
+  if req.algorithm in SINGLE_SOURCE:
+    runs = len({q.start_node_id for q in req.queries})
+  else:
+    runs = len(req.queries)
+  cost = ADMISSION.plan_many(base, graph, runs)
+
+  by_start: Dict[int | None, AlgorithmResult] = {}
+  results: List[AlgorithmResult] = []
+  with ADMISSION.slot(client, [cost]):
+    for q in req.queries:
+      if req.algorithm in SINGLE_SOURCE:
+        if q.start_node_id not in by_start:
+          by_start[q.start_node_id] = _compute(
+            base.model_copy(update={"start_node_id": q.start_node_id}),
+            graph,
+          )
+        results.append(with_target(by_start[q.start_node_id], q.target_node_id))
+      else:
+        results.append(_compute(base.model_copy(update={
+          "start_node_id": q.start_node_id,
+          "target_node_id": q.target_node_id,
+        }), graph))
+
+  return results
+
+
+def create_all_pairs_run(req: AllPairsRequest, client: Optional[str] = None) -> str:
+  """
+      Raises AdmissionError like a run, taking one run slot per
+  worker process it uses.
+  """
+  graph = resolve_graph(req)
+  sources = len(req.sources) if req.sources is not None else len(graph.nodes)
+  cost = ADMISSION.plan_all_pairs(req.method, graph, sources)
+  with ADMISSION.slot(client, [cost], pool_workers(req.method, sources, req.workers)):
+    matrix = compute_all_pairs(
+      graph,
+      req.graph_type == GraphType.undirected,
+      req.method,
+      req.sources,
+      req.workers,
+    )
+
+  run_id = str(uuid.uuid4())
+  MATRICES[run_id] = matrix
+  return run_id
+
+
+def get_matrix(run_id: str) -> DistanceMatrix:
+  if run_id not in MATRICES:
+    raise RunNotFound("Run not found")
+
+  return MATRICES[run_id]
+
+
 def get_step(run_id: str, step_index: int) -> StepHighlight:
   if run_id not in RUNS:
-    raise KeyError("Run not found")
+    raise RunNotFound("Run not found")
 
-  steps = RUNS[run_id]
-  if step_index < 0 or step_index >= len(steps):
+  trace = RUNS[run_id]
+  if step_index < 0 or step_index >= len(trace):
     raise IndexError("Step out of range")
 
-  return steps[step_index]
+  return read_step(STEP_CACHE, run_id, trace, step_index)
+
+
+def get_run_graph(run_id: str) -> PreparedGraph:
+  if run_id not in RUN_INPUTS:
+    raise RunNotFound("Run not found")
+
+  return RUN_INPUTS[run_id][1]
 
 
 def get_run_total_steps(run_id: str) -> int:
   if run_id not in RUNS:
-    raise KeyError("Run not found")
+    raise RunNotFound("Run not found")
 
   return len(RUNS[run_id])
+
+
+def get_run_request(run_id: str) -> AlgorithmRunRequest:
+  """The request actually run (after admission)."""
+  if run_id not in RUN_INPUTS:
+    raise RunNotFound("Run not found")
+
+  return RUN_INPUTS[run_id][0]
+
+
+def get_run_result(run_id: str) -> AlgorithmResult:
+  if run_id not in RESULTS:
+    raise RunNotFound("Run not found")
+
+  return RESULTS[run_id]
@@ -5,14 +5,38 @@ import math
 from app.schemas.algorithm import (
     AlgorithmRunRequest,
     StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    GraphType,
 )
-
-def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+from app.services.algorithms.result import build_result, trace_path
+from app.services.graph_store import PreparedGraph
+
+def heuristic_scale(graph: PreparedGraph) -> float:
+    """
+        Largest c with c * |uv| <= w(u, v) on every edge, so that
+    c * distance is a consistent heuristic. 0 (plain Dijkstra) when some
+    node has no position or some weight is negative.
+    """
+    positions = graph.positions
+    if not graph.edges or len(positions) < len(graph.nodes):
+        return 0.0
+
+    scale = math.inf
+    for u, v, w in graph.edges.values():
+        if w < 0:
+            return 0.0
+        length = math.dist(positions[u], positions[v])
+        if length > 0:
+            scale = min(scale, w / length)
+    return 0.0 if scale == math.inf else scale
+
+
+def fake_astar(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     start = req.start_node_id or nodes[0]
     target = req.target_node_id
@@ -22,23 +46,22 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
         target = nodes[-1]
 
     # Build adjacency list with weights
-    adj: Dict[int, List[tuple[int, int, int]]] = {n: [] for n in nodes}
-    for e in edges:
-        adj[e.from_node].append((e.to_node, e.weight, e.id))
-        if req.graph_type == "undirected":
-            adj[e.to_node].append((e.from_node, e.weight, e.id))
-
-    # Get node positions for heuristic (Euclidean distance)
-    node_positions: Dict[int, tuple[float, float]] = {}
-    for n in req.nodes:
-        # Assuming nodes have x and y attributes
-        node_positions[n.id] = (getattr(n, 'x', 0), getattr(n, 'y', 0))
+    adj = graph.adjacency(req.graph_type == GraphType.undirected)
+
+    # Heuristic: straight line distance to the target, from the node
+    # positions (request x / y or a server layout). It is scaled by the
+    # smallest weight / length ratio over the edges, so it never
+    # overestimates and the closed set stays correct.
+    node_positions = graph.positions
+    scale = heuristic_scale(graph)
+    tx, ty = node_positions.get(target, (0.0, 0.0))
 
     def heuristic(node_id: int) -> float:
-        """Euclidean distance to target"""
-        x1, y1 = node_positions.get(node_id, (0, 0))
-        x2, y2 = node_positions.get(target, (0, 0))
-        return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        """Scaled Euclidean distance to target"""
+        if scale == 0.0:
+            return 0.0
+        x1, y1 = node_positions[node_id]
+        return scale * math.sqrt((tx - x1) ** 2 + (ty - y1) ** 2)
 
     # Initialize distances and costs
     g_score: Dict[int, float] = {n: float('inf') for n in nodes}  # Actual cost from start
@@ -46,8 +69,14 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
     g_score[start] = 0
     f_score[start] = heuristic(start)
     
+    parent: Dict[int, Optional[int]] = {n: None for n in nodes}
     parent_edge: Dict[int, Optional[int]] = {n: None for n in nodes}
 
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
     visited_nodes: set[int] = set()
     visited_edges: set[int] = set()
     steps: List[StepHighlight] = []
@@ -76,11 +105,12 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
         )
         step_index += 1
 
-    push_step(
-        f"Start A* algorithm from node {start} to node {target}. h({start}) = {heuristic(start):.1f}",
-        [start, target],
-        []
-    )
+    if coarse:
+        push_step(
+            f"Start A* algorithm from node {start} to node {target}. h({start}) = {heuristic(start):.1f}",
+            [start, target],
+            []
+        )
 
     found_path = False
 
@@ -97,50 +127,25 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
         if parent_edge[u] is not None:
             visited_edges.add(parent_edge[u])
         
-        push_step(
-            f"Visit node {u}: g={current_g:.1f}, h={heuristic(u):.1f}, f={current_f:.1f}",
-            [u],
-            [parent_edge[u]] if parent_edge[u] is not None else []
-        )
+        if coarse:
+            push_step(
+                f"Visit node {u}: g={current_g:.1f}, h={heuristic(u):.1f}, f={current_f:.1f}",
+                [u],
+                [parent_edge[u]] if parent_edge[u] is not None else []
+            )
 
         # Check if we reached the target
         if u == target:
             found_path = True
             # Reconstruct path
-            path_nodes = []
-            path_edges = []
-            current = target
-            while current != start:
-                path_nodes.append(current)
-                if parent_edge[current] is not None:
-                    path_edges.append(parent_edge[current])
-                # Find parent node
-                found_parent = False
-                for node_id, edge_id in parent_edge.items():
-                    if node_id == current and edge_id is not None:
-                        # Find which node this edge came from
-                        for e in edges:
-                            if e.id == edge_id:
-                                if e.to_node == current:
-                                    current = e.from_node
-                                else:
-                                    current = e.to_node
-                                found_parent = True
-                                break
-                        if found_parent:
-                            break
-                if not found_parent:
-                    break
-            
-            path_nodes.append(start)
-            path_nodes.reverse()
-            path_edges.reverse()
-            
-            push_step(
-                f"✓ Path found! Total cost: {g_score[target]:.1f}",
-                path_nodes,
-                path_edges
-            )
+            path_nodes, path_edges = trace_path(parent, parent_edge, start, target)
+
+            if traced:
+                push_step(
+                    f"✓ Path found! Total cost: {g_score[target]:.1f}",
+                    path_nodes,
+                    path_edges
+                )
             break
 
         # Check all neighbors
@@ -153,9 +158,13 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
                     old_g = g_score[v] if g_score[v] != float('inf') else None
                     g_score[v] = tentative_g
                     f_score[v] = tentative_g + heuristic(v)
+                    parent[v] = u
                     parent_edge[v] = edge_id
                     heapq.heappush(pq, (f_score[v], g_score[v], v))
-                    
+
+                    if not verbose:
+                        continue
+
                     if old_g is None:
                         push_step(
                             f"Discover node {v}: g={tentative_g:.1f}, h={heuristic(v):.1f}, f={f_score[v]:.1f} via {u} → {v}",
@@ -169,7 +178,7 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
                             [edge_id]
                         )
 
-    if not found_path:
+    if not found_path and traced:
         push_step(
             f"✗ No path from node {start} to node {target}",
             [start, target],
@@ -181,4 +190,10 @@ def fake_astar(req: AlgorithmRunRequest) -> List[StepHighlight]:
         s.step_index = i
         s.total_steps = total
 
-    return steps
\ No newline at end of file
+    # g scores are only final on the path, so no distance array here
+    result = build_result(req, nodes, start, target, nodes_expanded=len(visited_nodes))
+    if found_path:
+        result.path = path_nodes
+        result.path_edges = path_edges
+        result.total_weight = g_score[target]
+    return steps, result
\ No newline at end of file
@@ -3,22 +3,32 @@ from typing import Dict, List, Optional
 from app.schemas.algorithm import (
     AlgorithmRunRequest,
     StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
 )
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
 
-def fake_bellman_ford(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+def fake_bellman_ford(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
+    edges = graph.edge_list()
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     start = req.start_node_id or nodes[0]
 
     # Initialize distances
     dist: Dict[int, float] = {n: float('inf') for n in nodes}
     dist[start] = 0
+    parent: Dict[int, Optional[int]] = {n: None for n in nodes}
     parent_edge: Dict[int, Optional[int]] = {n: None for n in nodes}
 
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
     visited_edges: set[int] = set()
     steps: List[StepHighlight] = []
     step_index = 0
@@ -43,25 +53,27 @@ def fake_bellman_ford(req: AlgorithmRunRequest) -> List[StepHighlight]:
         )
         step_index += 1
 
-    push_step(
-        f"Start Bellman-Ford algorithm from node {start}. Initialize distance to 0.",
-        [start],
-        []
-    )
-
-    # Relax edges |V| - 1 times
-    for iteration in range(len(nodes) - 1):
+    if coarse:
         push_step(
-            f"Iteration {iteration + 1}/{len(nodes) - 1}: Relax all edges",
-            [],
+            f"Start Bellman-Ford algorithm from node {start}. Initialize distance to 0.",
+            [start],
             []
         )
 
+    # Relax edges |V| - 1 times
+    passes = 0
+    for iteration in range(len(nodes) - 1):
+        passes += 1
+        if coarse:
+            push_step(
+                f"Iteration {iteration + 1}/{len(nodes) - 1}: Relax all edges",
+                [],
+                []
+            )
+
         updated = False
 
-        for edge in edges:
-            u, v = edge.from_node, edge.to_node
-            weight = edge.weight
+        for edge_id, u, v, weight in edges:
 
             if dist[u] != float('inf') and dist[u] + weight < dist[v]:
                 old_dist = dist[v] if dist[v] != float('inf') else None
@@ -70,54 +82,59 @@ def fake_bellman_ford(req: AlgorithmRunRequest) -> List[StepHighlight]:
                 # Update parent edge for shortest path tree
                 if parent_edge[v] is not None:
                     visited_edges.discard(parent_edge[v])
-                parent_edge[v] = edge.id
-                visited_edges.add(edge.id)
+                parent[v] = u
+                parent_edge[v] = edge_id
+                visited_edges.add(edge_id)
                 
                 updated = True
 
+                if not verbose:
+                    continue
+
                 if old_dist is None:
                     push_step(
                         f"Discover node {v}: distance = {dist[v]} via {u} → {v} (weight {weight})",
                         [u, v],
-                        [edge.id]
+                        [edge_id]
                     )
                 else:
                     push_step(
                         f"Update distance to node {v}: {old_dist} → {dist[v]} via {u} → {v}",
                         [u, v],
-                        [edge.id]
+                        [edge_id]
                     )
 
         if not updated:
-            push_step(
-                f"No updates in iteration {iteration + 1}. Early termination.",
-                [],
-                []
-            )
+            if coarse:
+                push_step(
+                    f"No updates in iteration {iteration + 1}. Early termination.",
+                    [],
+                    []
+                )
             break
 
     # Check for negative cycles
-    push_step(
-        "Check for negative cycles...",
-        [],
-        []
-    )
+    if coarse:
+        push_step(
+            "Check for negative cycles...",
+            [],
+            []
+        )
 
     has_negative_cycle = False
-    for edge in edges:
-        u, v = edge.from_node, edge.to_node
-        weight = edge.weight
+    for edge_id, u, v, weight in edges:
 
         if dist[u] != float('inf') and dist[u] + weight < dist[v]:
             has_negative_cycle = True
-            push_step(
-                f"⚠ Negative cycle detected! Edge {u} → {v} can still be relaxed.",
-                [u, v],
-                [edge.id]
-            )
+            if coarse:
+                push_step(
+                    f"⚠ Negative cycle detected! Edge {u} → {v} can still be relaxed.",
+                    [u, v],
+                    [edge_id]
+                )
             break
 
-    if not has_negative_cycle:
+    if traced and not has_negative_cycle:
         reachable = [n for n in nodes if dist[n] != float('inf')]
         unreachable = [n for n in nodes if dist[n] == float('inf')]
 
@@ -130,7 +147,7 @@ def fake_bellman_ford(req: AlgorithmRunRequest) -> List[StepHighlight]:
             reachable,
             list(visited_edges)
         )
-    else:
+    elif traced:
         push_step(
             "⚠ Algorithm terminated: Negative cycle exists. Shortest paths are undefined.",
             [],
@@ -142,4 +159,16 @@ def fake_bellman_ford(req: AlgorithmRunRequest) -> List[StepHighlight]:
         s.step_index = i
         s.total_steps = total
 
-    return steps
\ No newline at end of file
+    # with a negative cycle the parent pointers may loop, so no path
+    result = build_result(
+        req, nodes, start,
+        None if has_negative_cycle else req.target_node_id,
+        dist=dist,
+        parent=parent,
+        parent_edge=parent_edge,
+        tree_edges=sorted(visited_edges),
+        has_negative_cycle=has_negative_cycle,
+        # every pass (plus the negative cycle check) scans all nodes
+        nodes_expanded=(passes + 1) * len(nodes),
+    )
+    return steps, result
\ No newline at end of file
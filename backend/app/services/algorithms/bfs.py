@@ -1,62 +1,56 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from collections import deque
 
 from app.schemas.algorithm import (
   AlgorithmRunRequest,
   StepHighlight,
+  TraceLevel,
+  AlgorithmResult,
+  GraphType,
 )
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
 
-def fake_bfs(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+def fake_bfs(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     # we will need to receive this from the frontend
     start = req.start_node_id or nodes[0]
 
     # adjacency list
-    adj: Dict[int, List[tuple[int, int]]] = {n: [] for n in nodes}
-    for e in edges:
-        adj[e.from_node].append((e.to_node, e.id))
-        if req.graph_type == "undirected":
-            adj[e.to_node].append((e.from_node, e.id))
+    adj = graph.adjacency(req.graph_type == GraphType.undirected)
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
 
     visited_nodes: set[int] = set()
     visited_edges: set[int] = set()
     q = deque([start])
     visited_nodes.add(start)
 
+    # BFS levels = distances in hops
+    level: Dict[int, float] = {n: float('inf') for n in nodes}
+    level[start] = 0
+    parent: Dict[int, Optional[int]] = {n: None for n in nodes}
+    parent_edge: Dict[int, Optional[int]] = {n: None for n in nodes}
+
     steps: List[StepHighlight] = []
     step_index = 0
 
     # first step: highlight start
-    steps.append(
-        StepHighlight(
-            step_index=step_index,
-            total_steps=0,
-            algorithm=req.algorithm,
-            description=f"Start BFS at node {start}",
-            highlight_nodes=[start],
-            highlight_edges=[],
-            visited_nodes=sorted(visited_nodes),
-            visited_edges=sorted(visited_edges),
-        )
-    )
-    step_index += 1
-
-    while q:
-        u = q.popleft()
-
-        # step: visit u
+    if coarse:
         steps.append(
             StepHighlight(
                 step_index=step_index,
                 total_steps=0,
                 algorithm=req.algorithm,
-                description=f"Visit node {u}",
-                highlight_nodes=[u],
+                description=f"Start BFS at node {start}",
+                highlight_nodes=[start],
                 highlight_edges=[],
                 visited_nodes=sorted(visited_nodes),
                 visited_edges=sorted(visited_edges),
@@ -64,29 +58,97 @@ def fake_bfs(req: AlgorithmRunRequest) -> List[StepHighlight]:
         )
         step_index += 1
 
-        for v, edge_id in adj.get(u, []):
+    while q:
+        u = q.popleft()
+
+        # step: visit u
+        if coarse:
+            steps.append(
+                StepHighlight(
+                    step_index=step_index,
+                    total_steps=0,
+                    algorithm=req.algorithm,
+                    description=f"Visit node {u}",
+                    highlight_nodes=[u],
+                    highlight_edges=[],
+                    visited_nodes=sorted(visited_nodes),
+                    visited_edges=sorted(visited_edges),
+                )
+            )
+            step_index += 1
+
+        for v, _, edge_id in adj.get(u, []):
             if v not in visited_nodes:
                 visited_nodes.add(v)
                 visited_edges.add(edge_id)
+                level[v] = level[u] + 1
+                parent[v] = u
+                parent_edge[v] = edge_id
                 q.append(v)
 
-                steps.append(
-                    StepHighlight(
-                        step_index=step_index,
-                        total_steps=0,
-                        algorithm=req.algorithm,
-                        description=f"Discovered node {v} from {u}",
-                        highlight_nodes=[u, v],
-                        highlight_edges=[edge_id],
-                        visited_nodes=sorted(visited_nodes),
-                        visited_edges=sorted(visited_edges),
+                if verbose:
+                    steps.append(
+                        StepHighlight(
+                            step_index=step_index,
+                            total_steps=0,
+                            algorithm=req.algorithm,
+                            description=f"Discovered node {v} from {u}",
+                            highlight_nodes=[u, v],
+                            highlight_edges=[edge_id],
+                            visited_nodes=sorted(visited_nodes),
+                            visited_edges=sorted(visited_edges),
+                        )
                     )
-                )
-                step_index += 1
+                    step_index += 1
+
+    # summary level: a single step with the final state
+    if traced and not coarse:
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=f"BFS complete! Visited {len(visited_nodes)}/{len(nodes)} nodes.",
+                highlight_nodes=[],
+                highlight_edges=[],
+                visited_nodes=sorted(visited_nodes),
+                visited_edges=sorted(visited_edges),
+            )
+        )
+        step_index += 1
 
     total = len(steps)
     for i, s in enumerate(steps):
         s.step_index = i
         s.total_steps = total
 
-    return steps
\ No newline at end of file
+    result = build_result(
+        req, nodes, start, req.target_node_id,
+        dist=level,
+        parent=parent,
+        parent_edge=parent_edge,
+        tree_edges=sorted(visited_edges),
+        nodes_expanded=len(visited_nodes),
+    )
+    return steps, result
+
+
+def bfs_csr(indptr, targets, source: int) -> List[float]:
+    """
+        Non-tracing BFS over a CSR graph (see graph_store.CSR).
+    Returns the level (hops) of every position, inf if unreachable.
+    """
+    n = len(indptr) - 1
+    level = [float('inf')] * n
+    level[source] = 0.0
+    q = deque([source])
+
+    while q:
+        u = q.popleft()
+        for i in range(indptr[u], indptr[u + 1]):
+            v = targets[i]
+            if level[v] == float('inf'):
+                level[v] = level[u] + 1
+                q.append(v)
+
+    return level
@@ -0,0 +1,153 @@
+from typing import List
+
+import numpy as np
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+)
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
+
+
+def boruvka_rounds(u: np.ndarray, v: np.ndarray, rank: np.ndarray, n: int):
+    """
+        Borůvka over edge arrays (u, v are node positions, rank is a
+    unique order of the edges, i.e. ties already broken). Yields, per
+    round, (component count before the round, indexes of the edges
+    picked in the round). Every scan is a NumPy pass over all edges:
+
+    - each component takes the lowest ranked edge leaving it,
+    - every component points to the component across its edge; two
+      components that picked the same edge point at each other and the
+      smaller label becomes the root,
+    - pointer jumping gives the new label of every component.
+    """
+    comp = np.arange(n)
+    by_rank = np.argsort(rank)
+    none = len(rank)
+
+    while True:
+        cu, cv = comp[u], comp[v]
+        cross = cu != cv
+        if not cross.any():
+            return
+
+        best = np.full(n, none)
+        np.minimum.at(best, cu[cross], rank[cross])
+        np.minimum.at(best, cv[cross], rank[cross])
+        has_edge = best < none
+
+        labels = np.flatnonzero(has_edge)
+        picked = by_rank[best[labels]]
+        yield len(np.unique(comp)), np.unique(picked)
+
+        succ = np.arange(n)
+        other = np.where(cu[picked] == labels, cv[picked], cu[picked])
+        succ[labels] = other
+        mutual = (succ[succ] == np.arange(n)) & (np.arange(n) < succ)
+        succ[mutual] = np.flatnonzero(mutual)
+        while True:
+            jumped = succ[succ]
+            if np.array_equal(jumped, succ):
+                break
+            succ = jumped
+        comp = succ[comp]
+
+
+def fake_boruvka(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
+
+    if not nodes:
+        return [], AlgorithmResult(algorithm=req.algorithm)
+
+    edge_ids, u, v, w = graph.edge_arrays()
+    m = len(edge_ids)
+    # weight first, edge id breaks ties so every component has one cheapest edge
+    rank = np.empty(m, dtype=np.int64)
+    rank[np.lexsort((edge_ids, w))] = np.arange(m)
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
+    mst_edges: set[int] = set()
+    total_weight = 0
+    steps: List[StepHighlight] = []
+    step_index = 0
+
+    def push_step(
+        description: str,
+        highlight_nodes: List[int],
+        highlight_edges: List[int],
+    ):
+        nonlocal step_index
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=description,
+                highlight_nodes=highlight_nodes,
+                highlight_edges=highlight_edges,
+                visited_nodes=[],  # components are shown through the edges
+                visited_edges=sorted(mst_edges),
+            )
+        )
+        step_index += 1
+
+    if coarse:
+        push_step(
+            f"Start Borůvka's algorithm. Every node is its own component ({len(nodes)} components).",
+            [],
+            []
+        )
+
+    rounds = 0
+    for components, picked in boruvka_rounds(u, v, rank, len(nodes)):
+        rounds += 1
+
+        if verbose:
+            for i in picked.tolist():
+                push_step(
+                    f"Round {rounds}: edge {edge_ids[i]}: {nodes[u[i]]} ↔ {nodes[v[i]]} (weight: {w[i]}) is the cheapest edge leaving a component",
+                    [nodes[u[i]], nodes[v[i]]],
+                    [int(edge_ids[i])]
+                )
+
+        picked_ids = edge_ids[picked].tolist()
+        mst_edges.update(picked_ids)
+        total_weight += float(w[picked].sum())
+
+        if coarse:
+            push_step(
+                f"Round {rounds}: {components} components picked {len(picked_ids)} cheapest edges, {components - len(picked_ids)} components left.",
+                sorted({nodes[x] for x in np.concatenate([u[picked], v[picked]]).tolist()}),
+                picked_ids
+            )
+
+    if traced:
+        if len(mst_edges) == len(nodes) - 1:
+            summary = f"MST complete after {rounds} rounds! Total weight: {total_weight}"
+        else:
+            summary = f"MST incomplete. Spanning forest with {len(mst_edges)} edges after {rounds} rounds."
+        push_step(
+            summary,
+            [],
+            list(mst_edges)
+        )
+
+    total = len(steps)
+    for i, s in enumerate(steps):
+        s.step_index = i
+        s.total_steps = total
+
+    result = build_result(
+        req, nodes,
+        tree_edges=sorted(mst_edges),
+        total_weight=total_weight,
+    )
+    return steps, result
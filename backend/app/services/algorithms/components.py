@@ -0,0 +1,193 @@
+from typing import Dict, List
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    GraphType,
+)
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
+
+
+def connected_components(graph: PreparedGraph) -> Dict[int, int]:
+    """
+        Union-find over the edge list (path halving + union by size,
+    no recursion). Labels are 0, 1, ... in order of first node.
+    """
+    parent: Dict[int, int] = {n: n for n in graph.nodes}
+    size: Dict[int, int] = {n: 1 for n in graph.nodes}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v, _ in graph.edges.values():
+        ru, rv = find(u), find(v)
+        if ru == rv:
+            continue
+        if size[ru] < size[rv]:
+            ru, rv = rv, ru
+        parent[rv] = ru
+        size[ru] += size[rv]
+
+    labels: Dict[int, int] = {}
+    root_label: Dict[int, int] = {}
+    for n in graph.nodes:
+        root = find(n)
+        if root not in root_label:
+            root_label[root] = len(root_label)
+        labels[n] = root_label[root]
+    return labels
+
+
+def strongly_connected_components(graph: PreparedGraph) -> Dict[int, int]:
+    """
+        Tarjan's algorithm with an explicit stack of (node, next neighbor
+    index) instead of recursion, so deep graphs do not hit the recursion
+    limit. Labels are given in the order SCCs are completed (reverse
+    topological order of the condensation).
+    """
+    adj = graph.adjacency(False)
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    on_stack: set[int] = set()
+    stack: List[int] = []
+    labels: Dict[int, int] = {}
+    counter = 0
+    label = 0
+
+    for root in graph.nodes:
+        if root in index:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, 0)]
+
+        while work:
+            u, i = work[-1]
+            neighbors = adj[u]
+
+            if i < len(neighbors):
+                work[-1] = (u, i + 1)
+                v = neighbors[i][0]
+                if v not in index:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack.add(v)
+                    work.append((v, 0))
+                elif v in on_stack and index[v] < low[u]:
+                    low[u] = index[v]
+                continue
+
+            # all neighbors of u done
+            work.pop()
+            if work:
+                p = work[-1][0]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+
+            if low[u] == index[u]:
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    labels[w] = label
+                    if w == u:
+                        break
+                label += 1
+
+    return labels
+
+
+def fake_components(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
+
+    if not nodes:
+        return [], AlgorithmResult(algorithm=req.algorithm)
+
+    directed = req.graph_type == GraphType.directed
+    if directed:
+        labels = strongly_connected_components(graph)
+    else:
+        labels = connected_components(graph)
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+
+    count = max(labels.values()) + 1
+    kind = "strongly connected component" if directed else "connected component"
+
+    steps: List[StepHighlight] = []
+    step_index = 0
+
+    # a component step only carries its own nodes / edges (cumulative
+    # lists would make the trace O(components * V)), the last step all
+    def push_step(
+        description: str,
+        highlight_nodes: List[int],
+        highlight_edges: List[int],
+        visited_nodes: List[int],
+        visited_edges: List[int],
+    ):
+        nonlocal step_index
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=description,
+                highlight_nodes=highlight_nodes,
+                highlight_edges=highlight_edges,
+                visited_nodes=visited_nodes,
+                visited_edges=visited_edges,
+            )
+        )
+        step_index += 1
+
+    if coarse:
+        # one step per component: its nodes and the edges inside it
+        members: List[List[int]] = [[] for _ in range(count)]
+        inner: List[List[int]] = [[] for _ in range(count)]
+        for n in nodes:
+            members[labels[n]].append(n)
+        for edge_id, (u, v, _) in graph.edges.items():
+            if labels[u] == labels[v]:
+                inner[labels[u]].append(edge_id)
+
+        for label in range(count):
+            push_step(
+                f"{kind.capitalize()} {label + 1}/{count}: {len(members[label])} nodes",
+                members[label],
+                inner[label],
+                members[label],
+                inner[label],
+            )
+
+    if traced:
+        push_step(
+            f"Found {count} {kind}s.",
+            [],
+            [],
+            sorted(nodes),
+            sorted(e for e, (u, v, _) in graph.edges.items() if labels[u] == labels[v]),
+        )
+
+    total = len(steps)
+    for i, s in enumerate(steps):
+        s.step_index = i
+        s.total_steps = total
+
+    result = build_result(
+        req, nodes,
+        component_labels=[labels[n] for n in nodes],
+        nodes_expanded=len(nodes),
+    )
+    return steps, result
@@ -0,0 +1,371 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    GraphType,
+)
+from app.services.algorithms.bellmanford import fake_bellman_ford
+from app.services.algorithms.result import build_result, trace_path
+from app.services.graph_store import PreparedGraph
+
+
+def _kahn_order(graph: PreparedGraph) -> List[int]:
+    """
+        Kahn's algorithm over the directed edges, O(V + E). The order
+    misses the nodes on or after a cycle. Cached until the next edit.
+    """
+    key = ("kahn_order",)
+    if key not in graph.derived:
+        adj = graph.adjacency(False)
+        in_degree: Dict[int, int] = {n: 0 for n in graph.nodes}
+        for edges in adj.values():
+            for v, _, _ in edges:
+                in_degree[v] += 1
+
+        queue = deque(n for n in graph.nodes if in_degree[n] == 0)
+        order: List[int] = []
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for v, _, _ in adj[u]:
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    queue.append(v)
+        graph.derived[key] = order
+    return graph.derived[key]
+
+
+def topological_order(graph: PreparedGraph) -> Optional[List[int]]:
+    """None when the graph has a cycle."""
+    order = _kahn_order(graph)
+    return order if len(order) == len(graph.nodes) else None
+
+
+def find_cycle(graph: PreparedGraph) -> List[int]:
+    """
+        One directed cycle (first node repeated at the end), empty if
+    there is none. The nodes Kahn's algorithm can't order all have an
+    incoming arc from another one of them, so walking those arcs
+    backwards must close a loop.
+    """
+    ordered = set(_kahn_order(graph))
+    if len(ordered) == len(graph.nodes):
+        return []
+
+    radj = graph.reverse_adjacency()
+    current = next(n for n in graph.nodes if n not in ordered)
+    seen: Dict[int, int] = {}
+    walk: List[int] = []
+    while current not in seen:
+        seen[current] = len(walk)
+        walk.append(current)
+        current = next(u for u, _, _ in radj[current] if u not in ordered)
+
+    cycle = walk[seen[current]:] + [current]
+    cycle.reverse()
+    return cycle
+
+
+def fake_dag_relaxation(
+    req: AlgorithmRunRequest,
+    graph: PreparedGraph,
+    longest: bool = False,
+) -> tuple[List[StepHighlight], AlgorithmResult]:
+    """
+        Single source shortest (or longest) paths on a directed acyclic
+    graph: each node is relaxed once, in topological order, so O(V + E)
+    and negative weights are fine. Longest paths without a start node
+    start everywhere, and the result's path is the critical path (the
+    longest path in the graph). Raises ValueError if the graph has a
+    cycle.
+    """
+    nodes = graph.nodes
+
+    if not nodes:
+        return [], AlgorithmResult(algorithm=req.algorithm)
+
+    order = topological_order(graph)
+    if order is None:
+        raise ValueError("The graph has a cycle, it has no topological order")
+
+    adj = graph.adjacency(False)
+    # every node is a start for the critical path
+    critical = longest and req.start_node_id is None
+    start = None if critical else req.start_node_id or nodes[0]
+    # longest paths are shortest paths for the opposite order
+    sign = -1 if longest else 1
+    unreached = float('inf') * sign
+
+    dist: Dict[int, float] = {n: 0 if critical else unreached for n in nodes}
+    if start is not None:
+        dist[start] = 0
+    parent: Dict[int, Optional[int]] = {n: None for n in nodes}
+    parent_edge: Dict[int, Optional[int]] = {n: None for n in nodes}
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
+    visited_nodes: set[int] = set()
+    visited_edges: set[int] = set()
+    steps: List[StepHighlight] = []
+    step_index = 0
+    kind = "longest" if longest else "shortest"
+
+    def push_step(
+        description: str,
+        highlight_nodes: List[int],
+        highlight_edges: List[int],
+    ):
+        nonlocal step_index
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=description,
+                highlight_nodes=highlight_nodes,
+                highlight_edges=highlight_edges,
+                visited_nodes=sorted(visited_nodes),
+                visited_edges=sorted(visited_edges),
+            )
+        )
+        step_index += 1
+
+    if coarse and critical:
+        push_step(
+            f"Start DAG {kind} paths from every node. Nodes are relaxed once, in topological order.",
+            [],
+            []
+        )
+    elif coarse:
+        push_step(
+            f"Start DAG {kind} paths from node {start}. Nodes are relaxed once, in topological order.",
+            [start],
+            []
+        )
+
+    # nodes before start in the order can't be reached from it
+    if critical:
+        position = 0
+    else:
+        position = order.index(start) if graph.has_node(start) else len(order)
+    for u in order[position:]:
+        if dist[u] == unreached:
+            continue
+
+        # its distance is final once all its predecessors are done
+        visited_nodes.add(u)
+        if parent_edge[u] is not None:
+            visited_edges.add(parent_edge[u])
+
+        if coarse:
+            push_step(
+                f"Relax the edges of node {u} ({kind} distance {dist[u]})",
+                [u],
+                [parent_edge[u]] if parent_edge[u] is not None else []
+            )
+
+        for v, weight, edge_id in adj[u]:
+            new_dist = dist[u] + weight
+            if sign * new_dist < sign * dist[v]:
+                old_dist = dist[v] if dist[v] != unreached else None
+                dist[v] = new_dist
+                parent[v] = u
+                parent_edge[v] = edge_id
+
+                if not verbose:
+                    continue
+
+                if old_dist is None:
+                    push_step(
+                        f"Discover node {v} with distance {new_dist} via {u} → {v} (weight {weight})",
+                        [u, v],
+                        [edge_id]
+                    )
+                else:
+                    push_step(
+                        f"Update {kind} distance to node {v}: {old_dist} → {new_dist} via {u} → {v}",
+                        [u, v],
+                        [edge_id]
+                    )
+
+    # the critical path ends at the farthest node, the path to a target
+    # is filled by build_result
+    target = req.target_node_id
+    path: List[int] = []
+    path_edges: List[int] = []
+    if longest and visited_nodes and target is None:
+        target = max(visited_nodes, key=lambda n: (dist[n], -n))
+    if longest and target is not None and dist.get(target, unreached) != unreached:
+        first = target
+        while parent[first] is not None:
+            first = parent[first]
+        path, path_edges = trace_path(parent, parent_edge, first, target)
+
+    if traced:
+        reachable = [n for n in nodes if dist[n] != unreached]
+        unreachable = [n for n in nodes if dist[n] == unreached]
+
+        if path and critical:
+            summary = f"Critical path: {' → '.join(map(str, path))} (length {dist[target]})."
+        elif path and req.target_node_id is None:
+            summary = f"Longest path from node {start}: {' → '.join(map(str, path))} (length {dist[target]})."
+        else:
+            summary = f"DAG {kind} paths complete! Paths found to {len(reachable)}/{len(nodes)} nodes."
+        if unreachable:
+            summary += f" Unreachable: {unreachable}"
+
+        push_step(
+            summary,
+            path or reachable,
+            path_edges or list(visited_edges)
+        )
+
+    total = len(steps)
+    for i, s in enumerate(steps):
+        s.step_index = i
+        s.total_steps = total
+
+    # build_result marks infinite distances as unreachable
+    result = build_result(
+        req, nodes, start, target,
+        dist={n: abs(d) if d == unreached else d for n, d in dist.items()},
+        parent=parent,
+        parent_edge=parent_edge,
+        tree_edges=sorted(visited_edges),
+        engine="dag",
+        nodes_expanded=len(visited_nodes),
+    )
+    if path:
+        result.path, result.path_edges = path, path_edges
+        result.total_weight = dist[target]
+    return steps, result
+
+
+def _longest_bellman_ford(req: AlgorithmRunRequest, graph: PreparedGraph) -> AlgorithmResult:
+    """
+        Longest paths on a graph with cycles: Bellman-Ford on the negated
+    weights. Without a start node a virtual source with a 0 edge to
+    every node stands for "start everywhere", so the farthest node gives
+    the critical path like in fake_dag_relaxation.
+    """
+    negated = [(e, u, v, -w) for e, (u, v, w) in graph.edges.items()]
+    if req.start_node_id is not None:
+        _, result = fake_bellman_ford(req, PreparedGraph(graph.nodes, negated))
+        result.distances = [-d if d is not None else None for d in result.distances]
+        if result.total_weight is not None:
+            result.total_weight = -result.total_weight
+        return result
+
+    # not 0, a start of 0 reads as "no start"
+    source = max(max(graph.nodes) + 1, 1)
+    first_edge = max(graph.edges, default=-1) + 1
+    virtual = [(first_edge + i, source, n, 0.0) for i, n in enumerate(graph.nodes)]
+    _, found = fake_bellman_ford(
+        req.model_copy(update={"start_node_id": source, "target_node_id": None}),
+        PreparedGraph(graph.nodes + [source], negated + virtual),
+    )
+
+    nodes = graph.nodes
+    dist = {n: -d for n, d in zip(found.node_ids, found.distances) if n != source}
+    parent = {n: p if p != source else None for n, p in zip(found.node_ids, found.parents) if n != source}
+    parent_edge = {n: e if e is not None and e < first_edge else None for n, e in zip(found.node_ids, found.parent_edges) if n != source}
+
+    # with a positive cycle the parent pointers may loop, so no path
+    target = req.target_node_id
+    if target is None and not found.has_negative_cycle:
+        target = max(nodes, key=lambda n: (dist[n], -n))
+    path: List[int] = []
+    path_edges: List[int] = []
+    if target is not None and not found.has_negative_cycle and target in parent:
+        first = target
+        while parent[first] is not None:
+            first = parent[first]
+        path, path_edges = trace_path(parent, parent_edge, first, target)
+
+    result = build_result(
+        req, nodes, None, target,
+        dist=dist,
+        parent=parent,
+        parent_edge=parent_edge,
+        tree_edges=sorted(e for e in parent_edge.values() if e is not None),
+        has_negative_cycle=found.has_negative_cycle,
+        nodes_expanded=found.nodes_expanded,
+    )
+    if path:
+        result.path, result.path_edges = path, path_edges
+        result.total_weight = dist[target]
+    return result
+
+
+def fake_dag(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    """
+        Shortest or longest (req.longest) paths in a directed acyclic
+    graph. With a cycle it falls back to Bellman-Ford: shortest paths
+    as is, longest paths as shortest paths of the negated weights
+    (unbounded when a cycle has positive weight). The found cycle is
+    the first step and the result's engine_reason.
+    """
+    if req.graph_type != GraphType.directed:
+        raise ValueError("DAG paths need a directed graph")
+
+    if topological_order(graph) is not None:
+        return fake_dag_relaxation(req, graph, req.longest)
+
+    cycle = find_cycle(graph)
+    reason = f"the graph has a cycle ({' → '.join(map(str, cycle))}), ran Bellman-Ford"
+    if not req.longest:
+        steps, result = fake_bellman_ford(req, graph)
+    else:
+        result = _longest_bellman_ford(req.model_copy(update={"trace_level": TraceLevel.none}), graph)
+        critical = req.start_node_id is None
+        if critical:
+            reason += " from a virtual source linked to every node"
+        steps = []
+        if req.trace_level != TraceLevel.none:
+            if result.has_negative_cycle:
+                done = "⚠ A cycle has positive weight: longest paths are unbounded."
+            elif critical and result.path and req.target_node_id is None:
+                done = (
+                    f"Critical path: {' → '.join(map(str, result.path))} (length {result.total_weight}), "
+                    "found with Bellman-Ford on the negated weights."
+                )
+            else:
+                done = "Longest paths found with Bellman-Ford on the negated weights."
+            steps.append(StepHighlight(
+                step_index=0,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=done,
+                highlight_nodes=result.path,
+                highlight_edges=result.path_edges,
+                visited_nodes=[n for n, d in zip(result.node_ids, result.distances) if d is not None],
+                visited_edges=result.tree_edges,
+            ))
+
+    if req.trace_level != TraceLevel.none:
+        cycle_edges = [
+            next(e for v, _, e in graph.adjacency(False)[u] if v == w)
+            for u, w in zip(cycle, cycle[1:])
+        ]
+        steps.insert(0, StepHighlight(
+            step_index=0,
+            total_steps=0,
+            algorithm=req.algorithm,
+            description=f"✗ Cycle found: {' → '.join(map(str, cycle))}. No topological order, falling back to Bellman-Ford.",
+            highlight_nodes=cycle[:-1],
+            highlight_edges=cycle_edges,
+        ))
+        for i, s in enumerate(steps):
+            s.step_index = i
+            s.total_steps = len(steps)
+
+    result.engine = "bellmanford"
+    result.engine_reason = reason
+    return steps, result
@@ -1,27 +1,35 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from app.schemas.algorithm import (
   AlgorithmRunRequest,
   StepHighlight,
+  TraceLevel,
+  AlgorithmResult,
+  GraphType,
 )
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
 
-def fake_dfs(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+def fake_dfs(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     start = req.start_node_id or nodes[0]
 
-    adj: Dict[int, List[tuple[int, int]]] = {n: [] for n in nodes}
-    for e in edges:
-        adj[e.from_node].append((e.to_node, e.id))
-        if req.graph_type == "undirected":
-            adj[e.to_node].append((e.from_node, e.id))
+    adj = graph.adjacency(req.graph_type == GraphType.undirected)
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
 
     visited_nodes: set[int] = set()
     visited_edges: set[int] = set()
+    # DFS tree (the inner dfs() already uses "parent" as an argument)
+    tree_parent: Dict[int, Optional[int]] = {n: None for n in nodes}
+    tree_parent_edge: Dict[int, Optional[int]] = {n: None for n in nodes}
     steps: List[StepHighlight] = []
     step_index = 0
 
@@ -47,29 +55,51 @@ def fake_dfs(req: AlgorithmRunRequest) -> List[StepHighlight]:
 
     def dfs(u: int, parent: int | None = None, via_edge_id: int | None = None):
         visited_nodes.add(u)
+        tree_parent[u] = parent
+        tree_parent_edge[u] = via_edge_id
 
         if parent is None:
-            push_step(f"Start DFS at node {u}", [u], [])
+            if coarse:
+                push_step(f"Start DFS at node {u}", [u], [])
         else:
             if via_edge_id is not None:
                 visited_edges.add(via_edge_id)
-                push_step(
-                    f"DFS goes from {parent} to {u}",
-                    [parent, u],
-                    [via_edge_id],
-                )
-            else:
+                if coarse:
+                    push_step(
+                        f"DFS goes from {parent} to {u}",
+                        [parent, u],
+                        [via_edge_id],
+                    )
+            elif coarse:
                 push_step(f"Visit node {u}", [u], [])
 
-        for v, edge_id in adj.get(u, []):
+        for v, _, edge_id in adj.get(u, []):
             if v not in visited_nodes:
                 dfs(v, u, edge_id)
+            elif verbose and edge_id != via_edge_id:
+                # edge scans only in verbose, coarse keeps one step per node
+                push_step(f"Edge {u} → {v}: node {v} already visited", [u, v], [edge_id])
 
     dfs(start)
 
+    # summary level: a single step with the final state
+    if traced and not coarse:
+        push_step(
+            f"DFS complete! Visited {len(visited_nodes)}/{len(nodes)} nodes.",
+            [],
+            [],
+        )
+
     total = len(steps)
     for i, s in enumerate(steps):
         s.step_index = i
         s.total_steps = total
 
-    return steps
+    result = build_result(
+        req, nodes, start, req.target_node_id,
+        parent=tree_parent,
+        parent_edge=tree_parent_edge,
+        tree_edges=sorted(visited_edges),
+        nodes_expanded=len(visited_nodes),
+    )
+    return steps, result
@@ -4,36 +4,87 @@ import heapq
 from app.schemas.algorithm import (
     AlgorithmRunRequest,
     StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    GraphType,
+    DijkstraEngine,
 )
-
-def fake_dijkstra(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+from app.services.algorithms.result import build_result
+from app.services.algorithms.queues import HeapQueue, FifoQueue, BucketQueue, ZeroOneQueue
+from app.services.graph_store import PreparedGraph
+
+# above this, the empty buckets Dial scans cost more than the heap
+DIAL_MAX_WEIGHT = 64
+
+
+def select_engine(graph: PreparedGraph, requested: DijkstraEngine):
+    """
+        Picks the priority queue from the edge weights:
+    one positive weight -> FIFO (plain BFS), only 0 / 1 -> 0-1 BFS
+    deque, small non-negative integers -> Dial's buckets, anything
+    else -> binary heap. An explicit engine is checked against the
+    weights. Returns (engine, queue).
+    """
+    weights = [w for _, _, w in graph.edges.values()]
+    integer = all(w >= 0 and float(w).is_integer() for w in weights)
+    max_weight = int(max(weights, default=0)) if integer else None
+    uniform = len(set(weights)) <= 1 and min(weights, default=1) > 0
+
+    if requested == DijkstraEngine.auto:
+        if uniform:
+            requested = DijkstraEngine.bfs
+        elif integer and max_weight <= 1:
+            requested = DijkstraEngine.zero_one
+        elif integer and max_weight <= DIAL_MAX_WEIGHT:
+            requested = DijkstraEngine.dial
+        else:
+            requested = DijkstraEngine.heap
+
+    if requested == DijkstraEngine.bfs:
+        if not uniform:
+            raise ValueError("The bfs engine needs all weights equal and positive")
+        return requested, FifoQueue()
+    if requested == DijkstraEngine.zero_one:
+        if not (integer and max_weight <= 1):
+            raise ValueError("The zero_one engine needs weights 0 or 1")
+        return requested, ZeroOneQueue()
+    if requested == DijkstraEngine.dial:
+        if not integer:
+            raise ValueError("The dial engine needs non-negative integer weights")
+        return requested, BucketQueue(max_weight)
+    return requested, HeapQueue()
+
+
+def fake_dijkstra(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     start = req.start_node_id or nodes[0]
 
     # Build adjacency list with weights
-    adj: Dict[int, List[tuple[int, int, int]]] = {n: [] for n in nodes}
-    for e in edges:
-        adj[e.from_node].append((e.to_node, e.weight, e.id))
-        if req.graph_type == "undirected":
-            adj[e.to_node].append((e.from_node, e.weight, e.id))
+    adj = graph.adjacency(req.graph_type == GraphType.undirected)
 
     # Initialize distances and parent tracking
     dist: Dict[int, float] = {n: float('inf') for n in nodes}
     dist[start] = 0
+    parent: Dict[int, Optional[int]] = {n: None for n in nodes}
     parent_edge: Dict[int, Optional[int]] = {n: None for n in nodes}
 
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
     visited_nodes: set[int] = set()
     visited_edges: set[int] = set()
     steps: List[StepHighlight] = []
     step_index = 0
 
     # Priority queue: (distance, node_id)
-    pq = [(0, start)]
+    engine, pq = select_engine(graph, req.engine)
+    pq.push(0, start)
 
     def push_step(
         description: str,
@@ -55,14 +106,16 @@ def fake_dijkstra(req: AlgorithmRunRequest) -> List[StepHighlight]:
         )
         step_index += 1
 
-    push_step(
-        f"Start Dijkstra's algorithm from node {start}. Initialize distance to 0.",
-        [start],
-        []
-    )
+    if coarse:
+        queue = "" if engine == DijkstraEngine.heap else f" ({engine.value} queue)"
+        push_step(
+            f"Start Dijkstra's algorithm{queue} from node {start}. Initialize distance to 0.",
+            [start],
+            []
+        )
 
     while pq:
-        current_dist, u = heapq.heappop(pq)
+        current_dist, u = pq.pop()
 
         # Skip if already visited
         if u in visited_nodes:
@@ -74,11 +127,12 @@ def fake_dijkstra(req: AlgorithmRunRequest) -> List[StepHighlight]:
         if parent_edge[u] is not None:
             visited_edges.add(parent_edge[u])
         
-        push_step(
-            f"Visit node {u} with shortest distance {current_dist}",
-            [u],
-            [parent_edge[u]] if parent_edge[u] is not None else []
-        )
+        if coarse:
+            push_step(
+                f"Visit node {u} with shortest distance {current_dist}",
+                [u],
+                [parent_edge[u]] if parent_edge[u] is not None else []
+            )
 
         # Check all neighbors
         for v, weight, edge_id in adj.get(u, []):
@@ -89,9 +143,13 @@ def fake_dijkstra(req: AlgorithmRunRequest) -> List[StepHighlight]:
                     # Found a shorter path
                     old_dist = dist[v] if dist[v] != float('inf') else None
                     dist[v] = new_dist
+                    parent[v] = u
                     parent_edge[v] = edge_id
-                    heapq.heappush(pq, (new_dist, v))
-                    
+                    pq.push(new_dist, v)
+
+                    if not verbose:
+                        continue
+
                     if old_dist is None:
                         push_step(
                             f"Discover node {v} with distance {new_dist} via {u} → {v} (weight {weight})",
@@ -106,22 +164,63 @@ def fake_dijkstra(req: AlgorithmRunRequest) -> List[StepHighlight]:
                         )
 
     # Final step showing all shortest paths
-    reachable = [n for n in nodes if dist[n] != float('inf')]
-    unreachable = [n for n in nodes if dist[n] == float('inf')]
-    
-    summary = f"Dijkstra's complete! Shortest paths found to {len(reachable)}/{len(nodes)} nodes."
-    if unreachable:
-        summary += f" Unreachable: {unreachable}"
-    
-    push_step(
-        summary,
-        reachable,
-        list(visited_edges)
-    )
+    if traced:
+        reachable = [n for n in nodes if dist[n] != float('inf')]
+        unreachable = [n for n in nodes if dist[n] == float('inf')]
+
+        summary = f"Dijkstra's complete! Shortest paths found to {len(reachable)}/{len(nodes)} nodes."
+        if unreachable:
+            summary += f" Unreachable: {unreachable}"
+
+        push_step(
+            summary,
+            reachable,
+            list(visited_edges)
+        )
 
     total = len(steps)
     for i, s in enumerate(steps):
         s.step_index = i
         s.total_steps = total
 
-    return steps
\ No newline at end of file
+    result = build_result(
+        req, nodes, start, req.target_node_id,
+        dist=dist,
+        parent=parent,
+        parent_edge=parent_edge,
+        tree_edges=sorted(visited_edges),
+        engine=engine.value,
+        nodes_expanded=len(visited_nodes),
+    )
+    return steps, result
+
+def dijkstra_csr(indptr, targets, weights, source: int, target: Optional[int] = None) -> List[float]:
+    """
+        Non-tracing Dijkstra over a CSR graph (see graph_store.CSR).
+    Works on positions, not node ids, and only returns the distances.
+    indptr / targets / weights can be lists, arrays or memoryviews
+    (the all-pairs workers pass views over shared memory).
+    With a target, stops as soon as it is settled.
+    """
+    n = len(indptr) - 1
+    dist = [float('inf')] * n
+    dist[source] = 0.0
+    done = [False] * n
+    pq = [(0.0, source)]
+
+    while pq:
+        d, u = heapq.heappop(pq)
+        if done[u]:
+            continue
+        done[u] = True
+        if u == target:
+            break
+
+        for i in range(indptr[u], indptr[u + 1]):
+            v = targets[i]
+            nd = d + weights[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+
+    return dist
@@ -0,0 +1,439 @@
+from typing import Dict, List, Optional
+from collections import deque
+import heapq
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    AlgorithmName,
+    GraphType,
+    GraphEdit,
+    GraphEditOp,
+)
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
+
+# algorithms whose previous result can be repaired after an edit
+SHORTEST_PATH_TREE = {AlgorithmName.bfs, AlgorithmName.dijkstra}
+SPANNING_TREE = {AlgorithmName.kruskal, AlgorithmName.prim}
+
+
+def _negative_weights(graph: PreparedGraph, edits: List[GraphEdit]) -> bool:
+    """A negative weight in the graph or set by one of the edits."""
+    _, _, _, weights = graph.edge_arrays()
+    if len(weights) and weights.min() < 0:
+        return True
+    for edit in edits:
+        weight = edit.edge.weight if edit.op == GraphEditOp.add_edge and edit.edge else edit.weight
+        if weight is not None and weight < 0:
+            return True
+    return False
+
+
+def can_repair(req: AlgorithmRunRequest, graph: PreparedGraph, result: AlgorithmResult, edits: List[GraphEdit]) -> bool:
+    """
+        The Dijkstra repair only propagates decreases, which never ends
+    on a negative cycle: negative weights are recomputed instead (BFS
+    ignores weights).
+    """
+    if req.algorithm in SHORTEST_PATH_TREE:
+        if req.algorithm == AlgorithmName.dijkstra and _negative_weights(graph, edits):
+            return False
+        return bool(result.distances)
+    if req.algorithm == AlgorithmName.prim:
+        # Prim only spans the start component, the repair keeps a forest
+        return len(result.tree_edges) == len(result.node_ids) - 1
+    return req.algorithm == AlgorithmName.kruskal
+
+
+def _describe(edit: GraphEdit) -> str:
+    if edit.op == GraphEditOp.add_node:
+        return f"Add node {edit.node.id}"
+    if edit.op == GraphEditOp.remove_node:
+        return f"Remove node {edit.node_id}"
+    if edit.op == GraphEditOp.add_edge:
+        e = edit.edge
+        return f"Add edge {e.id}: {e.from_node} → {e.to_node} (weight {e.weight})"
+    if edit.op == GraphEditOp.remove_edge:
+        return f"Remove edge {edit.edge_id}"
+    return f"Set weight of edge {edit.edge_id} to {edit.weight}"
+
+
+def _expand(graph: PreparedGraph, edit: GraphEdit) -> List[GraphEdit]:
+    """A node removal is the removal of its edges, then of the node."""
+    if edit.op != GraphEditOp.remove_node or not graph.has_node(edit.node_id):
+        return [edit]
+    return [
+        GraphEdit(op=GraphEditOp.remove_edge, edge_id=edge_id)
+        for edge_id in graph.incident_edges(edit.node_id)
+    ] + [edit]
+
+
+class ShortestPathTreeRepair:
+    """
+        Ramalingam-Reps style repair of a single-source shortest path
+    tree. A cheaper (or new) edge only propagates decreases from its head.
+    A more expensive (or removed) tree edge resets the subtree below it,
+    seeds it from its unaffected in-neighbors and reruns Dijkstra only
+    over that subtree. Edges that are not in the tree and get more
+    expensive change nothing.
+
+    BFS is the same with every weight equal to 1.
+    """
+    def __init__(self, req: AlgorithmRunRequest, graph: PreparedGraph, result: AlgorithmResult):
+        self.graph = graph
+        self.start = result.start_node_id
+        self.both = req.graph_type == GraphType.undirected
+        self.unit = req.algorithm == AlgorithmName.bfs
+        self.dist: Dict[int, float] = {
+            n: float('inf') if d is None else d
+            for n, d in zip(result.node_ids, result.distances)
+        }
+        self.parent: Dict[int, Optional[int]] = dict(zip(result.node_ids, result.parents))
+        self.parent_edge: Dict[int, Optional[int]] = dict(zip(result.node_ids, result.parent_edges))
+        self.changed: set[int] = set()
+
+    def _w(self, w: float) -> float:
+        return 1.0 if self.unit else w
+
+    def _arcs(self, edge_id: int) -> List[tuple[int, int, float]]:
+        u, v, w = self.graph.edges[edge_id]
+        arcs = [(u, v, self._w(w))]
+        if self.both and u != v:
+            arcs.append((v, u, self._w(w)))
+        return arcs
+
+    def _incoming(self, x: int):
+        if self.both:
+            return self.graph.adjacency(True)[x]
+        return self.graph.reverse_adjacency()[x]
+
+    def _propagate(self, pq: List[tuple[float, int]]):
+        out = self.graph.adjacency(self.both)
+        while pq:
+            d, x = heapq.heappop(pq)
+            if d > self.dist[x]:
+                continue
+            for y, w, edge_id in out[x]:
+                nd = d + self._w(w)
+                if nd < self.dist[y]:
+                    self.dist[y] = nd
+                    self.parent[y] = x
+                    self.parent_edge[y] = edge_id
+                    self.changed.add(y)
+                    heapq.heappush(pq, (nd, y))
+
+    def edge_cheaper(self, edge_id: int):
+        pq = []
+        for u, v, w in self._arcs(edge_id):
+            if self.dist[u] + w < self.dist[v]:
+                self.dist[v] = self.dist[u] + w
+                self.parent[v] = u
+                self.parent_edge[v] = edge_id
+                self.changed.add(v)
+                heapq.heappush(pq, (self.dist[v], v))
+        self._propagate(pq)
+
+    def edge_dearer(self, edge_id: int, endpoints: tuple[int, int]):
+        """The edge got more expensive or was removed (already applied)."""
+        heads = [n for n in endpoints if self.parent_edge.get(n) == edge_id]
+        if not heads:
+            return
+
+        children: Dict[int, List[int]] = {}
+        for n, p in self.parent.items():
+            if p is not None:
+                children.setdefault(p, []).append(n)
+
+        affected: set[int] = set()
+        stack = list(heads)
+        while stack:
+            x = stack.pop()
+            if x in affected:
+                continue
+            affected.add(x)
+            stack.extend(children.get(x, []))
+
+        for x in affected:
+            self.dist[x] = float('inf')
+            self.parent[x] = None
+            self.parent_edge[x] = None
+
+        pq = []
+        for x in affected:
+            for y, w, eid in self._incoming(x):
+                if y not in affected and self.dist[y] + self._w(w) < self.dist[x]:
+                    self.dist[x] = self.dist[y] + self._w(w)
+                    self.parent[x] = y
+                    self.parent_edge[x] = eid
+            if self.dist[x] != float('inf'):
+                heapq.heappush(pq, (self.dist[x], x))
+
+        self.changed |= affected
+        self._propagate(pq)
+
+    def apply(self, edit: GraphEdit) -> List[int]:
+        """Applies the edit to the graph and repairs. Returns changed nodes."""
+        self.changed = set()
+        graph = self.graph
+
+        if edit.op == GraphEditOp.add_node:
+            graph.apply_edit(edit)
+            n = edit.node.id
+            self.dist[n] = float('inf')
+            self.parent[n] = None
+            self.parent_edge[n] = None
+        elif edit.op == GraphEditOp.remove_node:
+            graph.apply_edit(edit)
+            for d in (self.dist, self.parent, self.parent_edge):
+                d.pop(edit.node_id, None)
+        elif edit.op == GraphEditOp.add_edge:
+            graph.apply_edit(edit)
+            self.edge_cheaper(edit.edge.id)
+        elif edit.op == GraphEditOp.remove_edge:
+            u, v, _ = graph.edges.get(edit.edge_id, (None, None, None))
+            graph.apply_edit(edit)
+            self.edge_dearer(edit.edge_id, (u, v))
+        else:
+            u, v, old = graph.edges.get(edit.edge_id, (None, None, None))
+            graph.apply_edit(edit)
+            new = graph.edges[edit.edge_id][2]
+            if new < old:
+                self.edge_cheaper(edit.edge_id)
+            elif new > old:
+                self.edge_dearer(edit.edge_id, (u, v))
+
+        return sorted(self.changed)
+
+
+class SpanningTreeRepair:
+    """
+        Minimum spanning forest repair. A new or cheaper edge closes a
+    cycle with the tree and replaces the heaviest edge on it (cycle
+    property). A removed or dearer tree edge splits its tree in two and
+    the cheapest edge across that cut reconnects it (cut property).
+    Nothing else can change the forest.
+    """
+    def __init__(self, req: AlgorithmRunRequest, graph: PreparedGraph, result: AlgorithmResult):
+        self.graph = graph
+        self.tree: set[int] = set(result.tree_edges)
+        self.changed: List[int] = []
+
+    def _tree_adj(self) -> Dict[int, List[tuple[int, int]]]:
+        adj: Dict[int, List[tuple[int, int]]] = {n: [] for n in self.graph.nodes}
+        for edge_id in self.tree:
+            u, v, _ = self.graph.edges[edge_id]
+            adj[u].append((v, edge_id))
+            adj[v].append((u, edge_id))
+        return adj
+
+    def _side(self, adj, root: int) -> set[int]:
+        seen = {root}
+        q = deque([root])
+        while q:
+            x = q.popleft()
+            for y, _ in adj[x]:
+                if y not in seen:
+                    seen.add(y)
+                    q.append(y)
+        return seen
+
+    def edge_cheaper(self, edge_id: int):
+        if edge_id in self.tree:
+            return
+        u, v, w = self.graph.edges[edge_id]
+        if u == v:
+            return
+
+        # tree path u -> v, remembering the edge used to reach each node
+        adj = self._tree_adj()
+        via: Dict[int, Optional[tuple[int, int]]] = {u: None}
+        q = deque([u])
+        while q and v not in via:
+            x = q.popleft()
+            for y, eid in adj[x]:
+                if y not in via:
+                    via[y] = (x, eid)
+                    q.append(y)
+
+        if v not in via:
+            # joins two trees of the forest
+            self.tree.add(edge_id)
+            self.changed.append(edge_id)
+            return
+
+        heaviest = None
+        x = v
+        while via[x] is not None:
+            x, eid = via[x]
+            if heaviest is None or self.graph.edges[eid][2] > self.graph.edges[heaviest][2]:
+                heaviest = eid
+
+        if w < self.graph.edges[heaviest][2]:
+            self.tree.discard(heaviest)
+            self.tree.add(edge_id)
+            self.changed.extend([heaviest, edge_id])
+
+    def edge_dearer(self, edge_id: int, endpoints: tuple[int, int]):
+        if edge_id not in self.tree:
+            return
+        self.tree.discard(edge_id)
+        self.changed.append(edge_id)
+
+        u, v = endpoints
+        adj = self._tree_adj()
+        side_u = self._side(adj, u)
+        side_v = self._side(adj, v)
+
+        best = None
+        for eid, (a, b, w) in self.graph.edges.items():
+            if (a in side_u and b in side_v) or (a in side_v and b in side_u):
+                if best is None or w < self.graph.edges[best][2]:
+                    best = eid
+
+        if best is not None:
+            self.tree.add(best)
+            if best != edge_id:
+                self.changed.append(best)
+            else:
+                self.changed.remove(edge_id)
+
+    def apply(self, edit: GraphEdit) -> List[int]:
+        """Applies the edit to the graph and repairs. Returns swapped edges."""
+        self.changed = []
+        graph = self.graph
+
+        if edit.op in (GraphEditOp.add_node, GraphEditOp.remove_node):
+            graph.apply_edit(edit)
+        elif edit.op == GraphEditOp.add_edge:
+            graph.apply_edit(edit)
+            self.edge_cheaper(edit.edge.id)
+        elif edit.op == GraphEditOp.remove_edge:
+            u, v, _ = graph.edges.get(edit.edge_id, (None, None, None))
+            graph.apply_edit(edit)
+            self.edge_dearer(edit.edge_id, (u, v))
+        else:
+            u, v, old = graph.edges.get(edit.edge_id, (None, None, None))
+            graph.apply_edit(edit)
+            new = graph.edges[edit.edge_id][2]
+            if new < old:
+                self.edge_cheaper(edit.edge_id)
+            elif new > old:
+                self.edge_dearer(edit.edge_id, (u, v))
+
+        return self.changed
+
+
+def repair_run(
+    req: AlgorithmRunRequest,
+    graph: PreparedGraph,
+    result: AlgorithmResult,
+    edits: List[GraphEdit],
+) -> tuple[List[StepHighlight], AlgorithmResult, int]:
+    """
+        Applies the edits to graph (in place) and repairs the previous
+    result. Returns (delta steps, new result, number of changed items).
+    """
+    spt = req.algorithm in SHORTEST_PATH_TREE
+    if spt and any(
+        e.op == GraphEditOp.remove_node and e.node_id == result.start_node_id
+        for e in edits
+    ):
+        raise ValueError("Cannot remove the start node of the run")
+
+    repair = (ShortestPathTreeRepair if spt else SpanningTreeRepair)(req, graph, result)
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
+    steps: List[StepHighlight] = []
+    step_index = 0
+    changed_total: set[int] = set()
+
+    def push_step(
+        description: str,
+        highlight_nodes: List[int],
+        highlight_edges: List[int],
+    ):
+        nonlocal step_index
+        if spt:
+            visited_nodes = [n for n in graph.nodes if repair.dist[n] != float('inf')]
+            visited_edges = sorted(e for e in repair.parent_edge.values() if e is not None)
+        else:
+            visited_nodes = []
+            visited_edges = sorted(repair.tree)
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=description,
+                highlight_nodes=highlight_nodes,
+                highlight_edges=highlight_edges,
+                visited_nodes=visited_nodes,
+                visited_edges=visited_edges,
+            )
+        )
+        step_index += 1
+
+    for edit in edits:
+        for part in _expand(graph, edit):
+            changed = repair.apply(part)
+            changed_total.update(changed)
+
+            if not coarse:
+                continue
+            if spt:
+                push_step(
+                    f"{_describe(part)}: {len(changed)} nodes get a new distance.",
+                    changed,
+                    [repair.parent_edge[n] for n in changed if repair.parent_edge.get(n) is not None],
+                )
+                if verbose:
+                    for n in changed:
+                        d = repair.dist[n]
+                        push_step(
+                            f"Node {n}: distance {d if d != float('inf') else '∞'}"
+                            + (f" via {repair.parent[n]}" if repair.parent[n] is not None else ""),
+                            [n],
+                            [repair.parent_edge[n]] if repair.parent_edge[n] is not None else [],
+                        )
+            else:
+                push_step(
+                    f"{_describe(part)}: {len(changed)} MST edges swapped.",
+                    [],
+                    changed,
+                )
+
+    if spt:
+        new_result = build_result(
+            req, graph.nodes, repair.start, req.target_node_id,
+            dist=repair.dist,
+            parent=repair.parent,
+            parent_edge=repair.parent_edge,
+            tree_edges=sorted(e for e in repair.parent_edge.values() if e is not None),
+            engine="incremental",
+        )
+        summary = f"Shortest path tree repaired, {len(changed_total)} nodes changed."
+    else:
+        new_result = build_result(
+            req, graph.nodes, result.start_node_id,
+            tree_edges=sorted(repair.tree),
+            total_weight=sum(graph.edges[e][2] for e in repair.tree),
+            engine="incremental",
+        )
+        summary = f"MST repaired, {len(changed_total)} edges changed. Total weight: {new_result.total_weight}"
+
+    if traced:
+        push_step(summary, [], [])
+
+    total = len(steps)
+    for i, s in enumerate(steps):
+        s.step_index = i
+        s.total_steps = total
+
+    return steps, new_result, len(changed_total)
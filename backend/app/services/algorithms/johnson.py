@@ -0,0 +1,241 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    AlgorithmName,
+    GraphType,
+)
+from app.services.algorithms.bellmanford import fake_bellman_ford
+from app.services.algorithms.dijkstra import fake_dijkstra
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
+
+
+def johnson_potentials(graph: PreparedGraph, both_directions: bool) -> Optional[Dict[int, float]]:
+    """
+        Bellman-Ford (the existing module, without trace) from a virtual
+    source linked to every node with 0-weight edges. Returns the
+    potentials h, or None if there is a negative cycle. Cached until the
+    next edit, so runs from several starts (batch compute) share them.
+    """
+    key = ("johnson_potentials", both_directions)
+    if key not in graph.derived:
+        graph.derived[key] = _potentials(graph, both_directions)
+    return graph.derived[key]
+
+
+def _potentials(graph: PreparedGraph, both_directions: bool) -> Optional[Dict[int, float]]:
+    nodes = graph.nodes
+    virtual = max(nodes, default=0) + 1
+    next_id = max(graph.edges, default=0) + 1
+
+    edges = []
+    for edge_id, u, v, w in graph.edge_list():
+        edges.append((edge_id, u, v, w))
+        # Bellman-Ford relaxes edges one way only
+        if both_directions:
+            edges.append((next_id, v, u, w))
+            next_id += 1
+    for n in nodes:
+        edges.append((next_id, virtual, n, 0.0))
+        next_id += 1
+
+    augmented = PreparedGraph(nodes + [virtual], edges)
+    bf_req = AlgorithmRunRequest(
+        algorithm=AlgorithmName.bellmanford,
+        graph_type=GraphType.directed,
+        start_node_id=virtual,
+        trace_level=TraceLevel.none,
+    )
+    _, bf = fake_bellman_ford(bf_req, augmented)
+    if bf.has_negative_cycle:
+        return None
+
+    return {n: d for n, d in zip(bf.node_ids, bf.distances) if n != virtual}
+
+
+def reweight(graph: PreparedGraph, h: Dict[int, float]) -> PreparedGraph:
+    """
+        w'(u, v) = w + h(u) - h(v), which is >= 0. Clamped at 0 to
+    drop float noise. Edge ids are kept.
+    """
+    return PreparedGraph(
+        graph.nodes,
+        (
+            (edge_id, u, v, max(0.0, w + h[u] - h[v]))
+            for edge_id, u, v, w in graph.edge_list()
+        ),
+    )
+
+
+def johnson_all_pairs(
+    graph: PreparedGraph,
+    both_directions: bool,
+    sources: List[int],
+    workers: Optional[int] = None,
+) -> tuple[Optional[np.ndarray], Optional[Dict[int, float]]]:
+    """
+        Rows of the distance matrix for the given sources, plus the
+    potentials. (None, None) if there is a negative cycle.
+    """
+    # imported here, all_pairs also dispatches to this module
+    from app.services.all_pairs import multi_source_distances
+
+    h = johnson_potentials(graph, both_directions)
+    if h is None:
+        return None, None
+
+    reweighted = reweight(graph, h)
+    matrix = multi_source_distances(reweighted, both_directions, sources, workers=workers)
+
+    # d(s, v) = d'(s, v) - h(s) + h(v)
+    hv = np.array([h[n] for n in graph.nodes])
+    hs = np.array([h[s] for s in sources])
+    matrix += hv[None, :] - hs[:, None]
+    return matrix, h
+
+
+def fake_johnson(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    """
+        Single-source run: the potentials, then one Dijkstra from the
+    start on the reweighted graph (with parents, so the path to the
+    target is there). The full matrix is /all-pairs with method johnson.
+    """
+    nodes = graph.nodes
+
+    if not nodes:
+        return [], AlgorithmResult(algorithm=req.algorithm)
+
+    start = req.start_node_id or nodes[0]
+    both_directions = req.graph_type == GraphType.undirected
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+
+    steps: List[StepHighlight] = []
+    step_index = 0
+
+    def push_step(
+        description: str,
+        highlight_nodes: List[int],
+        highlight_edges: List[int],
+        visited_nodes: Optional[List[int]] = None,
+        visited_edges: Optional[List[int]] = None,
+    ):
+        nonlocal step_index
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=description,
+                highlight_nodes=highlight_nodes,
+                highlight_edges=highlight_edges,
+                visited_nodes=visited_nodes or [],
+                visited_edges=visited_edges or [],
+            )
+        )
+        step_index += 1
+
+    if coarse:
+        push_step(
+            f"Start Johnson's algorithm. Add a virtual source with 0-weight edges to all {len(nodes)} nodes.",
+            [],
+            []
+        )
+
+    h = johnson_potentials(graph, both_directions)
+
+    if h is None:
+        if traced:
+            push_step(
+                "⚠ Negative cycle detected by Bellman-Ford. Shortest paths are undefined.",
+                [],
+                []
+            )
+        result = AlgorithmResult(
+            algorithm=req.algorithm,
+            start_node_id=start,
+            node_ids=nodes,
+            has_negative_cycle=True,
+        )
+    else:
+        if coarse:
+            negative = [n for n in nodes if h[n] < 0]
+            push_step(
+                f"Bellman-Ford from the virtual source gives the potentials h. {len(negative)} nodes have h < 0.",
+                negative,
+                []
+            )
+            changed = [
+                edge_id for edge_id, u, v, _ in graph.edge_list()
+                if h[u] != h[v]
+            ]
+            push_step(
+                "Reweight edges: w'(u, v) = w(u, v) + h(u) - h(v), now all weights are non-negative.",
+                [],
+                changed
+            )
+
+        _, found = fake_dijkstra(
+            req.model_copy(update={
+                "algorithm": AlgorithmName.dijkstra,
+                "start_node_id": start,
+                "target_node_id": None,
+                "trace_level": TraceLevel.none,
+            }),
+            reweight(graph, h),
+        )
+
+        # d(s, v) = d'(s, v) - h(s) + h(v)
+        dist = {
+            n: float('inf') if d is None else d - h[start] + h[n]
+            for n, d in zip(found.node_ids, found.distances)
+        }
+        parent = dict(zip(found.node_ids, found.parents))
+        parent_edge = dict(zip(found.node_ids, found.parent_edges))
+        reached = [n for n in nodes if dist[n] != float('inf')]
+
+        if coarse:
+            push_step(
+                f"Dijkstra from node {start} on the reweighted graph: reached {len(reached)}/{len(nodes)} nodes.",
+                [start],
+                [],
+                reached,
+                found.tree_edges,
+            )
+
+        result = build_result(
+            req, nodes, start, req.target_node_id,
+            dist=dist,
+            parent=parent,
+            parent_edge=parent_edge,
+            tree_edges=found.tree_edges,
+            # one per node for the potentials + the nodes Dijkstra settled
+            nodes_expanded=len(nodes) + found.nodes_expanded,
+        )
+
+        if traced:
+            summary = f"Johnson's complete! Shortest paths found to {len(reached)}/{len(nodes)} nodes."
+            if result.path:
+                summary += f" Path to {req.target_node_id}: {' → '.join(map(str, result.path))} (weight {result.total_weight})."
+            push_step(
+                summary,
+                result.path or reached,
+                result.path_edges or found.tree_edges,
+                reached,
+                found.tree_edges,
+            )
+
+    total = len(steps)
+    for i, s in enumerate(steps):
+        s.step_index = i
+        s.total_steps = total
+
+    return steps, result
@@ -3,14 +3,18 @@ from typing import Dict, List
 from app.schemas.algorithm import (
     AlgorithmRunRequest,
     StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
 )
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
 
-def fake_kruskal(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+def fake_kruskal(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
+    edges = graph.edge_list()
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     # Union-Find data structure
     parent: Dict[int, int] = {n: n for n in nodes}
@@ -39,7 +43,13 @@ def fake_kruskal(req: AlgorithmRunRequest) -> List[StepHighlight]:
         
         return True
 
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
     mst_edges: set[int] = set()
+    total_weight = 0
     steps: List[StepHighlight] = []
     step_index = 0
 
@@ -64,52 +74,69 @@ def fake_kruskal(req: AlgorithmRunRequest) -> List[StepHighlight]:
         step_index += 1
 
     # Sort edges by weight
-    sorted_edges = sorted(edges, key=lambda e: e.weight)
-
-    push_step(
-        "Start Kruskal's algorithm. Sorted all edges by weight.",
-        [],
-        []
-    )
+    sorted_edges = sorted(edges, key=lambda e: e[3])
 
-    for edge in sorted_edges:
-        u, v = edge.from_node, edge.to_node
-        
+    if coarse:
         push_step(
-            f"Consider edge {edge.id}: {u} ↔ {v} (weight: {edge.weight})",
-            [u, v],
-            [edge.id]
+            "Start Kruskal's algorithm. Sorted all edges by weight.",
+            [],
+            []
         )
 
-        if find(u) != find(v):
-            # Add edge to MST
-            union(u, v)
-            mst_edges.add(edge.id)
-            
+    for edge_id, u, v, weight in sorted_edges:
+        
+        if verbose:
             push_step(
-                f"✓ Add edge {edge.id} to MST (connects different components)",
+                f"Consider edge {edge_id}: {u} ↔ {v} (weight: {weight})",
                 [u, v],
-                [edge.id]
+                [edge_id]
             )
-        else:
+
+        if find(u) != find(v):
+            # Add edge to MST
+            union(u, v)
+            mst_edges.add(edge_id)
+            total_weight += weight
+
+            if coarse:
+                push_step(
+                    f"✓ Add edge {edge_id} to MST (connects different components)",
+                    [u, v],
+                    [edge_id]
+                )
+        elif verbose:
             push_step(
-                f"✗ Skip edge {edge.id} (would create a cycle)",
+                f"✗ Skip edge {edge_id} (would create a cycle)",
                 [u, v],
-                [edge.id]
+                [edge_id]
             )
 
         # Stop if we have n-1 edges (complete MST)
         if len(mst_edges) == len(nodes) - 1:
-            push_step(
-                f"MST complete! Total weight: {sum(e.weight for e in edges if e.id in mst_edges)}",
-                [],
-                list(mst_edges)
-            )
+            if traced:
+                push_step(
+                    f"MST complete! Total weight: {total_weight}",
+                    [],
+                    list(mst_edges)
+                )
             break
 
+    # summary level: a disconnected graph never reaches the "complete" step
+    if traced and not coarse and not steps:
+        push_step(
+            f"MST incomplete. Spanning forest with {len(mst_edges)} edges.",
+            [],
+            list(mst_edges)
+        )
+
     total = len(steps)
     for i, s in enumerate(steps):
         s.step_index = i
         s.total_steps = total
 
-    return steps
\ No newline at end of file
+    result = build_result(
+        req, nodes,
+        tree_edges=sorted(mst_edges),
+        total_weight=total_weight,
+    )
+    return steps, result
\ No newline at end of file
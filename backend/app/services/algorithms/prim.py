@@ -1,27 +1,59 @@
-from typing import Dict, List, Optional
+from typing import List
 import heapq
 
+import numpy as np
+
 from app.schemas.algorithm import (
     AlgorithmRunRequest,
     StepHighlight,
+    TraceLevel,
+    AlgorithmResult,
+    GraphType,
 )
+from app.services.algorithms.result import build_result
+from app.services.graph_store import PreparedGraph
+
+# the array version is used from this average degree (2E / V) ...
+DENSE_PRIM_DEGREE = 64
+# ... and this density (E / (V (V - 1) / 2)), below it the O(V) argmin
+# per added node costs more than the heap
+DENSE_PRIM_DENSITY = 0.001
+
+
+def select_engine(graph: PreparedGraph) -> str:
+    """
+        "array" (O(V^2 + E), one argmin over the keys per added node)
+    on dense graphs, "heap" (O(E log E)) otherwise.
+    """
+    n = len(graph.nodes)
+    m = len(graph.edges)
+    if n < 2:
+        return "heap"
+    dense = 2 * m / n >= DENSE_PRIM_DEGREE and m / (n * (n - 1) / 2) >= DENSE_PRIM_DENSITY
+    return "array" if dense else "heap"
+
+
+def fake_prim(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    if select_engine(graph) == "array":
+        return prim_array(req, graph)
+    return prim_heap(req, graph)
+
 
-def fake_prim(req: AlgorithmRunRequest) -> List[StepHighlight]:
-    nodes = [n.id for n in req.nodes]
-    edges = req.edges
+def prim_heap(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    nodes = graph.nodes
 
     if not nodes:
-        return []
+        return [], AlgorithmResult(algorithm=req.algorithm)
 
     start = req.start_node_id or nodes[0]
 
-    # Build adjacency list with weights
-    adj: Dict[int, List[tuple[int, int, int]]] = {n: [] for n in nodes}
-    for e in edges:
-        adj[e.from_node].append((e.to_node, e.weight, e.id))
-        # Prim's works on undirected graphs, so add both directions
-        if req.graph_type != "directed":
-            adj[e.to_node].append((e.from_node, e.weight, e.id))
+    # Prim's works on undirected graphs, so add both directions
+    adj = graph.adjacency(req.graph_type != GraphType.directed)
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
 
     mst_nodes: set[int] = set()
     mst_edges: set[int] = set()
@@ -53,17 +85,18 @@ def fake_prim(req: AlgorithmRunRequest) -> List[StepHighlight]:
 
     # Start with the start node
     mst_nodes.add(start)
-    push_step(
-        f"Start Prim's algorithm from node {start}. Add to MST.",
-        [start],
-        []
-    )
+    if coarse:
+        push_step(
+            f"Start Prim's algorithm from node {start}. Add to MST.",
+            [start],
+            []
+        )
 
     # Add all edges from start node to priority queue
     for neighbor, weight, edge_id in adj.get(start, []):
         heapq.heappush(pq, (weight, start, neighbor, edge_id))
     
-    if pq:
+    if pq and verbose:
         push_step(
             f"Add all edges from node {start} to priority queue.",
             [start],
@@ -77,11 +110,12 @@ def fake_prim(req: AlgorithmRunRequest) -> List[StepHighlight]:
 
         # Skip if both nodes already in MST
         if to_node in mst_nodes:
-            push_step(
-                f"✗ Skip edge {edge_id}: {from_node} ↔ {to_node} (weight: {weight}) - would create cycle",
-                [from_node, to_node],
-                [edge_id]
-            )
+            if verbose:
+                push_step(
+                    f"✗ Skip edge {edge_id}: {from_node} ↔ {to_node} (weight: {weight}) - would create cycle",
+                    [from_node, to_node],
+                    [edge_id]
+                )
             continue
 
         # Add edge to MST
@@ -89,18 +123,19 @@ def fake_prim(req: AlgorithmRunRequest) -> List[StepHighlight]:
         mst_edges.add(edge_id)
         total_weight += weight
 
-        push_step(
-            f"✓ Add edge {edge_id}: {from_node} ↔ {to_node} (weight: {weight}) to MST",
-            [from_node, to_node],
-            [edge_id]
-        )
+        if coarse:
+            push_step(
+                f"✓ Add edge {edge_id}: {from_node} ↔ {to_node} (weight: {weight}) to MST",
+                [from_node, to_node],
+                [edge_id]
+            )
 
         # Add all edges from newly added node to priority queue
         for neighbor, w, eid in adj.get(to_node, []):
             if neighbor not in mst_nodes:
                 heapq.heappush(pq, (w, to_node, neighbor, eid))
 
-        if len(mst_nodes) < len(nodes):
+        if len(mst_nodes) < len(nodes) and verbose:
             push_step(
                 f"Add edges from node {to_node} to priority queue.",
                 [to_node],
@@ -108,13 +143,13 @@ def fake_prim(req: AlgorithmRunRequest) -> List[StepHighlight]:
             )
 
     # Check if MST is complete
-    if len(mst_nodes) == len(nodes):
+    if traced and len(mst_nodes) == len(nodes):
         push_step(
             f"MST complete! Total weight: {total_weight}",
             [],
             list(mst_edges)
         )
-    else:
+    elif traced:
         unreachable = [n for n in nodes if n not in mst_nodes]
         push_step(
             f"MST incomplete. Unreachable nodes: {unreachable}",
@@ -127,4 +162,163 @@ def fake_prim(req: AlgorithmRunRequest) -> List[StepHighlight]:
         s.step_index = i
         s.total_steps = total
 
-    return steps
\ No newline at end of file
+    result = build_result(
+        req, nodes, start,
+        tree_edges=sorted(mst_edges),
+        total_weight=total_weight,
+        nodes_expanded=len(mst_nodes),
+        engine="heap",
+    )
+    return steps, result
+
+
+def prim_array(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    """
+        Prim's with a key array instead of a heap: key[x] is the
+    cheapest edge from the tree to x, the next node is its argmin.
+    Each added node only updates the keys of its own edges (a slice of
+    the edges sorted by node), so the total is O(V^2 + E) without a
+    V x V matrix.
+    """
+    nodes = graph.nodes
+
+    if not nodes:
+        return [], AlgorithmResult(algorithm=req.algorithm)
+
+    start = req.start_node_id or nodes[0]
+    if not graph.has_node(start):
+        return prim_heap(req, graph)
+    n = len(nodes)
+
+    # outgoing edges per node position, both directions unless directed
+    edge_ids, u, v, w = graph.edge_arrays()
+    if req.graph_type != GraphType.directed:
+        src, dst, eid, wt = np.concatenate([u, v]), np.concatenate([v, u]), np.concatenate([edge_ids, edge_ids]), np.concatenate([w, w])
+    else:
+        src, dst, eid, wt = u, v, edge_ids, w
+    order = np.argsort(src, kind="stable")
+    dst, eid, wt = dst[order], eid[order], wt[order]
+    first = np.searchsorted(src[order], np.arange(n + 1))
+
+    # which steps are kept (see TraceLevel)
+    traced = req.trace_level != TraceLevel.none
+    coarse = traced and req.trace_level != TraceLevel.summary
+    verbose = req.trace_level == TraceLevel.verbose
+
+    mst_nodes: set[int] = set()
+    mst_edges: set[int] = set()
+    steps: List[StepHighlight] = []
+    step_index = 0
+
+    # nodes already in the tree keep an infinite key
+    key = np.full(n, np.inf)
+    key_edge = np.full(n, -1, dtype=np.int64)
+    key_from = np.full(n, -1, dtype=np.int64)
+    in_tree = np.zeros(n, dtype=bool)
+
+    def push_step(
+        description: str,
+        highlight_nodes: List[int],
+        highlight_edges: List[int],
+    ):
+        nonlocal step_index
+        steps.append(
+            StepHighlight(
+                step_index=step_index,
+                total_steps=0,
+                algorithm=req.algorithm,
+                description=description,
+                highlight_nodes=highlight_nodes,
+                highlight_edges=highlight_edges,
+                visited_nodes=sorted(mst_nodes),
+                visited_edges=sorted(mst_edges),
+            )
+        )
+        step_index += 1
+
+    def add_node(x: int) -> int:
+        """Puts node position x in the tree, returns how many keys dropped."""
+        in_tree[x] = True
+        key[x] = np.inf
+        mst_nodes.add(nodes[x])
+
+        lo, hi = first[x], first[x + 1]
+        d, e, ws = dst[lo:hi], eid[lo:hi], wt[lo:hi]
+        better = ~in_tree[d] & (ws < key[d])
+        d, e, ws = d[better], e[better], ws[better]
+        np.minimum.at(key, d, ws)
+        hit = ws == key[d]
+        key_edge[d[hit]] = e[hit]
+        key_from[d[hit]] = x
+        return len(np.unique(d))
+
+    updated = add_node(nodes.index(start))
+    if coarse:
+        push_step(
+            f"Start Prim's algorithm (array of keys) from node {start}. Add to MST.",
+            [start],
+            []
+        )
+    if updated and verbose:
+        push_step(
+            f"Set the keys of {updated} neighbors of node {start}.",
+            [start],
+            []
+        )
+
+    total_weight = 0
+
+    while len(mst_nodes) < n:
+        x = int(np.argmin(key))
+        if key[x] == np.inf:
+            break
+
+        weight = float(key[x])
+        edge_id = int(key_edge[x])
+        from_node, to_node = nodes[key_from[x]], nodes[x]
+        mst_edges.add(edge_id)
+        total_weight += weight
+        updated = add_node(x)
+
+        if coarse:
+            push_step(
+                f"✓ Add edge {edge_id}: {from_node} ↔ {to_node} (weight: {weight}) to MST",
+                [from_node, to_node],
+                [edge_id]
+            )
+
+        if updated and len(mst_nodes) < n and verbose:
+            push_step(
+                f"Lower the keys of {updated} neighbors of node {to_node}.",
+                [to_node],
+                []
+            )
+
+    # Check if MST is complete
+    if traced and len(mst_nodes) == n:
+        push_step(
+            f"MST complete! Total weight: {total_weight}",
+            [],
+            list(mst_edges)
+        )
+    elif traced:
+        unreachable = [node for node in nodes if node not in mst_nodes]
+        push_step(
+            f"MST incomplete. Unreachable nodes: {unreachable}",
+            list(mst_nodes),
+            list(mst_edges)
+        )
+
+    total = len(steps)
+    for i, s in enumerate(steps):
+        s.step_index = i
+        s.total_steps = total
+
+    result = build_result(
+        req, nodes, start,
+        tree_edges=sorted(mst_edges),
+        total_weight=total_weight,
+        nodes_expanded=len(mst_nodes),
+        engine="array",
+    )
+    return steps, result
\ No newline at end of file
@@ -0,0 +1,92 @@
+import heapq
+from collections import deque
+from typing import List
+
+
+class HeapQueue:
+    """
+        Binary heap (heapq), works for any non-negative weights.
+    Ties are popped by smallest node id.
+    """
+    def __init__(self):
+        self._heap: List[tuple[float, int]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def push(self, dist: float, node: int):
+        heapq.heappush(self._heap, (dist, node))
+
+    def pop(self) -> tuple[float, int]:
+        return heapq.heappop(self._heap)
+
+
+class FifoQueue:
+    """
+        Plain BFS queue: every edge has the same positive weight, so
+    nodes are pushed in non-decreasing distance order and a FIFO pops
+    them in the right order.
+    """
+    def __init__(self):
+        self._deque: deque = deque()
+
+    def __bool__(self) -> bool:
+        return bool(self._deque)
+
+    def push(self, dist: float, node: int):
+        self._deque.append((dist, node))
+
+    def pop(self) -> tuple[float, int]:
+        return self._deque.popleft()
+
+
+class BucketQueue:
+    """
+        Dial's algorithm: integer weights in [0, max_weight]. All keys in
+    the queue are within max_weight of the last popped one, so a circular
+    array of max_weight + 1 buckets is enough. Push and pop are O(1)
+    (plus the scan over empty buckets). Ties are popped in push order.
+    """
+    def __init__(self, max_weight: int):
+        self._buckets: List[deque] = [deque() for _ in range(max_weight + 1)]
+        self._size = 0
+        self._current = 0
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def push(self, dist: float, node: int):
+        self._buckets[int(dist) % len(self._buckets)].append((dist, node))
+        self._size += 1
+
+    def pop(self) -> tuple[float, int]:
+        n = len(self._buckets)
+        while not self._buckets[self._current % n]:
+            self._current += 1
+        self._size -= 1
+        return self._buckets[self._current % n].popleft()
+
+
+class ZeroOneQueue:
+    """
+        0-1 BFS: weights are only 0 or 1, so the queue only ever holds
+    keys d and d + 1. A deque is enough: key d goes to the front,
+    d + 1 to the back.
+    """
+    def __init__(self):
+        self._deque: deque = deque()
+        self._current = 0.0
+
+    def __bool__(self) -> bool:
+        return bool(self._deque)
+
+    def push(self, dist: float, node: int):
+        if dist <= self._current:
+            self._deque.appendleft((dist, node))
+        else:
+            self._deque.append((dist, node))
+
+    def pop(self) -> tuple[float, int]:
+        dist, node = self._deque.popleft()
+        self._current = dist
+        return dist, node
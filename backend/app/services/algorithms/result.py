@@ -0,0 +1,108 @@
+from typing import Dict, List, Optional
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmResult,
+)
+
+
+def trace_path(
+    parent: Dict[int, Optional[int]],
+    parent_edge: Dict[int, Optional[int]],
+    start: int,
+    target: int,
+) -> tuple[List[int], List[int]]:
+    """
+        Walks the parent pointers back from target to start.
+    Returns empty lists if target was not reached.
+    """
+    if target != start and parent.get(target) is None:
+        return [], []
+
+    path_nodes = [target]
+    path_edges: List[int] = []
+    current = target
+    while current != start:
+        path_edges.append(parent_edge[current])
+        current = parent[current]
+        path_nodes.append(current)
+
+    path_nodes.reverse()
+    path_edges.reverse()
+    return path_nodes, path_edges
+
+
+def build_result(
+    req: AlgorithmRunRequest,
+    nodes: List[int],
+    start: Optional[int] = None,
+    target: Optional[int] = None,
+    dist: Optional[Dict[int, float]] = None,
+    parent: Optional[Dict[int, Optional[int]]] = None,
+    parent_edge: Optional[Dict[int, Optional[int]]] = None,
+    **extra,
+) -> AlgorithmResult:
+    """
+        Turns the dicts used inside the algorithms into the
+    compact arrays of AlgorithmResult. Anything else (tree_edges,
+    total_weight, ...) is passed through extra.
+    """
+    result = AlgorithmResult(
+        algorithm=req.algorithm,
+        start_node_id=start,
+        target_node_id=target,
+        node_ids=nodes,
+        **extra,
+    )
+
+    if dist is not None:
+        result.distances = [
+            dist[n] if dist[n] != float('inf') else None for n in nodes
+        ]
+    if parent is not None:
+        result.parents = [parent[n] for n in nodes]
+    if parent_edge is not None:
+        result.parent_edges = [parent_edge[n] for n in nodes]
+
+    if (
+        target is not None
+        and start is not None
+        and parent is not None
+        and parent_edge is not None
+        and target in parent
+        and not result.path
+    ):
+        result.path, result.path_edges = trace_path(parent, parent_edge, start, target)
+        if dist is not None and result.path and result.total_weight is None:
+            result.total_weight = dist[target]
+
+    return result
+
+
+def with_target(result: AlgorithmResult, target: Optional[int]) -> AlgorithmResult:
+    """
+        Same single-source result, but with the path to another
+    target. Used by the batch compute to share one run per start node.
+    """
+    out = result.model_copy(update={
+        "target_node_id": target,
+        "path": [],
+        "path_edges": [],
+        "total_weight": None,
+    })
+    if (
+        target is None
+        or result.start_node_id is None
+        or result.has_negative_cycle
+        or target not in result.node_ids
+    ):
+        return out
+
+    i = result.node_ids.index(target)
+    if result.distances and result.distances[i] is not None:
+        out.total_weight = result.distances[i]
+    if result.parents:
+        parent = dict(zip(result.node_ids, result.parents))
+        parent_edge = dict(zip(result.node_ids, result.parent_edges))
+        out.path, out.path_edges = trace_path(parent, parent_edge, result.start_node_id, target)
+    return out
@@ -0,0 +1,184 @@
+import math
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.schemas.algorithm import AllPairsMethod
+from app.services.algorithms.bfs import bfs_csr
+from app.services.algorithms.dijkstra import dijkstra_csr
+from app.services.graph_store import PreparedGraph
+from app.services.worker_pool import Attached, SharedBlocks, get_pool, pool_size
+
+# Floyd-Warshall keeps a V x V float64 matrix (3000 nodes = 72 MB)
+FLOYD_WARSHALL_MAX_NODES = 3000
+# below this many sources the pool costs more than it saves
+MIN_SOURCES_FOR_POOL = 64
+
+
+class DistanceMatrix:
+    def __init__(
+        self,
+        method: AllPairsMethod,
+        node_ids: List[int],
+        sources: List[int],
+        matrix: np.ndarray,
+        has_negative_cycle: bool = False,
+    ):
+        self.method = method
+        self.node_ids = node_ids
+        self.sources = sources
+        self.matrix = matrix
+        self.has_negative_cycle = has_negative_cycle
+
+    def rows(self, offset: int, limit: int) -> List[List[Optional[float]]]:
+        chunk = self.matrix[offset:offset + limit]
+        return [
+            [d if math.isfinite(d) else None for d in row]
+            for row in chunk.tolist()
+        ]
+
+
+# ---- worker side -----------------------------------------------------
+# The pool is shared by all requests (see worker_pool), so each task
+# attaches to the request's shared CSR by name and closes it when done.
+
+def _solve_rows(
+    names: Dict[str, str],
+    n: int,
+    method: AllPairsMethod,
+    first_row: int,
+    sources: List[int],
+):
+    with Attached(names) as shared:
+        indptr = shared.cast("indptr", "q")
+        targets = shared.cast("targets", "q")
+        weights = shared.cast("weights", "d")
+        out = shared.cast("out", "d")
+        for i, s in enumerate(sources):
+            if method == AllPairsMethod.bfs:
+                dist = bfs_csr(indptr, targets, s)
+            else:
+                dist = dijkstra_csr(indptr, targets, weights, s)
+            row = first_row + i
+            out[row * n:(row + 1) * n] = array("d", dist)
+
+
+# ---- parent side -----------------------------------------------------
+
+def pool_workers(method: AllPairsMethod, sources: int, workers: Optional[int] = None) -> int:
+    """How many worker processes a run uses (1 = in the server process)."""
+    if method == AllPairsMethod.floyd_warshall or sources < MIN_SOURCES_FOR_POOL:
+        return 1
+    return min(workers or pool_size(), pool_size())
+
+
+def multi_source_distances(
+    graph: PreparedGraph,
+    both_directions: bool,
+    sources: List[int],
+    method: AllPairsMethod = AllPairsMethod.dijkstra,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+        One Dijkstra / BFS per source. The CSR and the output matrix
+    live in shared memory, so workers neither copy the graph nor send
+    rows back through pickling. workers caps how many pool processes
+    the request uses.
+    """
+    csr = graph.csr(both_directions)
+    n = len(graph.nodes)
+    positions = [csr.index[s] for s in sources]
+
+    if method == AllPairsMethod.dijkstra and any(w < 0 for w in csr.weights):
+        raise ValueError("Dijkstra needs non-negative weights, use floyd_warshall or johnson")
+
+    workers = pool_workers(method, len(sources), workers)
+    if workers == 1:
+        matrix = np.empty((len(sources), n), dtype=np.float64)
+        for row, s in enumerate(positions):
+            if method == AllPairsMethod.bfs:
+                matrix[row] = bfs_csr(csr.indptr, csr.targets, s)
+            else:
+                matrix[row] = dijkstra_csr(csr.indptr, csr.targets, csr.weights, s)
+        return matrix
+
+    with SharedBlocks() as shared:
+        shared.add("indptr", csr.indptr.tobytes())
+        shared.add("targets", csr.targets.tobytes())
+        shared.add("weights", csr.weights.tobytes())
+        shared.add("out", bytes(len(sources) * n * 8))
+
+        # a few chunks per worker so slow sources even out
+        chunk = max(1, math.ceil(len(positions) / (workers * 4)))
+        pool = get_pool()
+        futures = [
+            pool.submit(_solve_rows, shared.names, n, method, first, positions[first:first + chunk])
+            for first in range(0, len(positions), chunk)
+        ]
+        for f in futures:
+            f.result()
+
+        # copy out before the shared block is closed
+        return np.frombuffer(shared.buffer("out"), dtype=np.float64, count=len(sources) * n).reshape(len(sources), n).copy()
+
+
+def floyd_warshall(
+    graph: PreparedGraph,
+    both_directions: bool,
+    sources: List[int],
+) -> tuple[np.ndarray, bool]:
+    """
+        O(V^3) but every k iteration is a single NumPy operation.
+    Handles negative weights; returns (rows of sources, negative cycle).
+    """
+    n = len(graph.nodes)
+    if n > FLOYD_WARSHALL_MAX_NODES:
+        raise ValueError(
+            f"Floyd-Warshall is limited to {FLOYD_WARSHALL_MAX_NODES} nodes, use dijkstra"
+        )
+
+    csr = graph.csr(both_directions)
+    rows = np.repeat(np.arange(n), np.diff(np.frombuffer(csr.indptr, dtype=np.int64)))
+    cols = np.frombuffer(csr.targets, dtype=np.int64)
+    weights = np.frombuffer(csr.weights, dtype=np.float64)
+
+    dist = np.full((n, n), np.inf)
+    # parallel edges: keep the lightest one
+    np.minimum.at(dist, (rows, cols), weights)
+    np.fill_diagonal(dist, np.minimum(dist.diagonal(), 0.0))
+
+    for k in range(n):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+
+    has_negative_cycle = bool((dist.diagonal() < 0).any())
+    return dist[[csr.index[s] for s in sources]], has_negative_cycle
+
+
+def compute_all_pairs(
+    graph: PreparedGraph,
+    both_directions: bool,
+    method: AllPairsMethod,
+    sources: Optional[List[int]] = None,
+    workers: Optional[int] = None,
+) -> DistanceMatrix:
+    if sources is None:
+        sources = list(graph.nodes)
+    unknown = [s for s in sources if s not in graph.csr(both_directions).index]
+    if unknown:
+        raise ValueError(f"Unknown source nodes: {unknown}")
+
+    has_negative_cycle = False
+    if method == AllPairsMethod.floyd_warshall:
+        matrix, has_negative_cycle = floyd_warshall(graph, both_directions, sources)
+    elif method == AllPairsMethod.johnson:
+        from app.services.algorithms.johnson import johnson_all_pairs
+
+        matrix, h = johnson_all_pairs(graph, both_directions, sources, workers)
+        if h is None:
+            has_negative_cycle = True
+            matrix = np.full((len(sources), len(graph.nodes)), np.nan)
+    else:
+        matrix = multi_source_distances(graph, both_directions, sources, method, workers)
+
+    return DistanceMatrix(method, list(graph.nodes), sources, matrix, has_negative_cycle)
@@ -0,0 +1,224 @@
+import heapq
+import time
+from typing import Dict, List, Optional
+
+from app.services.graph_store import PreparedGraph
+
+# (weight, middle node for shortcuts / None, original edge id / None)
+Arc = tuple[float, Optional[int], Optional[int]]
+
+# witness searches give up after this many settled nodes; a missed
+# witness only costs an extra shortcut, never a wrong distance
+WITNESS_SETTLE_LIMIT = 40
+
+
+class ContractionHierarchy:
+    """
+        Contraction hierarchy of a static graph. Nodes are contracted
+    one by one (lazy edge-difference ordering) and shortcuts keep the
+    distances of the remaining graph. A query is then a bidirectional
+    Dijkstra that only goes "up" in the order, which settles a tiny
+    part of the graph.
+
+    Built for one orientation (both_directions=True for undirected).
+    Needs non-negative weights.
+    """
+    def __init__(self, graph: PreparedGraph, both_directions: bool):
+        started = time.perf_counter()
+        self.version = graph.version
+        self.rank: Dict[int, int] = {}
+        self.up_out: Dict[int, Dict[int, Arc]] = {n: {} for n in graph.nodes}
+        self.up_in: Dict[int, Dict[int, Arc]] = {n: {} for n in graph.nodes}
+        self.shortcut_count = 0
+
+        out: Dict[int, Dict[int, Arc]] = {n: {} for n in graph.nodes}
+        inn: Dict[int, Dict[int, Arc]] = {n: {} for n in graph.nodes}
+
+        def add_arc(u: int, v: int, arc: Arc):
+            if u != v and (v not in out[u] or arc[0] < out[u][v][0]):
+                out[u][v] = arc
+                inn[v][u] = arc
+
+        for edge_id, (u, v, w) in graph.edges.items():
+            if w < 0:
+                raise ValueError("Contraction hierarchies need non-negative weights")
+            add_arc(u, v, (w, None, edge_id))
+            if both_directions:
+                add_arc(v, u, (w, None, edge_id))
+
+        def witness_dist(source: int, skip: int, limit: float, targets) -> Dict[int, float]:
+            dist = {source: 0.0}
+            pq = [(0.0, source)]
+            settled = 0
+            remaining = len(targets)
+            while pq and settled < WITNESS_SETTLE_LIMIT:
+                d, x = heapq.heappop(pq)
+                if d > dist[x]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                if x in targets:
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+                for y, (w, _, _) in out[x].items():
+                    if y == skip:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(y, float('inf')):
+                        dist[y] = nd
+                        heapq.heappush(pq, (nd, y))
+            return dist
+
+        def needed_shortcuts(v: int) -> List[tuple[int, int, float]]:
+            shortcuts = []
+            for u, (w_uv, _, _) in inn[v].items():
+                targets = {
+                    x: w_uv + w_vx
+                    for x, (w_vx, _, _) in out[v].items()
+                    if x != u
+                }
+                if not targets:
+                    continue
+                dist = witness_dist(u, v, max(targets.values()), targets)
+                for x, need in targets.items():
+                    if dist.get(x, float('inf')) > need:
+                        shortcuts.append((u, x, need))
+            return shortcuts
+
+        contracted_neighbors: Dict[int, int] = {n: 0 for n in graph.nodes}
+
+        def priority(v: int) -> tuple[int, List[tuple[int, int, float]]]:
+            shortcuts = needed_shortcuts(v)
+            removed = len(inn[v]) + len(out[v])
+            # edge difference, plus spreading contractions over the graph
+            return 2 * len(shortcuts) - removed + 2 * contracted_neighbors[v], shortcuts
+
+        pq = [(priority(n)[0], n) for n in graph.nodes]
+        heapq.heapify(pq)
+
+        while pq:
+            _, v = heapq.heappop(pq)
+            # lazy update: re-evaluate, contract only if still the best
+            p, shortcuts = priority(v)
+            if pq and p > pq[0][0]:
+                heapq.heappush(pq, (p, v))
+                continue
+
+            for u, x, weight in shortcuts:
+                add_arc(u, x, (weight, v, None))
+                self.shortcut_count += 1
+
+            self.rank[v] = len(self.rank)
+            # every remaining neighbor gets a higher rank than v
+            self.up_out[v] = dict(out[v])
+            self.up_in[v] = dict(inn[v])
+            for u in inn[v]:
+                del out[u][v]
+                contracted_neighbors[u] += 1
+            for x in out[v]:
+                del inn[x][v]
+                contracted_neighbors[x] += 1
+            out[v] = {}
+            inn[v] = {}
+
+        self.build_seconds = time.perf_counter() - started
+
+    def _unpack(self, u: int, v: int, arc: Arc, nodes: List[int], edges: List[int]):
+        """Appends the original edges (and nodes after u) of arc u -> v."""
+        _, middle, edge_id = arc
+        if middle is None:
+            edges.append(edge_id)
+            nodes.append(v)
+            return
+        # the two halves were arcs of middle when it was contracted
+        self._unpack(u, middle, self.up_in[middle][u], nodes, edges)
+        self._unpack(middle, v, self.up_out[middle][v], nodes, edges)
+
+    def query(self, source: int, target: int) -> tuple[Optional[float], List[int], List[int], int]:
+        """
+            Returns (distance or None, path nodes, path edges, settled nodes).
+        """
+        if source not in self.rank or target not in self.rank:
+            raise ValueError("Unknown source or target node")
+
+        dist = ({source: 0.0}, {target: 0.0})
+        parent: tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+        queues = ([(0.0, source)], [(0.0, target)])
+        done = (set(), set())
+        # forward search uses arcs up_out, backward search arcs up_in
+        arcs = (self.up_out, self.up_in)
+
+        best = float('inf')
+        meeting = None
+        settled = 0
+
+        while queues[0] or queues[1]:
+            for side in (0, 1):
+                pq = queues[side]
+                if not pq:
+                    continue
+                d, x = heapq.heappop(pq)
+                if x in done[side] or d > dist[side][x]:
+                    continue
+                if d >= best:
+                    pq.clear()
+                    continue
+                done[side].add(x)
+                settled += 1
+
+                other = dist[1 - side].get(x)
+                if other is not None and d + other < best:
+                    best = d + other
+
+                for y, (w, _, _) in arcs[side][x].items():
+                    nd = d + w
+                    if nd < dist[side].get(y, float('inf')):
+                        dist[side][y] = nd
+                        parent[side][y] = x
+                        heapq.heappush(pq, (nd, y))
+
+        # pick the meeting node from the final labels, so the
+        # reported distance matches the unpacked path
+        for x, d in dist[0].items():
+            other = dist[1].get(x)
+            if other is not None and (meeting is None or d + other < best):
+                best = d + other
+                meeting = x
+
+        if meeting is None:
+            return None, [], [], settled
+
+        # source ... meeting
+        chain = [meeting]
+        while chain[-1] != source:
+            chain.append(parent[0][chain[-1]])
+        chain.reverse()
+        # meeting ... target
+        x = meeting
+        while x != target:
+            x = parent[1][x]
+            chain.append(x)
+
+        nodes = [source]
+        edges: List[int] = []
+        for u, v in zip(chain, chain[1:]):
+            # u -> v is an up arc of u or a down arc (up_in) of v
+            arc = self.up_out[u][v] if self.rank[v] > self.rank[u] else self.up_in[v][u]
+            self._unpack(u, v, arc, nodes, edges)
+
+        return best, nodes, edges, settled
+
+
+def build_hierarchy(graph: PreparedGraph, both_directions: bool) -> ContractionHierarchy:
+    """
+        Builds the hierarchy and keeps it on the graph (cleared on edit).
+    """
+    ch = ContractionHierarchy(graph, both_directions)
+    graph.derived[("contraction_hierarchy", both_directions)] = ch
+    return ch
+
+
+def get_hierarchy(graph: PreparedGraph, both_directions: bool) -> Optional[ContractionHierarchy]:
+    return graph.derived.get(("contraction_hierarchy", both_directions))
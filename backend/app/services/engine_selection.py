@@ -0,0 +1,112 @@
+"""
+    Fast path for shortest path requests: a cheap look at the graph
+(weights, acyclicity, density) picks the fastest engine that still
+gives the requested algorithm's answer. The run keeps the requested
+algorithm name on its steps / result; result.engine and
+result.engine_reason say what actually ran and why.
+"""
+from typing import Callable, List
+
+import numpy as np
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmName,
+    AlgorithmResult,
+    StepHighlight,
+    DijkstraEngine,
+    GraphType,
+)
+from app.services.algorithms.bellmanford import fake_bellman_ford
+from app.services.algorithms.dag import topological_order, fake_dag_relaxation
+from app.services.algorithms.dijkstra import fake_dijkstra, DIAL_MAX_WEIGHT
+from app.services.graph_store import PreparedGraph
+
+# algorithms the fast path can reroute
+FAST_PATH_ALGORITHMS = {
+    AlgorithmName.dijkstra,
+    AlgorithmName.bellmanford,
+}
+
+
+class GraphProfile:
+    """
+        Weight statistics of a graph, one vectorized pass over the edge
+    columns. Acyclicity (a topological sort) is only computed when asked.
+    Cached in graph.derived until the next edit.
+    """
+    def __init__(self, graph: PreparedGraph):
+        self.graph = graph
+        _, _, _, w = graph.edge_arrays()
+        n = len(graph.nodes)
+        self.edge_count = len(w)
+        self.density = len(w) / (n * (n - 1)) if n > 1 else 0.0
+        self.min_weight = float(w.min()) if len(w) else 0.0
+        self.max_weight = float(w.max()) if len(w) else 0.0
+        self.non_negative = self.min_weight >= 0
+        self.uniform = self.min_weight == self.max_weight
+        self.integer = bool(np.all(w == np.trunc(w)))
+        self.zero_one = self.non_negative and self.integer and self.max_weight <= 1
+
+    @property
+    def acyclic(self) -> bool:
+        """As a directed graph."""
+        return topological_order(self.graph) is not None
+
+
+def get_profile(graph: PreparedGraph) -> GraphProfile:
+    profile = graph.derived.get(("profile",))
+    if profile is None:
+        profile = GraphProfile(graph)
+        graph.derived[("profile",)] = profile
+    return profile
+
+
+def choose_engine(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[str, str]:
+    """
+        Returns (engine, reason). Engines: bfs, zero_one, dial, heap
+    (Dijkstra queues), dag (relaxation in topological order),
+    bellmanford, or the requested algorithm itself when nothing faster
+    is correct. Bellman-Ford always reads the edges as directed, so its
+    runs are routed as directed ones.
+    """
+    profile = get_profile(graph)
+    directed = req.algorithm == AlgorithmName.bellmanford or req.graph_type != GraphType.undirected
+
+    if profile.non_negative and profile.uniform and profile.min_weight > 0:
+        return "bfs", f"all weights are {profile.min_weight:g}: BFS order is shortest path order"
+    if directed and profile.acyclic:
+        return "dag", "no directed cycle: one relaxation per node in topological order, O(V + E)"
+    if profile.zero_one:
+        return "zero_one", "weights are only 0 / 1: 0-1 BFS with a deque"
+    if profile.non_negative and profile.integer and profile.max_weight <= DIAL_MAX_WEIGHT:
+        return "dial", f"integer weights up to {profile.max_weight:g}: Dial's buckets"
+    if profile.non_negative:
+        return "heap", f"non-negative weights (density {profile.density:.3g}): Dijkstra with a binary heap"
+    if directed:
+        return "bellmanford", f"negative weights (min {profile.min_weight:g}) and directed cycles: Bellman-Ford"
+    return req.algorithm.value, "negative weights on an undirected graph: no faster engine, ran as requested"
+
+
+def run_fast_path(req: AlgorithmRunRequest, graph: PreparedGraph) -> tuple[List[StepHighlight], AlgorithmResult]:
+    engine, reason = choose_engine(req, graph)
+    directed = req.algorithm == AlgorithmName.bellmanford or req.graph_type != GraphType.undirected
+    routed = req.model_copy(update={
+        "graph_type": GraphType.directed if directed else req.graph_type,
+    })
+
+    run: Callable
+    if engine in ("bfs", "zero_one", "dial", "heap"):
+        routed.engine = DijkstraEngine(engine)
+        run = fake_dijkstra
+    elif engine == "dag":
+        run = fake_dag_relaxation
+    elif engine == "bellmanford":
+        run = fake_bellman_ford
+    else:
+        run = fake_dijkstra
+
+    steps, result = run(routed, graph)
+    result.engine = engine
+    result.engine_reason = reason
+    return steps, result
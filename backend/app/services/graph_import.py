@@ -0,0 +1,279 @@
+"""
+    Streaming import of graph files: plain edge lists (SNAP style),
+DIMACS shortest path files (.gr) and GraphML.
+
+The source is read in fixed size chunks, each chunk is parsed with
+NumPy and appended to flat id / weight columns, so memory is bounded by
+the columns themselves and not by the file. The columns then go straight
+to PreparedGraph.from_arrays.
+"""
+import gzip
+import io
+import mmap
+import os
+import re
+import warnings
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, List, Optional
+
+import numpy as np
+
+from app.schemas.graph import GraphFileFormat
+from app.services.graph_store import PreparedGraph, sorted_unique
+
+CHUNK_SIZE = 4 * 2 ** 20
+
+_DIMACS_PROBLEM = re.compile(rb"^p\s+\S+\s+(\d+)\s+(\d+)", re.M)
+_EDGELIST_COMMENTS = re.compile(rb"^[#%].*\n?", re.M)
+_DIMACS_COMMENTS = re.compile(rb"^[cp].*\n?", re.M)
+
+
+def detect_format(filename: Optional[str]) -> GraphFileFormat:
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".gr", ".dimacs")):
+        return GraphFileFormat.dimacs
+    if name.endswith((".graphml", ".xml")):
+        return GraphFileFormat.graphml
+    return GraphFileFormat.edgelist
+
+
+def _maybe_gunzip(source: BinaryIO) -> BinaryIO:
+    magic = source.read(2)
+    source.seek(0)
+    if magic == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=source, mode="rb")
+    return source
+
+
+def _line_chunks(source: BinaryIO):
+    """Yields chunks of whole lines (the last partial line is carried over)."""
+    carry = b""
+    while True:
+        block = source.read(CHUNK_SIZE)
+        if not block:
+            break
+        block = carry + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            carry = block
+            continue
+        carry = block[cut:]
+        yield block[:cut]
+    if carry.strip():
+        yield carry
+
+
+def _load_rows(chunk: bytes, comments: re.Pattern, **kwargs) -> np.ndarray:
+    # one regex pass is much cheaper than loadtxt's per line comment handling
+    chunk = comments.sub(b"", chunk)
+    with warnings.catch_warnings():
+        # chunks made only of comments
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            return np.loadtxt(io.StringIO(chunk.decode()), ndmin=2, comments=None, **kwargs)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed line: {e}")
+
+
+def _as_ids(column: np.ndarray, what: str) -> np.ndarray:
+    if not np.array_equal(column, np.trunc(column)):
+        raise ValueError(f"Non integer {what} ids")
+    return column.astype(np.int64)
+
+
+def parse_edgelist(source: BinaryIO, weight_column: Optional[int] = None) -> PreparedGraph:
+    """
+        "u v ..." per line, '#' / '%' comments. The weight is read from
+    weight_column (0 based, e.g. 2 for "u v weight"), without it every
+    edge weighs 1 and the extra columns (e.g. SNAP timestamps) are
+    ignored.
+    """
+    if weight_column is not None and weight_column < 2:
+        raise ValueError("weight_column must be 2 or more, columns 0 / 1 are the nodes")
+
+    froms: List[np.ndarray] = []
+    tos: List[np.ndarray] = []
+    weights: List[np.ndarray] = []
+    columns = None
+
+    for chunk in _line_chunks(source):
+        rows = _load_rows(chunk, _EDGELIST_COMMENTS)
+        if rows.shape[0] == 0:
+            continue
+        if columns is None:
+            columns = rows.shape[1]
+            if columns < 2:
+                raise ValueError("Edge list lines need at least 2 columns")
+            if weight_column is not None and weight_column >= columns:
+                raise ValueError(f"weight_column {weight_column} is missing, lines have {columns} columns")
+        elif rows.shape[1] != columns:
+            raise ValueError("Edge list lines have a different number of columns")
+
+        froms.append(_as_ids(rows[:, 0], "node"))
+        tos.append(_as_ids(rows[:, 1], "node"))
+        if weight_column is not None:
+            weights.append(rows[:, weight_column].copy())
+
+    froms_all = np.concatenate(froms) if froms else np.empty(0, np.int64)
+    tos_all = np.concatenate(tos) if tos else np.empty(0, np.int64)
+    weights_all = np.concatenate(weights) if weights else np.ones(len(froms_all))
+
+    return PreparedGraph.from_arrays(
+        sorted_unique(np.concatenate([froms_all, tos_all])),
+        np.arange(len(froms_all), dtype=np.int64),
+        froms_all,
+        tos_all,
+        weights_all,
+    )
+
+
+def parse_dimacs(source: BinaryIO) -> PreparedGraph:
+    """
+        DIMACS shortest path format: "p sp <n> <m>", then one
+    "a <u> <v> <w>" line per arc, 'c' comments. Nodes are 1..n.
+    """
+    node_count = None
+    arcs: List[np.ndarray] = []
+
+    for chunk in _line_chunks(source):
+        if node_count is None:
+            problem = _DIMACS_PROBLEM.search(chunk)
+            if problem:
+                node_count = int(problem.group(1))
+        rows = _load_rows(chunk, _DIMACS_COMMENTS, usecols=(1, 2, 3))
+        if rows.shape[0]:
+            arcs.append(rows)
+
+    if node_count is None:
+        raise ValueError("Missing DIMACS problem line ('p sp <n> <m>')")
+
+    rows = np.concatenate(arcs) if arcs else np.empty((0, 3))
+    return PreparedGraph.from_arrays(
+        np.arange(1, node_count + 1, dtype=np.int64),
+        np.arange(len(rows), dtype=np.int64),
+        _as_ids(rows[:, 0], "node"),
+        _as_ids(rows[:, 1], "node"),
+        rows[:, 2],
+    )
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_graphml(source: BinaryIO) -> PreparedGraph:
+    """
+        GraphML via iterparse, elements are dropped once read. Numeric
+    node ids are kept, other ids get fresh numbers after the largest one.
+    The edge weight is the edge <data> whose key is named "weight".
+    """
+    labels: dict[str, int] = {}
+    froms = []
+    tos = []
+    weights = []
+    weight_key = None
+    default_weight = 1.0
+
+    def position(label: str) -> int:
+        if label not in labels:
+            labels[label] = len(labels)
+        return labels[label]
+
+    # parent of the node / edge elements, emptied as we go
+    graph = None
+
+    try:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                if tag == "graph":
+                    graph = elem
+                continue
+            if tag == "key":
+                if elem.get("for") in ("edge", "all") and elem.get("attr.name") == "weight":
+                    weight_key = elem.get("id")
+                    for child in elem:
+                        if _local(child.tag) == "default" and child.text:
+                            default_weight = float(child.text)
+            elif tag == "node":
+                position(elem.get("id"))
+                if graph is not None:
+                    graph.clear()
+            elif tag == "edge":
+                froms.append(position(elem.get("source")))
+                tos.append(position(elem.get("target")))
+                w = default_weight
+                for child in elem:
+                    if _local(child.tag) == "data" and child.get("key") == weight_key and child.text:
+                        w = float(child.text)
+                weights.append(w)
+                if graph is not None:
+                    graph.clear()
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid GraphML: {e}")
+
+    ids = np.empty(len(labels), dtype=np.int64)
+    named = []
+    for label, pos in labels.items():
+        try:
+            ids[pos] = int(label)
+        except ValueError:
+            named.append(pos)
+    if named:
+        numeric = np.delete(ids, named)
+        first = int(numeric.max()) + 1 if len(numeric) else 0
+        ids[named] = np.arange(first, first + len(named))
+
+    return PreparedGraph.from_arrays(
+        ids,
+        np.arange(len(froms), dtype=np.int64),
+        ids[np.asarray(froms, dtype=np.int64)],
+        ids[np.asarray(tos, dtype=np.int64)],
+        np.asarray(weights, dtype=np.float64),
+    )
+
+
+PARSERS = {
+    GraphFileFormat.edgelist: parse_edgelist,
+    GraphFileFormat.dimacs: parse_dimacs,
+    GraphFileFormat.graphml: parse_graphml,
+}
+
+
+def import_stream(source: BinaryIO, fmt: GraphFileFormat, weight_column: Optional[int] = None) -> PreparedGraph:
+    """
+        Parses a (possibly gzipped) seekable binary stream.
+    weight_column only applies to edge lists.
+    """
+    source = _maybe_gunzip(source)
+    if fmt == GraphFileFormat.edgelist:
+        return parse_edgelist(source, weight_column)
+    return PARSERS[fmt](source)
+
+
+def import_path(
+    path: str,
+    import_dir: str,
+    fmt: Optional[GraphFileFormat] = None,
+    weight_column: Optional[int] = None,
+) -> PreparedGraph:
+    """
+        Imports a file already on the server through mmap. The path
+    is relative to import_dir and may not leave it. Raises
+    PermissionError / FileNotFoundError / ValueError.
+    """
+    root = os.path.realpath(import_dir)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise PermissionError("Path is outside the import folder")
+    if not os.path.isfile(full):
+        raise FileNotFoundError(path)
+
+    fmt = fmt or detect_format(full)
+    with open(full, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return import_stream(io.BytesIO(), fmt, weight_column)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return import_stream(mapped, fmt, weight_column)
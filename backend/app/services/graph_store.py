@@ -0,0 +1,522 @@
+import base64
+import binascii
+import struct
+import uuid
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.schemas.algorithm import Node, Edge, GraphEdit, GraphEditOp
+
+# (neighbor, weight, edge_id)
+Neighbor = tuple[int, float, int]
+
+
+# Per item hashes are splitmix64 chains over the item fields, so the
+# same hash can be computed one item at a time (edits) or over whole
+# NumPy columns (bulk loads).
+_MASK = (1 << 64) - 1
+_NODE_TAG = 0x6E6F6465
+_EDGE_TAG = 0x65646765
+
+
+def _mix(z: int) -> int:
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _node_hash(node_id: int) -> int:
+    return _mix(_NODE_TAG ^ (node_id & _MASK))
+
+
+def _edge_hash(edge_id: int, u: int, v: int, w: float) -> int:
+    h = _mix(_EDGE_TAG ^ (edge_id & _MASK))
+    h = _mix(h ^ (u & _MASK))
+    h = _mix(h ^ (v & _MASK))
+    return _mix(h ^ struct.unpack("<Q", struct.pack("<d", w))[0])
+
+
+def _mix_array(z: np.ndarray) -> np.ndarray:
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _columns_hash(nodes: np.ndarray, edge_ids: np.ndarray, froms: np.ndarray, tos: np.ndarray, weights: np.ndarray) -> int:
+    """XOR of _node_hash / _edge_hash over whole columns."""
+    as_bits = lambda a: a.astype(np.int64).view(np.uint64)
+    h = _mix_array(np.uint64(_EDGE_TAG) ^ as_bits(edge_ids))
+    h = _mix_array(h ^ as_bits(froms))
+    h = _mix_array(h ^ as_bits(tos))
+    h = _mix_array(h ^ weights.astype(np.float64).view(np.uint64))
+    n = _mix_array(np.uint64(_NODE_TAG) ^ as_bits(nodes))
+    return int(np.bitwise_xor.reduce(h, initial=np.uint64(0))) ^ int(np.bitwise_xor.reduce(n, initial=np.uint64(0)))
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """np.unique by sorting (NumPy 2 defaults to a slower hash table for ints)."""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+class CSR:
+    """
+        Compressed sparse row form of the adjacency. Node i (position
+    in PreparedGraph.nodes) has its neighbors in
+    targets[indptr[i]:indptr[i + 1]] (as positions too).
+    """
+    def __init__(self, graph: "PreparedGraph", both_directions: bool):
+        self.index: Dict[int, int] = {n: i for i, n in enumerate(graph.nodes)}
+        self.indptr = array("q", [0])
+        self.targets = array("q")
+        self.weights = array("d")
+        self.edge_ids = array("q")
+
+        adj = graph.adjacency(both_directions)
+        for n in graph.nodes:
+            for v, w, edge_id in adj[n]:
+                self.targets.append(self.index[v])
+                self.weights.append(w)
+                self.edge_ids.append(edge_id)
+            self.indptr.append(len(self.targets))
+
+
+class PreparedGraph:
+    """
+        A parsed graph with its adjacency cached. Registered graphs keep
+    one of these under their graph_id, inline requests build a throwaway one.
+
+    Edges are stored as edge_id -> (from_node, to_node, weight). A missing
+    weight counts as 1. The adjacency is cached per orientation
+    (both_directions=True for undirected use) and patched in place on edits.
+    The CSR form is rebuilt lazily after an edit.
+    """
+    def __init__(self, nodes: Iterable[int], edges: Iterable[tuple[int, int, int, Optional[float]]]):
+        self.nodes: List[int] = []
+        self.edges: Dict[int, tuple[int, int, float]] = {}
+        self.version = 0
+        self._node_set: set[int] = set()
+        # node -> incident edge ids, built on first use
+        self._incident: Optional[Dict[int, set[int]]] = {}
+        self._adj: Dict[bool, Dict[int, List[Neighbor]]] = {}
+        # incoming arcs of the directed orientation, (source, weight, edge_id)
+        self._radj: Optional[Dict[int, List[Neighbor]]] = None
+        self._csr: Dict[bool, CSR] = {}
+        self._hash = 0
+        # structures built from the graph by other services (e.g. the
+        # contraction hierarchy), dropped on every edit
+        self.derived: Dict[tuple, object] = {}
+        # node -> (x, y), from the request or services/layout.py. Not part
+        # of the content hash and kept across edits.
+        self.positions: Dict[int, tuple[float, float]] = {}
+
+        for n in nodes:
+            self.add_node(n)
+        for edge_id, u, v, w in edges:
+            self.add_edge(edge_id, u, v, w)
+        self.version = 0
+
+    @classmethod
+    def from_models(cls, nodes: List[Node], edges: List[Edge]) -> "PreparedGraph":
+        graph = cls(
+            (n.id for n in nodes),
+            ((e.id, e.from_node, e.to_node, e.weight) for e in edges),
+        )
+        graph.positions = {
+            n.id: (n.x, n.y) for n in nodes
+            if n.x is not None and n.y is not None
+        }
+        return graph
+
+    @classmethod
+    def from_arrays(
+        cls,
+        nodes: np.ndarray,
+        edge_ids: np.ndarray,
+        froms: np.ndarray,
+        tos: np.ndarray,
+        weights: np.ndarray,
+    ) -> "PreparedGraph":
+        """
+            Bulk constructor for columnar input. The columns are
+        validated with NumPy and loaded without going through
+        add_node / add_edge. Raises ValueError like the edit methods.
+        """
+        if not (len(edge_ids) == len(froms) == len(tos) == len(weights)):
+            raise ValueError("Edge columns must have the same length")
+        unique_nodes = sorted_unique(nodes)
+        if len(unique_nodes) != len(nodes):
+            raise ValueError("Duplicate node ids")
+        if len(sorted_unique(edge_ids)) != len(edge_ids):
+            raise ValueError("Duplicate edge ids")
+        if not np.all(np.isfinite(weights)):
+            raise ValueError("Edge weights must be finite")
+
+        def known_nodes(ends: np.ndarray) -> np.ndarray:
+            at = np.minimum(np.searchsorted(unique_nodes, ends), max(len(unique_nodes) - 1, 0))
+            return unique_nodes[at] == ends if len(unique_nodes) else np.zeros(len(ends), bool)
+
+        known = known_nodes(froms) & known_nodes(tos)
+        if not np.all(known):
+            bad = int(edge_ids[np.argmin(known)])
+            raise ValueError(f"Edge {bad} references an unknown node")
+
+        graph = cls((), ())
+        graph.nodes = nodes.tolist()
+        graph._node_set = set(graph.nodes)
+        graph._incident = None
+        graph.edges = dict(zip(
+            edge_ids.tolist(),
+            zip(froms.tolist(), tos.tolist(), weights.astype(np.float64).tolist()),
+        ))
+        graph._hash = _columns_hash(nodes, edge_ids, froms, tos, weights)
+        return graph
+
+    @property
+    def content_hash(self) -> str:
+        """
+            Order independent hash of the nodes and edges. It is a XOR
+        of per item hashes, so edits patch it instead of rehashing.
+        """
+        return f"{self._hash:016x}"
+
+    def edge_list(self) -> List[tuple[int, int, int, float]]:
+        """(edge_id, from_node, to_node, weight) in insertion order."""
+        return [(edge_id, u, v, w) for edge_id, (u, v, w) in self.edges.items()]
+
+    def edge_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+            (edge_ids, from, to, weights) as NumPy columns in insertion
+        order, from / to as positions in self.nodes. For the vectorized
+        algorithms, cached until the next edit.
+        """
+        key = ("edge_arrays",)
+        if key not in self.derived:
+            m = len(self.edges)
+            edge_ids = np.fromiter(self.edges.keys(), dtype=np.int64, count=m)
+            if m:
+                us, vs, ws = zip(*self.edges.values())
+            else:
+                us, vs, ws = (), (), ()
+            nodes = np.array(self.nodes, dtype=np.int64)
+            order = np.argsort(nodes, kind="stable")
+
+            def positions(ends) -> np.ndarray:
+                return order[np.searchsorted(nodes[order], np.array(ends, dtype=np.int64))]
+
+            self.derived[key] = (edge_ids, positions(us), positions(vs), np.array(ws, dtype=np.float64))
+        return self.derived[key]
+
+    def adjacency(self, both_directions: bool) -> Dict[int, List[Neighbor]]:
+        if both_directions not in self._adj:
+            adj: Dict[int, List[Neighbor]] = {n: [] for n in self.nodes}
+            for edge_id, (u, v, w) in self.edges.items():
+                adj[u].append((v, w, edge_id))
+                if both_directions:
+                    adj[v].append((u, w, edge_id))
+            self._adj[both_directions] = adj
+        return self._adj[both_directions]
+
+    def reverse_adjacency(self) -> Dict[int, List[Neighbor]]:
+        """Incoming arcs per node, for directed graphs."""
+        if self._radj is None:
+            radj: Dict[int, List[Neighbor]] = {n: [] for n in self.nodes}
+            for edge_id, (u, v, w) in self.edges.items():
+                radj[v].append((u, w, edge_id))
+            self._radj = radj
+        return self._radj
+
+    def has_node(self, node_id: int) -> bool:
+        return node_id in self._node_set
+
+    def _incidence(self) -> Dict[int, set[int]]:
+        if self._incident is None:
+            incident: Dict[int, set[int]] = {n: set() for n in self.nodes}
+            for edge_id, (u, v, _) in self.edges.items():
+                incident[u].add(edge_id)
+                incident[v].add(edge_id)
+            self._incident = incident
+        return self._incident
+
+    def incident_edges(self, node_id: int) -> List[int]:
+        return sorted(self._incidence()[node_id])
+
+    def csr(self, both_directions: bool) -> CSR:
+        if both_directions not in self._csr:
+            self._csr[both_directions] = CSR(self, both_directions)
+        return self._csr[both_directions]
+
+    # ---- incremental edits -------------------------------------------
+
+    def _touch(self):
+        self.version += 1
+        self._csr.clear()
+        self.derived.clear()
+
+    def add_node(self, node_id: int):
+        if node_id in self._node_set:
+            raise ValueError(f"Node {node_id} already exists")
+
+        self.nodes.append(node_id)
+        self._node_set.add(node_id)
+        if self._incident is not None:
+            self._incident[node_id] = set()
+        self._hash ^= _node_hash(node_id)
+        for adj in self._adj.values():
+            adj[node_id] = []
+        if self._radj is not None:
+            self._radj[node_id] = []
+        self._touch()
+
+    def remove_node(self, node_id: int):
+        if node_id not in self._node_set:
+            raise ValueError(f"Node {node_id} does not exist")
+
+        for edge_id in list(self._incidence()[node_id]):
+            self.remove_edge(edge_id)
+
+        self.nodes.remove(node_id)
+        self._node_set.discard(node_id)
+        self.positions.pop(node_id, None)
+        del self._incident[node_id]
+        self._hash ^= _node_hash(node_id)
+        for adj in self._adj.values():
+            del adj[node_id]
+        if self._radj is not None:
+            del self._radj[node_id]
+        self._touch()
+
+    def add_edge(self, edge_id: int, u: int, v: int, weight: Optional[float] = None):
+        if edge_id in self.edges:
+            raise ValueError(f"Edge {edge_id} already exists")
+        if u not in self._node_set or v not in self._node_set:
+            raise ValueError(f"Edge {edge_id} references an unknown node")
+
+        w = 1.0 if weight is None else float(weight)
+        self.edges[edge_id] = (u, v, w)
+        if self._incident is not None:
+            self._incident[u].add(edge_id)
+            self._incident[v].add(edge_id)
+        self._hash ^= _edge_hash(edge_id, u, v, w)
+
+        for both_directions, adj in self._adj.items():
+            adj[u].append((v, w, edge_id))
+            if both_directions:
+                adj[v].append((u, w, edge_id))
+        if self._radj is not None:
+            self._radj[v].append((u, w, edge_id))
+        self._touch()
+
+    def remove_edge(self, edge_id: int):
+        if edge_id not in self.edges:
+            raise ValueError(f"Edge {edge_id} does not exist")
+
+        u, v, w = self.edges.pop(edge_id)
+        if self._incident is not None:
+            self._incident[u].discard(edge_id)
+            self._incident[v].discard(edge_id)
+        self._hash ^= _edge_hash(edge_id, u, v, w)
+
+        for adj in self._adj.values():
+            adj[u] = [x for x in adj[u] if x[2] != edge_id]
+            if v != u:
+                adj[v] = [x for x in adj[v] if x[2] != edge_id]
+        if self._radj is not None:
+            self._radj[v] = [x for x in self._radj[v] if x[2] != edge_id]
+        self._touch()
+
+    def update_edge(self, edge_id: int, weight: Optional[float]):
+        if edge_id not in self.edges:
+            raise ValueError(f"Edge {edge_id} does not exist")
+
+        u, v, old = self.edges[edge_id]
+        w = 1.0 if weight is None else float(weight)
+        self.edges[edge_id] = (u, v, w)
+        self._hash ^= _edge_hash(edge_id, u, v, old)
+        self._hash ^= _edge_hash(edge_id, u, v, w)
+
+        def patch(neighbors: List[Neighbor]) -> List[Neighbor]:
+            return [(x, w, eid) if eid == edge_id else (x, xw, eid) for x, xw, eid in neighbors]
+
+        for adj in self._adj.values():
+            adj[u] = patch(adj[u])
+            if v != u:
+                adj[v] = patch(adj[v])
+        if self._radj is not None:
+            self._radj[v] = patch(self._radj[v])
+        self._touch()
+
+    def check_edits(self, edits: List[GraphEdit]):
+        """
+            Raises ValueError if one of the edits would fail when they
+        are applied in order, without changing the graph. Only the
+        nodes / edges the edits touch are looked at.
+        """
+        # changed entries only: node -> exists, edge -> (u, v) or None if removed
+        nodes: Dict[int, bool] = {}
+        edges: Dict[int, Optional[tuple[int, int]]] = {}
+        # edges added by the edits, per endpoint
+        added: Dict[int, set[int]] = {}
+
+        def has_node(n: int) -> bool:
+            return nodes[n] if n in nodes else n in self._node_set
+
+        def has_edge(e: int) -> bool:
+            return edges[e] is not None if e in edges else e in self.edges
+
+        for i, edit in enumerate(edits):
+            if edit.op == GraphEditOp.add_node and edit.node is not None:
+                if has_node(edit.node.id):
+                    raise ValueError(f"Edit {i}: Node {edit.node.id} already exists")
+                nodes[edit.node.id] = True
+            elif edit.op == GraphEditOp.remove_node and edit.node_id is not None:
+                n = edit.node_id
+                if not has_node(n):
+                    raise ValueError(f"Edit {i}: Node {n} does not exist")
+                base = self._incidence()[n] if n in self._node_set else set()
+                for e in base | added.get(n, set()):
+                    if has_edge(e):
+                        edges[e] = None
+                nodes[n] = False
+                added.pop(n, None)
+            elif edit.op == GraphEditOp.add_edge and edit.edge is not None:
+                e = edit.edge
+                if has_edge(e.id):
+                    raise ValueError(f"Edit {i}: Edge {e.id} already exists")
+                if not has_node(e.from_node) or not has_node(e.to_node):
+                    raise ValueError(f"Edit {i}: Edge {e.id} references an unknown node")
+                edges[e.id] = (e.from_node, e.to_node)
+                added.setdefault(e.from_node, set()).add(e.id)
+                added.setdefault(e.to_node, set()).add(e.id)
+            elif edit.op in (GraphEditOp.remove_edge, GraphEditOp.update_edge) and edit.edge_id is not None:
+                if not has_edge(edit.edge_id):
+                    raise ValueError(f"Edit {i}: Edge {edit.edge_id} does not exist")
+                if edit.op == GraphEditOp.remove_edge:
+                    edges[edit.edge_id] = None
+            else:
+                raise ValueError(f"Edit {i}: Missing data for {edit.op.value}")
+
+    def apply_edit(self, edit: GraphEdit):
+        """Raises ValueError for invalid / incomplete edits."""
+        if edit.op == GraphEditOp.add_node and edit.node is not None:
+            self.add_node(edit.node.id)
+            if edit.node.x is not None and edit.node.y is not None:
+                self.positions[edit.node.id] = (edit.node.x, edit.node.y)
+        elif edit.op == GraphEditOp.remove_node and edit.node_id is not None:
+            self.remove_node(edit.node_id)
+        elif edit.op == GraphEditOp.add_edge and edit.edge is not None:
+            e = edit.edge
+            self.add_edge(e.id, e.from_node, e.to_node, e.weight)
+        elif edit.op == GraphEditOp.remove_edge and edit.edge_id is not None:
+            self.remove_edge(edit.edge_id)
+        elif edit.op == GraphEditOp.update_edge and edit.edge_id is not None:
+            self.update_edge(edit.edge_id, edit.weight)
+        else:
+            raise ValueError(f"Missing data for {edit.op.value}")
+
+
+def decode_column(name: str, value, dtype) -> np.ndarray:
+    """
+        A column is a JSON array or a base64 string of little endian
+    values (int64 ids, float64 weights).
+    """
+    if isinstance(value, str):
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except binascii.Error:
+            raise ValueError(f"Column '{name}' is not valid base64")
+        item = np.dtype(dtype).newbyteorder("<")
+        if len(raw) % item.itemsize:
+            raise ValueError(f"Column '{name}' length is not a multiple of {item.itemsize} bytes")
+        return np.frombuffer(raw, dtype=item).astype(dtype)
+
+    try:
+        column = np.asarray(value)
+    except ValueError:
+        raise ValueError(f"Column '{name}' must be a flat array of numbers")
+    if column.ndim != 1 or (column.size and column.dtype.kind not in "iuf"):
+        raise ValueError(f"Column '{name}' must be a flat array of numbers")
+    if dtype == np.int64 and column.dtype.kind == "f" and not np.array_equal(column, np.trunc(column)):
+        raise ValueError(f"Column '{name}' must only contain integers")
+    return column.astype(dtype)
+
+
+def graph_from_columns(columnar) -> PreparedGraph:
+    """Builds a PreparedGraph from a ColumnarEdges payload."""
+    froms = decode_column("from", columnar.from_node, np.int64)
+    tos = decode_column("to", columnar.to_node, np.int64)
+
+    if columnar.edge_id is not None:
+        edge_ids = decode_column("edge_id", columnar.edge_id, np.int64)
+    else:
+        edge_ids = np.arange(len(froms), dtype=np.int64)
+    if columnar.weight is not None:
+        weights = decode_column("weight", columnar.weight, np.float64)
+    else:
+        weights = np.ones(len(froms), dtype=np.float64)
+    if columnar.nodes is not None:
+        nodes = decode_column("nodes", columnar.nodes, np.int64)
+    else:
+        nodes = sorted_unique(np.concatenate([froms, tos]))
+
+    return PreparedGraph.from_arrays(nodes, edge_ids, froms, tos, weights)
+
+
+# possibly we will save this in the actual DB
+class GraphNotFound(KeyError):
+    """Unknown graph_id."""
+
+
+# key: graph_id, value: prepared graph
+GRAPHS: Dict[str, PreparedGraph] = {}
+GRAPH_NAMES: Dict[str, Optional[str]] = {}
+
+
+def register_graph(nodes: List[Node], edges: List[Edge], name: Optional[str] = None, columnar=None) -> str:
+    if columnar is not None:
+        graph = graph_from_columns(columnar)
+    else:
+        graph = PreparedGraph.from_models(nodes, edges)
+
+    return add_graph(graph, name)
+
+
+def add_graph(graph: PreparedGraph, name: Optional[str] = None) -> str:
+    """Registers an already built graph, returns its graph_id."""
+    graph_id = str(uuid.uuid4())
+    GRAPHS[graph_id] = graph
+    GRAPH_NAMES[graph_id] = name
+    return graph_id
+
+
+def get_graph(graph_id: str) -> PreparedGraph:
+    if graph_id not in GRAPHS:
+        raise GraphNotFound("Graph not found")
+
+    return GRAPHS[graph_id]
+
+
+def delete_graph(graph_id: str):
+    if graph_id not in GRAPHS:
+        raise GraphNotFound("Graph not found")
+
+    del GRAPHS[graph_id]
+    del GRAPH_NAMES[graph_id]
+
+
+def resolve_graph(req) -> PreparedGraph:
+    """
+        The graph a request runs on: the stored one if it has a
+    graph_id, otherwise one built from its inline columns or
+    nodes / edges.
+    """
+    if req.graph_id is not None:
+        return get_graph(req.graph_id)
+    if req.columnar is not None:
+        return graph_from_columns(req.columnar)
+
+    return PreparedGraph.from_models(req.nodes, req.edges)
@@ -0,0 +1,193 @@
+"""
+    Server side force-directed layout: Fruchterman-Reingold forces with
+a Barnes-Hut approximation of the repulsion.
+
+Everything runs on NumPy arrays. The quadtree is a linear one: points
+sorted by Morton code, the cells of a level are the runs of equal code
+prefixes. Building it and walking it for all points at once are both
+array operations, so one iteration is O(n log n) without a Python loop
+per node.
+"""
+import math
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from app.schemas.graph import DEFAULT_LAYOUT_ITERATIONS, DEFAULT_THETA, DEFAULT_SPACING
+from app.services.graph_store import PreparedGraph
+
+# 2^16 cells per side, finer than any canvas
+MAX_DEPTH = 16
+# linear pull towards the center, keeps disconnected parts close
+GRAVITY = 0.02
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Puts a zero bit between the (16) bits of v, for Morton codes."""
+    v = v & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    return (v | (v << 1)) & 0x55555555
+
+
+class QuadTree:
+    """
+        Linear quadtree over 2D points. Level l has one cell per
+    distinct Morton prefix of 2l bits, with its mass (point count), its
+    center of mass and the range of its children in level l + 1.
+    Levels stop as soon as every cell holds a single point.
+    """
+    def __init__(self, pos: np.ndarray, depth: int = MAX_DEPTH):
+        lo = pos.min(axis=0)
+        self.size = float((pos.max(axis=0) - lo).max()) or 1.0
+        side = 1 << depth
+        grid = np.minimum(((pos - lo) / self.size * side).astype(np.int64), side - 1)
+        code = _spread_bits(grid[:, 0]) | (_spread_bits(grid[:, 1]) << 1)
+        order = np.argsort(code, kind="stable")
+        code = code[order]
+        sorted_pos = pos[order]
+
+        self.mass: List[np.ndarray] = []
+        self.center: List[np.ndarray] = []
+        keys: List[np.ndarray] = []
+        for level in range(depth + 1):
+            prefix = code >> (2 * (depth - level))
+            starts = np.flatnonzero(np.concatenate(([True], prefix[1:] != prefix[:-1])))
+            counts = np.diff(np.append(starts, len(prefix)))
+            self.mass.append(counts)
+            self.center.append(np.add.reduceat(sorted_pos, starts, axis=0) / counts[:, None])
+            keys.append(prefix[starts])
+            if counts.max() == 1:
+                break
+        self.depth = len(keys) - 1
+
+        self.child_start: List[np.ndarray] = []
+        self.child_end: List[np.ndarray] = []
+        for level in range(self.depth):
+            parents = keys[level + 1] >> 2
+            self.child_start.append(np.searchsorted(parents, keys[level], "left"))
+            self.child_end.append(np.searchsorted(parents, keys[level], "right"))
+
+    def repulsion(self, pos: np.ndarray, theta: float, k2: float) -> np.ndarray:
+        """
+            FR repulsion (k^2 / d, away from the other points) on every
+        point. The walk keeps (point, cell) pairs: accepted pairs add
+        their force, the others are replaced by the cell's children.
+        """
+        n = len(pos)
+        disp = np.zeros_like(pos)
+        p = np.arange(n)
+        c = np.zeros(n, dtype=np.int64)
+
+        for level in range(self.depth + 1):
+            delta = pos[p] - self.center[level][c]
+            d2 = np.einsum("ij,ij->i", delta, delta)
+            mass = self.mass[level][c]
+            if level == self.depth:
+                accept = np.ones(len(p), dtype=bool)
+            else:
+                width = self.size / (1 << level)
+                accept = (mass == 1) | (width * width < theta * theta * d2)
+
+            # d2 == 0 is the point itself (or an exact duplicate)
+            use = accept & (d2 > 0)
+            f = delta[use] * (k2 * mass[use] / d2[use])[:, None]
+            disp[:, 0] += np.bincount(p[use], weights=f[:, 0], minlength=n)
+            disp[:, 1] += np.bincount(p[use], weights=f[:, 1], minlength=n)
+
+            p, c = p[~accept], c[~accept]
+            if len(p) == 0:
+                break
+            start = self.child_start[level][c]
+            count = self.child_end[level][c] - start
+            p = np.repeat(p, count)
+            offset = np.arange(len(p)) - np.repeat(np.cumsum(count) - count, count)
+            c = np.repeat(start, count) + offset
+
+        return disp
+
+
+def initial_positions(graph: PreparedGraph, spacing: float, rng: np.random.Generator, refine: bool) -> tuple[np.ndarray, int]:
+    """
+        Positions aligned with graph.nodes. With refine, stored positions
+    are kept and new nodes are put next to their placed neighbors.
+    Everything else is random in a square sized for the node count.
+    Returns (positions, number of nodes that kept their position).
+    """
+    n = len(graph.nodes)
+    half = spacing * math.sqrt(n) / 2
+    pos = rng.uniform(-half, half, size=(n, 2))
+    if not refine or not graph.positions:
+        return pos, 0
+
+    index = {node: i for i, node in enumerate(graph.nodes)}
+    kept = 0
+    missing = []
+    for node, i in index.items():
+        if node in graph.positions:
+            pos[i] = graph.positions[node]
+            kept += 1
+        else:
+            missing.append(node)
+
+    adj = graph.adjacency(True)
+    for node in missing:
+        placed = [graph.positions[v] for v, _, _ in adj[node] if v in graph.positions]
+        if placed:
+            pos[index[node]] = np.mean(placed, axis=0) + rng.normal(0, spacing / 4, 2)
+    return pos, kept
+
+
+def force_layout(
+    graph: PreparedGraph,
+    iterations: int = DEFAULT_LAYOUT_ITERATIONS,
+    theta: float = DEFAULT_THETA,
+    spacing: float = DEFAULT_SPACING,
+    refine: bool = True,
+    seed: Optional[int] = None,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+        Yields (iteration, positions aligned with graph.nodes) after
+    every iteration and saves the last positions in graph.positions.
+    When refining an existing layout the temperature starts at one edge
+    length, so it settles instead of being rebuilt.
+    """
+    n = len(graph.nodes)
+    if n == 0:
+        return
+
+    rng = np.random.default_rng(seed)
+    _, u, v, _ = graph.edge_arrays()
+
+    pos, kept = initial_positions(graph, spacing, rng, refine)
+    k = spacing
+    if kept > n // 2:
+        temperature = spacing
+    else:
+        temperature = spacing * math.sqrt(n) / 10
+    cooling = (0.01 * spacing / temperature) ** (1 / max(iterations, 1))
+
+    for iteration in range(1, iterations + 1):
+        disp = QuadTree(pos).repulsion(pos, theta, k * k)
+
+        # attraction d^2 / k along every edge
+        delta = pos[u] - pos[v]
+        dist = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        f = delta * (dist / k)[:, None]
+        for axis in (0, 1):
+            pull = np.bincount(u, weights=f[:, axis], minlength=n)
+            push = np.bincount(v, weights=f[:, axis], minlength=n)
+            disp[:, axis] += push - pull
+
+        disp -= GRAVITY * (pos - pos.mean(axis=0))
+
+        # move at most `temperature` per iteration
+        length = np.sqrt(np.einsum("ij,ij->i", disp, disp))
+        step = np.minimum(length, temperature) / np.maximum(length, 1e-12)
+        pos = pos + disp * step[:, None]
+        temperature *= cooling
+
+        if iteration == iterations:
+            graph.positions = dict(zip(graph.nodes, map(tuple, pos.tolist())))
+        yield iteration, pos
@@ -0,0 +1,238 @@
+"""
+    Spatial queries over node positions, for drawing huge graphs:
+a uniform grid index, viewport filtering of steps and a clustered
+summary for zoomed out views. Nodes without a position are left out.
+"""
+import math
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from app.schemas.algorithm import (
+    StepHighlight,
+    ViewportStep,
+    ClusterCell,
+    ClusterLink,
+    ClusterSummary,
+)
+from app.services.graph_store import PreparedGraph
+
+# average nodes per grid cell
+NODES_PER_CELL = 8
+
+# (min_x, min_y, max_x, max_y)
+BBox = tuple[float, float, float, float]
+
+
+class GridIndex:
+    """
+        Uniform grid over the positioned nodes. Nodes are sorted by
+    cell (row major), so the cells of one row of a box are a single
+    slice. Edges are kept as index pairs into the node arrays.
+    """
+    def __init__(self, graph: PreparedGraph):
+        self.positions = graph.positions
+        placed = [n for n in graph.nodes if n in graph.positions]
+        ids = np.array(placed, dtype=np.int64)
+        xy = np.array([graph.positions[n] for n in placed], dtype=np.float64).reshape(-1, 2)
+
+        self.side = max(1, math.ceil(math.sqrt(len(placed) / NODES_PER_CELL)))
+        self.lo = xy.min(axis=0) if len(xy) else np.zeros(2)
+        extent = (xy.max(axis=0) - self.lo) if len(xy) else np.ones(2)
+        self.cell_size = np.maximum(extent / self.side, 1e-9)
+
+        cells = self._cell(xy)
+        cell_id = cells[:, 1] * self.side + cells[:, 0]
+        order = np.argsort(cell_id, kind="stable")
+        self.ids = ids[order]
+        self.xy = xy[order]
+        self.cell_start = np.searchsorted(cell_id[order], np.arange(self.side * self.side + 1))
+
+        position = {int(n): i for i, n in enumerate(self.ids)}
+        edges = [
+            (edge_id, position[u], position[v])
+            for edge_id, (u, v, _) in graph.edges.items()
+            if u in position and v in position
+        ]
+        edge_array = np.array(edges, dtype=np.int64).reshape(-1, 3)
+        self.edge_ids = edge_array[:, 0]
+        self.edge_u = edge_array[:, 1]
+        self.edge_v = edge_array[:, 2]
+
+    def _cell(self, xy: np.ndarray) -> np.ndarray:
+        cells = np.floor((xy - self.lo) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.side - 1)
+
+    def query(self, bbox: BBox) -> np.ndarray:
+        """Positions (in self.ids order) of the nodes inside bbox."""
+        min_x, min_y, max_x, max_y = bbox
+        if len(self.ids) == 0 or min_x > max_x or min_y > max_y:
+            return np.empty(0, dtype=np.int64)
+
+        (cx0, cy0), (cx1, cy1) = self._cell(np.array([[min_x, min_y], [max_x, max_y]]))
+        slices = [
+            np.arange(self.cell_start[cy * self.side + cx0], self.cell_start[cy * self.side + cx1 + 1])
+            for cy in range(cy0, cy1 + 1)
+        ]
+        candidates = np.concatenate(slices)
+        x, y = self.xy[candidates, 0], self.xy[candidates, 1]
+        inside = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        return candidates[inside]
+
+    def edges_in(self, bbox: BBox, node_inside: np.ndarray) -> np.ndarray:
+        """
+            Mask over the edge arrays: an endpoint is inside, or the
+        segment crosses the box (its bounding box overlaps and the box
+        corners are not all on one side of its line).
+        """
+        keep = node_inside[self.edge_u] | node_inside[self.edge_v]
+        min_x, min_y, max_x, max_y = bbox
+        a, b = self.xy[self.edge_u], self.xy[self.edge_v]
+        overlap = (
+            (np.minimum(a[:, 0], b[:, 0]) <= max_x) & (np.maximum(a[:, 0], b[:, 0]) >= min_x)
+            & (np.minimum(a[:, 1], b[:, 1]) <= max_y) & (np.maximum(a[:, 1], b[:, 1]) >= min_y)
+        )
+        d = b - a
+        sides = [
+            np.sign(d[:, 0] * (cy - a[:, 1]) - d[:, 1] * (cx - a[:, 0]))
+            for cx, cy in ((min_x, min_y), (min_x, max_y), (max_x, min_y), (max_x, max_y))
+        ]
+        sides = np.stack(sides)
+        crosses = ~(np.all(sides > 0, axis=0) | np.all(sides < 0, axis=0))
+        return keep | (overlap & crosses)
+
+    def bounds(self) -> BBox:
+        if len(self.xy) == 0:
+            return (0.0, 0.0, 0.0, 0.0)
+        (min_x, min_y), (max_x, max_y) = self.xy.min(axis=0), self.xy.max(axis=0)
+        return (float(min_x), float(min_y), float(max_x), float(max_y))
+
+
+def get_index(graph: PreparedGraph) -> GridIndex:
+    """
+        Cached in graph.derived (dropped on edits) and rebuilt when a
+    layout replaced the positions.
+    """
+    index = graph.derived.get(("grid_index",))
+    if index is None or index.positions is not graph.positions:
+        index = GridIndex(graph)
+        graph.derived[("grid_index",)] = index
+    return index
+
+
+def _member(values: np.ndarray, wanted: Iterable[int]) -> np.ndarray:
+    return np.isin(values, np.fromiter(wanted, dtype=np.int64))
+
+
+def viewport_step(graph: PreparedGraph, step: StepHighlight, bbox: BBox) -> ViewportStep:
+    """The step with only the nodes / edges drawn inside bbox."""
+    index = get_index(graph)
+    inside = np.zeros(len(index.ids), dtype=bool)
+    inside[index.query(bbox)] = True
+    node_ids = set(index.ids[inside].tolist())
+    edge_ids = set(index.edge_ids[index.edges_in(bbox, inside)].tolist())
+
+    def nodes(values: List[int]) -> List[int]:
+        return [n for n in values if n in node_ids]
+
+    def edges(values: List[int]) -> List[int]:
+        return [e for e in values if e in edge_ids]
+
+    out = ViewportStep(
+        **step.model_dump(exclude={"highlight_nodes", "highlight_edges", "visited_nodes", "visited_edges"}),
+        highlight_nodes=nodes(step.highlight_nodes),
+        highlight_edges=edges(step.highlight_edges),
+        visited_nodes=nodes(step.visited_nodes),
+        visited_edges=edges(step.visited_edges),
+        bbox=list(bbox),
+    )
+    out.omitted_nodes = (
+        len(step.highlight_nodes) + len(step.visited_nodes)
+        - len(out.highlight_nodes) - len(out.visited_nodes)
+    )
+    out.omitted_edges = (
+        len(step.highlight_edges) + len(step.visited_edges)
+        - len(out.highlight_edges) - len(out.visited_edges)
+    )
+    return out
+
+
+def cluster_summary(
+    graph: PreparedGraph,
+    resolution: int,
+    bbox: Optional[BBox] = None,
+    step: Optional[StepHighlight] = None,
+) -> ClusterSummary:
+    """
+        Nodes inside bbox (default: all) grouped on a resolution x
+    resolution grid. Each non empty cell becomes one cluster at the mean
+    position of its nodes, edges between clusters are merged into links.
+    With a step, clusters / links also count its visited and highlighted
+    elements.
+    """
+    index = get_index(graph)
+    bbox = bbox or index.bounds()
+    min_x, min_y, max_x, max_y = bbox
+    rows = index.query(bbox)
+
+    width = max(max_x - min_x, 1e-9) / resolution
+    height = max(max_y - min_y, 1e-9) / resolution
+    xy = index.xy[rows]
+    cx = np.clip(((xy[:, 0] - min_x) / width).astype(np.int64), 0, resolution - 1)
+    cy = np.clip(((xy[:, 1] - min_y) / height).astype(np.int64), 0, resolution - 1)
+    keys, cluster_of, counts = np.unique(cy * resolution + cx, return_inverse=True, return_counts=True)
+
+    def per_cluster(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(cluster_of, weights=mask.astype(np.float64), minlength=len(keys)).astype(np.int64)
+
+    mean_x = np.bincount(cluster_of, weights=xy[:, 0], minlength=len(keys)) / np.maximum(counts, 1)
+    mean_y = np.bincount(cluster_of, weights=xy[:, 1], minlength=len(keys)) / np.maximum(counts, 1)
+    visited = highlighted = np.zeros(len(keys), dtype=np.int64)
+    if step is not None:
+        ids = index.ids[rows]
+        visited = per_cluster(_member(ids, step.visited_nodes))
+        highlighted = per_cluster(_member(ids, step.highlight_nodes))
+
+    cells = [
+        ClusterCell(
+            cell_x=int(key % resolution),
+            cell_y=int(key // resolution),
+            x=float(mean_x[i]),
+            y=float(mean_y[i]),
+            node_count=int(counts[i]),
+            visited_count=int(visited[i]),
+            highlight_count=int(highlighted[i]),
+        )
+        for i, key in enumerate(keys.tolist())
+    ]
+
+    # links: edges with both ends inside, between two different clusters
+    cluster_at = np.full(len(index.ids), -1, dtype=np.int64)
+    cluster_at[rows] = cluster_of
+    a, b = cluster_at[index.edge_u], cluster_at[index.edge_v]
+    between = (a >= 0) & (b >= 0) & (a != b)
+    lo, hi = np.minimum(a[between], b[between]), np.maximum(a[between], b[between])
+    pair = lo * len(keys) + hi
+    pairs, link_of, link_counts = np.unique(pair, return_inverse=True, return_counts=True)
+    link_visited = np.zeros(len(pairs), dtype=np.int64)
+    if step is not None and len(pairs):
+        mask = _member(index.edge_ids[between], step.visited_edges)
+        link_visited = np.bincount(link_of, weights=mask.astype(np.float64), minlength=len(pairs)).astype(np.int64)
+
+    links = [
+        ClusterLink(
+            source=int(p // len(keys)),
+            target=int(p % len(keys)),
+            edge_count=int(link_counts[i]),
+            visited_count=int(link_visited[i]),
+        )
+        for i, p in enumerate(pairs.tolist())
+    ]
+
+    return ClusterSummary(
+        bbox=list(bbox),
+        resolution=resolution,
+        node_count=len(rows),
+        clusters=cells,
+        links=links,
+    )
@@ -0,0 +1,154 @@
+"""
+    Compressed storage of run steps. Steps are cut into chunks of N
+steps, each chunk is JSON compressed with zlib or lzma, so reading a
+random step only decompresses its own chunk. Recently read chunks are
+kept decompressed in a small LRU shared by all runs.
+
+Inside a chunk a sorted id list (visited nodes / edges almost always
+are) is stored as what was added / removed since the previous step,
+which is what makes long traces small: visited lists grow by a few ids
+per step.
+"""
+import json
+import lzma
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from app.schemas.algorithm import StepHighlight
+
+LIST_FIELDS = ("highlight_nodes", "highlight_edges", "visited_nodes", "visited_edges")
+# shorter lists (highlights) are stored as they are
+MIN_DELTA_LENGTH = 16
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=1), lzma.decompress),
+}
+
+
+def _sorted_ids(values: List[int]) -> Optional[np.ndarray]:
+    """values as an array when they are long and strictly increasing."""
+    if len(values) < MIN_DELTA_LENGTH:
+        return None
+    array = np.asarray(values, dtype=np.int64)
+    return array if bool(np.all(array[1:] > array[:-1])) else None
+
+
+def _in_sorted(values: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    """Mask of the values found in the sorted array ref."""
+    if len(ref) == 0:
+        return np.zeros(len(values), dtype=bool)
+    at = np.minimum(np.searchsorted(ref, values), len(ref) - 1)
+    return ref[at] == values
+
+
+def _encode_chunk(steps: List[StepHighlight]) -> bytes:
+    rows = []
+    previous: dict[str, Optional[np.ndarray]] = {f: None for f in LIST_FIELDS}
+    for step in steps:
+        row = step.model_dump(mode="json", exclude=set(LIST_FIELDS))
+        for field in LIST_FIELDS:
+            values = getattr(step, field)
+            current = _sorted_ids(values)
+            before = previous[field]
+            if before is not None and current is not None:
+                row[field] = {
+                    "+": current[~_in_sorted(current, before)].tolist(),
+                    "-": before[~_in_sorted(before, current)].tolist(),
+                }
+            else:
+                row[field] = list(values)
+            previous[field] = current
+        rows.append(row)
+    return json.dumps(rows, separators=(",", ":")).encode()
+
+
+def _decode_chunk(data: bytes) -> List[StepHighlight]:
+    steps = []
+    previous: dict[str, np.ndarray] = {}
+    for row in json.loads(data):
+        for field in LIST_FIELDS:
+            value = row[field]
+            if isinstance(value, dict):
+                before = previous[field]
+                kept = before[~_in_sorted(before, np.asarray(value["-"], dtype=np.int64))]
+                added = np.asarray(value["+"], dtype=np.int64)
+                current = np.insert(kept, np.searchsorted(kept, added), added)
+                row[field] = current.tolist()
+            elif len(value) >= MIN_DELTA_LENGTH:
+                current = np.asarray(value, dtype=np.int64)
+            else:
+                current = None
+            if current is not None:
+                previous[field] = current
+        steps.append(StepHighlight.model_validate(row))
+    return steps
+
+
+class CompressedTrace:
+    """The steps of one run, as compressed chunks of chunk_steps steps."""
+    def __init__(self, steps: List[StepHighlight], chunk_steps: int = 64, codec: str = "zlib"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown trace codec {codec}")
+        compress, _ = CODECS[codec]
+        self.codec = codec
+        self.chunk_steps = max(1, chunk_steps)
+        self.total_steps = len(steps)
+        self.raw_size = 0
+        self.chunks: List[bytes] = []
+        for start in range(0, len(steps), self.chunk_steps):
+            data = _encode_chunk(steps[start:start + self.chunk_steps])
+            self.raw_size += len(data)
+            self.chunks.append(compress(data))
+
+    def __len__(self) -> int:
+        return self.total_steps
+
+    @property
+    def stored_size(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+    def chunk(self, index: int) -> List[StepHighlight]:
+        _, decompress = CODECS[self.codec]
+        return _decode_chunk(decompress(self.chunks[index]))
+
+
+class ChunkCache:
+    """
+        LRU of decompressed chunks, keyed by (run_id, chunk index).
+    Shared by the request threads, the lock guards the dict (chunks
+    are decompressed outside of it).
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.chunks: OrderedDict[tuple[str, int], List[StepHighlight]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple[str, int], load: Callable[[], List[StepHighlight]]) -> List[StepHighlight]:
+        with self.lock:
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                self.chunks.move_to_end(key)
+                return chunk
+        chunk = load()
+        if self.capacity > 0:
+            with self.lock:
+                self.chunks[key] = chunk
+                self.chunks.move_to_end(key)
+                if len(self.chunks) > self.capacity:
+                    self.chunks.popitem(last=False)
+        return chunk
+
+    def clear(self):
+        with self.lock:
+            self.chunks.clear()
+
+
+def read_step(cache: ChunkCache, run_id: str, trace: CompressedTrace, step_index: int) -> StepHighlight:
+    index = step_index // trace.chunk_steps
+    chunk = cache.get((run_id, index), lambda: trace.chunk(index))
+    return chunk[step_index % trace.chunk_steps]
@@ -0,0 +1,97 @@
+"""
+    One process pool for the whole server, started on first use and
+reused by every request (all-pairs rows, run groups) instead of a new
+pool per request. Workers come from a fork server, not from forking the
+threaded web server. Tasks get their data through shared memory blocks
+(see SharedBlocks) and close them before they return.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_LOCK = threading.Lock()
+
+
+def pool_size() -> int:
+    return settings.worker_processes or os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _LOCK:
+        if _POOL is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _POOL = ProcessPoolExecutor(max_workers=pool_size(), mp_context=context)
+        return _POOL
+
+
+def shutdown_pool():
+    global _POOL
+    with _LOCK:
+        if _POOL is not None:
+            _POOL.shutdown()
+            _POOL = None
+
+
+class SharedBlocks:
+    """
+        Named shared memory blocks created by the parent for one request,
+    unlinked when the with block ends. Workers attach by name.
+    """
+    def __init__(self):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.names: Dict[str, str] = {}
+
+    def add(self, key: str, data: bytes) -> str:
+        # SharedMemory refuses size 0 (e.g. a graph without edges)
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 8))
+        shm.buf[:len(data)] = data
+        self.blocks.append(shm)
+        self.names[key] = shm.name
+        return shm.name
+
+    def buffer(self, key: str) -> memoryview:
+        return next(shm.buf for shm in self.blocks if shm.name == self.names[key])
+
+    def __enter__(self) -> "SharedBlocks":
+        return self
+
+    def __exit__(self, *exc):
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+
+
+class Attached:
+    """
+        Worker side: the blocks of one task, closed when the with block
+    ends. Views taken with cast() are released first (a block with
+    exported views can't be closed).
+    """
+    def __init__(self, names: Dict[str, str]):
+        self.names = names
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.views: List[memoryview] = []
+
+    def cast(self, key: str, fmt: str) -> memoryview:
+        if key not in self.blocks:
+            self.blocks[key] = shared_memory.SharedMemory(name=self.names[key])
+        view = self.blocks[key].buf.cast(fmt)
+        self.views.append(view)
+        return view
+
+    def __enter__(self) -> "Attached":
+        return self
+
+    def __exit__(self, *exc):
+        for view in self.views:
+            view.release()
+        for shm in self.blocks.values():
+            shm.close()
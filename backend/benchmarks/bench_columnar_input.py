@@ -0,0 +1,92 @@
+"""
+    Graph input: one JSON object per node / edge vs columnar arrays
+vs base64 columns. Measures request parsing + PreparedGraph build time
+and the peak memory allocated while doing it.
+
+Run from the backend folder:
+    python -m benchmarks.bench_columnar_input
+"""
+import base64
+import json
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.schemas.algorithm import AlgorithmRunRequest
+from app.services.graph_store import resolve_graph
+
+
+def random_edges(n: int, m: int):
+    froms = [random.randrange(n) for _ in range(m)]
+    tos = [random.randrange(n) for _ in range(m)]
+    weights = [float(random.randint(1, 100)) for _ in range(m)]
+    return froms, tos, weights
+
+
+def object_payload(n: int, froms, tos, weights) -> str:
+    return json.dumps({
+        "algorithm": "dijkstra",
+        "graph_type": "directed",
+        "nodes": [{"id": i} for i in range(n)],
+        "edges": [
+            {"id": i, "from_node": u, "to_node": v, "weight": w}
+            for i, (u, v, w) in enumerate(zip(froms, tos, weights))
+        ],
+    })
+
+
+def columnar_payload(n: int, froms, tos, weights) -> str:
+    return json.dumps({
+        "algorithm": "dijkstra",
+        "graph_type": "directed",
+        "columnar": {"nodes": list(range(n)), "from": froms, "to": tos, "weight": weights},
+    })
+
+
+def base64_payload(n: int, froms, tos, weights) -> str:
+    def encode(values, dtype):
+        return base64.b64encode(np.asarray(values, dtype=dtype).tobytes()).decode()
+
+    return json.dumps({
+        "algorithm": "dijkstra",
+        "graph_type": "directed",
+        "columnar": {
+            "nodes": encode(range(n), "<i8"),
+            "from": encode(froms, "<i8"),
+            "to": encode(tos, "<i8"),
+            "weight": encode(weights, "<f8"),
+        },
+    })
+
+
+def measure(payload: str) -> tuple[float, float]:
+    """(seconds, peak MiB) for parsing the request and building the graph."""
+    t = time.perf_counter()
+    resolve_graph(AlgorithmRunRequest.model_validate_json(payload))
+    elapsed = time.perf_counter() - t
+
+    tracemalloc.start()
+    resolve_graph(AlgorithmRunRequest.model_validate_json(payload))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    random.seed(42)
+    for n, m in [(10_000, 50_000), (100_000, 500_000), (200_000, 1_000_000)]:
+        froms, tos, weights = random_edges(n, m)
+        print(f"{n} nodes, {m} edges")
+        base = None
+        for name, build in [("objects", object_payload), ("columnar", columnar_payload), ("base64", base64_payload)]:
+            payload = build(n, froms, tos, weights)
+            t, peak = measure(payload)
+            base = base or t
+            print(f"  {name:>9}: {len(payload) / 2 ** 20:7.1f} MiB body  {t * 1000:8.1f} ms"
+                  f"  ({base / t:.2f}x)  peak {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
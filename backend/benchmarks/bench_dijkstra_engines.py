@@ -0,0 +1,84 @@
+"""
+    Dijkstra priority queues: heapq vs Dial's buckets vs 0-1 BFS deque.
+
+Run from the backend folder:
+    python -m benchmarks.bench_dijkstra_engines
+"""
+import random
+import time
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmName,
+    GraphType,
+    TraceLevel,
+    DijkstraEngine,
+)
+from app.services.algorithms.dijkstra import fake_dijkstra
+from app.services.graph_store import PreparedGraph
+
+
+def grid_graph(side: int, weight) -> PreparedGraph:
+    nodes = range(side * side)
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            n = r * side + c
+            if c + 1 < side:
+                edges.append((len(edges), n, n + 1, weight()))
+            if r + 1 < side:
+                edges.append((len(edges), n, n + side, weight()))
+    return PreparedGraph(nodes, edges)
+
+
+def road_like_graph(n: int, weight) -> PreparedGraph:
+    """Random points, each linked to its nearest neighbors in a sorted sweep."""
+    points = sorted((random.random(), random.random()) for _ in range(n))
+    edges = []
+    for i in range(n):
+        for j in range(i + 1, min(n, i + 4)):
+            edges.append((len(edges), i, j, weight()))
+    # a few long "highways"
+    for _ in range(n // 50):
+        edges.append((len(edges), random.randrange(n), random.randrange(n), weight()))
+    return PreparedGraph(range(n), edges)
+
+
+def time_engine(graph: PreparedGraph, engine: DijkstraEngine, repeat: int = 3) -> float:
+    req = AlgorithmRunRequest(
+        algorithm=AlgorithmName.dijkstra,
+        graph_type=GraphType.undirected,
+        start_node_id=graph.nodes[0],
+        trace_level=TraceLevel.none,
+        engine=engine,
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fake_dijkstra(req, graph)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    random.seed(42)
+    cases = [
+        ("grid 300x300, w in 1..9", grid_graph(300, lambda: random.randint(1, 9)),
+         [DijkstraEngine.heap, DijkstraEngine.dial]),
+        ("grid 300x300, w in 0..1", grid_graph(300, lambda: random.randint(0, 1)),
+         [DijkstraEngine.heap, DijkstraEngine.dial, DijkstraEngine.zero_one]),
+        ("road-like 100k, w in 1..50", road_like_graph(100_000, lambda: random.randint(1, 50)),
+         [DijkstraEngine.heap, DijkstraEngine.dial]),
+    ]
+
+    for name, graph, engines in cases:
+        print(f"{name} ({len(graph.nodes)} nodes, {len(graph.edges)} edges)")
+        base = None
+        for engine in engines:
+            t = time_engine(graph, engine)
+            base = base or t
+            print(f"  {engine.value:>9}: {t * 1000:8.1f} ms  ({base / t:.2f}x vs heap)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+    MST algorithms: Kruskal vs Prim (heap and array versions, and the
+one picked automatically) vs Borůvka on dense and sparse graphs (no
+step trace, only the result).
+
+Run from the backend folder:
+    python -m benchmarks.bench_mst
+"""
+import random
+import time
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmName,
+    GraphType,
+    TraceLevel,
+)
+from app.services.algorithm_runner import run_algorithm
+from app.services.algorithms.prim import prim_heap, prim_array, select_engine
+from app.services.graph_store import PreparedGraph
+
+
+def complete_graph(n: int) -> PreparedGraph:
+    edges = []
+    for u in range(n):
+        for v in range(u + 1, n):
+            edges.append((len(edges), u, v, float(random.randint(1, 1000))))
+    return PreparedGraph(range(n), edges)
+
+
+def sparse_graph(n: int, degree: int) -> PreparedGraph:
+    # a random spanning path keeps it connected
+    order = list(range(n))
+    random.shuffle(order)
+    edges = [(i, order[i], order[i + 1], float(random.randint(1, 1000))) for i in range(n - 1)]
+    for _ in range(n * degree // 2 - (n - 1)):
+        edges.append((len(edges), random.randrange(n), random.randrange(n), float(random.randint(1, 1000))))
+    return PreparedGraph(range(n), edges)
+
+
+def time_algorithm(graph: PreparedGraph, algorithm: AlgorithmName, run=run_algorithm, repeat: int = 3) -> tuple[float, float]:
+    req = AlgorithmRunRequest(
+        algorithm=algorithm,
+        graph_type=GraphType.undirected,
+        trace_level=TraceLevel.none,
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        _, result = run(req, graph)
+        best = min(best, time.perf_counter() - t)
+    return best, result.total_weight
+
+
+def main():
+    random.seed(42)
+    cases = [
+        ("complete 800", complete_graph(800)),
+        ("complete 1500", complete_graph(1500)),
+        ("sparse 100k, degree 4", sparse_graph(100_000, 4)),
+        ("sparse 200k, degree 10", sparse_graph(200_000, 10)),
+    ]
+    algorithms = [
+        ("kruskal", AlgorithmName.kruskal, run_algorithm),
+        ("prim", AlgorithmName.prim, run_algorithm),
+        ("prim heap", AlgorithmName.prim, prim_heap),
+        ("prim array", AlgorithmName.prim, prim_array),
+        ("boruvka", AlgorithmName.boruvka, run_algorithm),
+    ]
+
+    for name, graph in cases:
+        print(f"{name} ({len(graph.nodes)} nodes, {len(graph.edges)} edges, prim picks {select_engine(graph)})")
+        base = None
+        for label, algorithm, run in algorithms:
+            t, weight = time_algorithm(graph, algorithm, run)
+            base = base or t
+            print(f"  {label:>10}: {t * 1000:8.1f} ms  ({base / t:.2f}x vs kruskal)  weight {weight:.0f}")
+
+
+if __name__ == "__main__":
+    main()
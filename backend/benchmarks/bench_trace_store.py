@@ -0,0 +1,87 @@
+"""
+    Compressed run steps: size of the stored trace (zlib / lzma chunks
+vs the plain step JSON) and the cost of reading a step (plain list vs
+random reads that miss the chunk cache vs playback in order).
+
+Run from the backend folder:
+    python -m benchmarks.bench_trace_store
+"""
+import random
+import time
+
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmName,
+    GraphType,
+    TraceLevel,
+)
+from app.services.algorithm_runner import run_algorithm
+from app.services.graph_store import PreparedGraph
+from app.services.trace_store import CompressedTrace, ChunkCache, read_step
+
+
+def grid_graph(side: int) -> PreparedGraph:
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            n = r * side + c
+            if c + 1 < side:
+                edges.append((len(edges), n, n + 1, float(random.randint(1, 20))))
+            if r + 1 < side:
+                edges.append((len(edges), n, n + side, float(random.randint(1, 20))))
+    return PreparedGraph(range(side * side), edges)
+
+
+def per_read_us(read, indexes) -> float:
+    t = time.perf_counter()
+    for i in indexes:
+        read(i)
+    return (time.perf_counter() - t) / len(indexes) * 1e6
+
+
+def main():
+    random.seed(42)
+    graph = grid_graph(40)
+    algorithms = [
+        AlgorithmName.bfs,
+        AlgorithmName.dijkstra,
+        AlgorithmName.astar,
+        AlgorithmName.prim,
+        AlgorithmName.kruskal,
+        AlgorithmName.components,
+    ]
+    print(f"grid 40x40 ({len(graph.nodes)} nodes, {len(graph.edges)} edges), verbose steps, 64 steps per chunk")
+
+    for algorithm in algorithms:
+        req = AlgorithmRunRequest(
+            algorithm=algorithm,
+            graph_type=GraphType.undirected,
+            start_node_id=0,
+            target_node_id=len(graph.nodes) - 1,
+            trace_level=TraceLevel.verbose,
+        )
+        steps, _ = run_algorithm(req, graph)
+        plain = sum(len(s.model_dump_json()) for s in steps)
+        random_reads = [random.randrange(len(steps)) for _ in range(200)]
+        in_order = range(len(steps))
+        base = per_read_us(lambda i: steps[i].model_dump_json(), in_order)
+        print(f"{algorithm.value} ({len(steps)} steps, {plain / 2 ** 20:.1f} MiB as JSON, read + serialize {base:.0f} us)")
+
+        for codec in ("zlib", "lzma"):
+            t = time.perf_counter()
+            trace = CompressedTrace(steps, 64, codec)
+            build = time.perf_counter() - t
+
+            cold = ChunkCache(0)
+            warm = ChunkCache(32)
+            random_us = per_read_us(lambda i: read_step(cold, "run", trace, i).model_dump_json(), random_reads)
+            playback_us = per_read_us(lambda i: read_step(warm, "run", trace, i).model_dump_json(), in_order)
+            print(
+                f"  {codec}: {trace.stored_size / 1024:8.1f} KiB  ratio {plain / trace.stored_size:6.1f}x"
+                f"  store {build * 1000:6.1f} ms"
+                f"  random read +{random_us - base:7.0f} us  playback +{playback_us - base:5.0f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmName,
+    AllPairsMethod,
+    AllPairsRequest,
+    BatchComputeRequest,
+    ComputeQuery,
+    GraphType,
+    TraceLevel,
+)
+from app.services import algorithm_runner as runner
+from app.services.admission import Admission, AdmissionError, estimate_cost
+from app.services.graph_store import PreparedGraph, add_graph
+
+
+def random_graph(n: int, m: int, acyclic: bool) -> PreparedGraph:
+    rng = random.Random(n + m)
+    edges = []
+    for i in range(m):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if acyclic and u >= v:
+            u, v = min(u, v), max(u, v) + 1
+        edges.append((i, u, min(v, n - 1), 1.0))
+    return PreparedGraph(range(n), [e for e in edges if not acyclic or e[1] < e[2]])
+
+
+@pytest.mark.parametrize("acyclic", [True, False])
+def test_dag_priced_as_bellman_ford_on_cycles(acyclic):
+    graph = random_graph(3000, 60000, acyclic)
+    admission = Admission(settings.model_copy(update={"max_run_ops": 1e8}))
+    req = AlgorithmRunRequest(algorithm=AlgorithmName.dag, graph_type=GraphType.directed, start_node_id=1)
+
+    if acyclic:
+        _, cost = admission.plan(req, graph)
+        assert cost.ops < 1e6
+    else:
+        with pytest.raises(AdmissionError) as e:
+            admission.plan(req, graph)
+        assert e.value.status_code == 413
+
+
+def test_slots_count_worker_processes():
+    admission = Admission(settings.model_copy(update={"max_concurrent_runs": 4, "queue_timeout_s": 0.05}))
+    cost = estimate_cost(AlgorithmName.bfs, TraceLevel.none, 10, 10)
+
+    with admission.slot("a", [cost], 3):
+        with admission.slot("b", [cost]):
+            with pytest.raises(AdmissionError) as e:
+                with admission.slot("c", [cost]):
+                    pass
+            assert e.value.status_code == 503
+    # more than the server has: capped, not waiting forever
+    with admission.slot("a", [cost], 16):
+        assert sum(s for _, _, _, s in admission.active.values()) == 4
+
+
+def test_compute_and_all_pairs_are_admitted(monkeypatch):
+    monkeypatch.setattr(runner, "ADMISSION", Admission(settings.model_copy(update={"max_run_ops": 1e5})))
+    graph_id = add_graph(random_graph(1000, 5000, False))
+
+    with pytest.raises(AdmissionError):
+        runner.compute(AlgorithmRunRequest(
+            algorithm=AlgorithmName.bellmanford, graph_type=GraphType.directed, graph_id=graph_id,
+        ))
+    with pytest.raises(AdmissionError):
+        runner.compute_batch(BatchComputeRequest(
+            algorithm=AlgorithmName.bfs, graph_type=GraphType.directed, graph_id=graph_id,
+            queries=[ComputeQuery(start_node_id=s) for s in range(1, 40)],
+        ))
+    with pytest.raises(AdmissionError):
+        runner.create_all_pairs_run(AllPairsRequest(
+            method=AllPairsMethod.floyd_warshall, graph_type=GraphType.directed, graph_id=graph_id,
+        ))
+
+    # one BFS fits
+    assert runner.compute(AlgorithmRunRequest(
+        algorithm=AlgorithmName.bfs, graph_type=GraphType.directed, graph_id=graph_id, start_node_id=1,
+    )).distances
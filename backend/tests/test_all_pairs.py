@@ -0,0 +1,42 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.schemas.algorithm import AllPairsMethod
+from app.services import worker_pool
+from app.services.all_pairs import compute_all_pairs, MIN_SOURCES_FOR_POOL
+from app.services.graph_store import PreparedGraph
+
+
+def shared_blocks() -> set:
+    if not os.path.isdir("/dev/shm"):
+        return set()
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    monkeypatch.setattr(settings, "worker_processes", 2)
+    yield
+    worker_pool.shutdown_pool()
+
+
+@pytest.mark.parametrize("method", [AllPairsMethod.dijkstra, AllPairsMethod.bfs])
+def test_pool_rows_match_serial_and_floyd_warshall(two_workers, method):
+    rng = random.Random(7)
+    n = 2 * MIN_SOURCES_FOR_POOL
+    graph = PreparedGraph(range(n), [(i, rng.randrange(n), rng.randrange(n), float(rng.randint(1, 9))) for i in range(4 * n)])
+    before = shared_blocks()
+
+    # twice: the second request reuses the pool
+    pooled = [compute_all_pairs(graph, False, method, workers=2).matrix for _ in range(2)]
+    serial = compute_all_pairs(graph, False, method, workers=1).matrix
+
+    assert np.array_equal(pooled[0], serial) and np.array_equal(pooled[1], serial)
+    if method == AllPairsMethod.dijkstra:
+        assert np.allclose(serial, compute_all_pairs(graph, False, AllPairsMethod.floyd_warshall).matrix)
+    # every shared block was unlinked
+    assert shared_blocks() <= before
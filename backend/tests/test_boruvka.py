@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithms.boruvka import fake_boruvka
+from app.services.algorithms.kruskal import fake_kruskal
+from app.services.graph_store import PreparedGraph
+
+
+def request(algorithm: AlgorithmName, graph_type: GraphType) -> AlgorithmRunRequest:
+    return AlgorithmRunRequest(algorithm=algorithm, graph_type=graph_type, trace_level=TraceLevel.none)
+
+
+def is_forest(graph: PreparedGraph, edge_ids) -> bool:
+    root = {n: n for n in graph.nodes}
+
+    def find(x):
+        while root[x] != x:
+            x = root[x]
+        return x
+
+    for e in edge_ids:
+        a, b = find(graph.edges[e][0]), find(graph.edges[e][1])
+        if a == b:
+            return False
+        root[a] = b
+    return True
+
+
+def random_graph(rng: random.Random, weights: list) -> PreparedGraph:
+    """Several components (isolated nodes too), self loops and parallel edges."""
+    n = rng.randint(1, 40)
+    parts = rng.randint(1, 4)
+    edges = []
+    for i in range(rng.randint(0, 3 * n)):
+        u = rng.randrange(n)
+        # same component: same remainder
+        v = rng.randrange(u % parts, n, parts)
+        edges.append((i, u, v, float(rng.choice(weights))))
+    return PreparedGraph(range(n), edges)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("weights", [list(range(-5, 50)), [1], [2, 3]], ids=["distinct", "equal", "two"])
+@pytest.mark.parametrize("graph_type", [GraphType.undirected, GraphType.directed])
+def test_boruvka_matches_kruskal(seed, weights, graph_type):
+    graph = random_graph(random.Random(seed), weights)
+
+    _, expected = fake_kruskal(request(AlgorithmName.kruskal, graph_type), graph)
+    _, result = fake_boruvka(request(AlgorithmName.boruvka, graph_type), graph)
+
+    assert result.total_weight == expected.total_weight
+    assert len(result.tree_edges) == len(expected.tree_edges)
+    assert is_forest(graph, result.tree_edges)
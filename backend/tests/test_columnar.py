@@ -0,0 +1,86 @@
+import base64
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.algorithm import ColumnarEdges, Edge, Node
+from app.services.graph_store import PreparedGraph, graph_from_columns
+
+client = TestClient(app)
+
+
+def b64(values, dtype) -> str:
+    return base64.b64encode(np.asarray(values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()).decode()
+
+
+def random_columns(rng: random.Random) -> dict:
+    """Unsorted node / edge ids, integer and float weights, self loops."""
+    nodes = rng.sample(range(-100, 1000), rng.randint(1, 50))
+    m = rng.randint(0, 3 * len(nodes))
+    return {
+        "nodes": nodes,
+        "edge_id": rng.sample(range(10_000), m),
+        "from": [rng.choice(nodes) for _ in range(m)],
+        "to": [rng.choice(nodes) for _ in range(m)],
+        "weight": [rng.choice([rng.randint(-5, 20), rng.uniform(-5, 20)]) for _ in range(m)],
+    }
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("encoding", ["json", "base64"])
+def test_columns_build_the_json_graph(seed, encoding):
+    rng = random.Random(seed)
+    columns = random_columns(rng)
+
+    expected = PreparedGraph.from_models(
+        [Node(id=n) for n in columns["nodes"]],
+        [Edge(id=e, from_node=u, to_node=v, weight=w) for e, u, v, w in zip(columns["edge_id"], columns["from"], columns["to"], columns["weight"])],
+    )
+    if encoding == "base64":
+        columns = {k: b64(v, np.float64 if k == "weight" else np.int64) for k, v in columns.items()}
+    graph = graph_from_columns(ColumnarEdges.model_validate(columns))
+
+    assert graph.nodes == expected.nodes
+    assert graph.edges == expected.edges
+    assert graph.content_hash == expected.content_hash
+
+
+def test_columns_defaults():
+    graph = graph_from_columns(ColumnarEdges.model_validate({"from": [3, 1], "to": [1, 2]}))
+
+    assert graph.nodes == [1, 2, 3]
+    assert graph.edges == {0: (3, 1, 1.0), 1: (1, 2, 1.0)}
+
+
+def test_columnar_upload_matches_json_upload():
+    edges = [{"id": 7, "from_node": 1, "to_node": 2, "weight": 2.5}, {"id": 9, "from_node": 2, "to_node": 3, "weight": 1}]
+    by_json = client.post("/api/graphs", json={"nodes": [{"id": 1}, {"id": 2}, {"id": 3}], "edges": edges}).json()
+    by_columns = client.post("/api/graphs", json={"columnar": {
+        "from": b64([1, 2], np.int64), "to": [2, 3], "weight": b64([2.5, 1], np.float64), "edge_id": [7, 9],
+    }}).json()
+
+    assert by_columns["content_hash"] == by_json["content_hash"]
+    assert (by_columns["node_count"], by_columns["edge_count"]) == (3, 2)
+
+
+@pytest.mark.parametrize("columnar, detail", [
+    ({"from": "not base64!", "to": [1]}, "not valid base64"),
+    ({"from": base64.b64encode(b"1234567").decode(), "to": []}, "multiple of 8"),
+    ({"from": [1, 2], "to": [2]}, "same length"),
+    ({"from": [1], "to": [2], "weight": b64([float("nan")], np.float64)}, "finite"),
+    ({"from": [1, 2], "to": [2, 1], "edge_id": [5, 5]}, "Duplicate edge ids"),
+    ({"from": [1.5], "to": [2]}, "integers"),
+    ({"from": [[1]], "to": [2]}, "flat array"),
+    ({"from": [1], "to": [2], "nodes": [1]}, "unknown node"),
+])
+def test_bad_columns_are_rejected(columnar, detail):
+    for path, payload in (
+        ("/api/graphs", {"columnar": columnar}),
+        ("/api/algorithms/compute", {"algorithm": "bfs", "graph_type": "directed", "columnar": columnar}),
+    ):
+        response = client.post(path, json=payload)
+        assert response.status_code == 400
+        assert detail in response.json()["detail"]
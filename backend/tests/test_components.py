@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithms.components import fake_components
+from app.services.graph_store import PreparedGraph
+
+
+def reachable(graph: PreparedGraph, start: int, both: bool) -> set:
+    adj = graph.adjacency(both)
+    seen, stack = {start}, [start]
+    while stack:
+        for v, _, _ in adj[stack.pop()]:
+            if v not in seen:
+                seen.add(v)
+                stack.append(v)
+    return seen
+
+
+@pytest.mark.parametrize("seed", range(30))
+@pytest.mark.parametrize("graph_type", [GraphType.undirected, GraphType.directed])
+def test_components_match_reachability(seed, graph_type):
+    rng = random.Random(seed)
+    n = rng.randint(1, 25)
+    edges = [(i, rng.randrange(n), rng.randrange(n), 1.0) for i in range(rng.randint(0, 2 * n))]
+    graph = PreparedGraph(range(n), edges)
+
+    req = AlgorithmRunRequest(algorithm=AlgorithmName.components, graph_type=graph_type, trace_level=TraceLevel.coarse)
+    steps, result = fake_components(req, graph)
+    labels = dict(zip(result.node_ids, result.component_labels))
+
+    both = graph_type == GraphType.undirected
+    reach = {n: reachable(graph, n, both) for n in graph.nodes}
+    for u in graph.nodes:
+        for v in graph.nodes:
+            same = v in reach[u] and u in reach[v]
+            assert (labels[u] == labels[v]) == same
+
+    # one step per component with only its own nodes, then all of them
+    component_steps = steps[:-1]
+    assert len(component_steps) == max(labels.values()) + 1
+    assert sorted(n for s in component_steps for n in s.visited_nodes) == sorted(graph.nodes)
+    assert steps[-1].visited_nodes == sorted(graph.nodes)
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+GRAPH = {
+    "graph_type": "directed",
+    "nodes": [{"id": 1}, {"id": 2}, {"id": 3}],
+    "edges": [{"id": 0, "from_node": 1, "to_node": 2, "weight": 1}, {"id": 1, "from_node": 2, "to_node": 3, "weight": 2}],
+}
+
+
+def run_payload(path: str, **fields) -> dict:
+    if path == "/api/algorithms/compute/batch":
+        queries = [{"start_node_id": fields.pop("start_node_id", None), "target_node_id": fields.pop("target_node_id", None)}]
+        return {**GRAPH, "algorithm": "dijkstra", "queries": queries, **fields}
+    if path == "/api/algorithms/run-group":
+        return {**GRAPH, "algorithms": ["dijkstra", "bfs"], "workers": 1, **fields}
+    return {**GRAPH, "algorithm": "dijkstra", **fields}
+
+
+PATHS = ["/api/algorithms/run", "/api/algorithms/compute", "/api/algorithms/compute/batch", "/api/algorithms/run-group"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+@pytest.mark.parametrize("nodes, detail", [
+    ({"start_node_id": 9}, "Start node 9"),
+    ({"start_node_id": 1, "target_node_id": 9}, "Target node 9"),
+])
+def test_unknown_node_is_bad_request(path, nodes, detail):
+    response = client.post(path, json=run_payload(path, **nodes))
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_unknown_graph_is_not_found(path):
+    payload = run_payload(path, start_node_id=1, graph_id="missing")
+    response = client.post(path, json=payload)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Graph not found"
+
+
+def test_compute_matches_run():
+    payload = run_payload("/api/algorithms/run", start_node_id=1, target_node_id=3)
+    run_id = client.post("/api/algorithms/run", json=payload).json()["run_id"]
+    assert client.post("/api/algorithms/compute", json=payload).json() == client.get(f"/api/algorithms/run/{run_id}/result").json()
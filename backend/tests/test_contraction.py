@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithms.dijkstra import fake_dijkstra
+from app.services.contraction import build_hierarchy
+from app.services.graph_store import PreparedGraph
+
+
+@pytest.mark.parametrize("seed", range(15))
+@pytest.mark.parametrize("graph_type", [GraphType.directed, GraphType.undirected])
+def test_hierarchy_queries_match_dijkstra(seed, graph_type):
+    rng = random.Random(seed)
+    n = rng.randint(2, 40)
+    edges = [
+        (i, rng.randint(1, n), rng.randint(1, n), float(rng.randint(0, 20)))
+        for i in range(rng.randint(n, 4 * n))
+    ]
+    graph = PreparedGraph(range(1, n + 1), edges)
+    both = graph_type == GraphType.undirected
+    ch = build_hierarchy(graph, both)
+
+    for source in rng.sample(graph.nodes, min(n, 5)):
+        _, reference = fake_dijkstra(AlgorithmRunRequest(
+            algorithm=AlgorithmName.dijkstra,
+            graph_type=graph_type,
+            start_node_id=source,
+            trace_level=TraceLevel.none,
+        ), graph)
+        expected = dict(zip(reference.node_ids, reference.distances))
+
+        for target in graph.nodes:
+            dist, path, path_edges, _ = ch.query(source, target)
+            assert dist == expected[target]
+            if dist is None:
+                continue
+            assert path[0] == source and path[-1] == target
+            assert sum(graph.edges[e][2] for e in path_edges) == dist
+            for u, v, e in zip(path, path[1:], path_edges):
+                a, b, _ = graph.edges[e]
+                assert (a, b) == (u, v) or (both and (b, a) == (u, v))
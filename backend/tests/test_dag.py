@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithms.bellmanford import fake_bellman_ford
+from app.services.algorithms.dag import fake_dag
+from app.services.graph_store import PreparedGraph
+
+
+def request(**fields) -> AlgorithmRunRequest:
+    fields.setdefault("trace_level", TraceLevel.coarse)
+    return AlgorithmRunRequest(algorithm=AlgorithmName.dag, graph_type=GraphType.directed, **fields)
+
+
+def path_weight(graph: PreparedGraph, path_edges) -> float:
+    return sum(graph.edges[e][2] for e in path_edges)
+
+
+def longest_from_everywhere(graph: PreparedGraph) -> dict:
+    """Longest distance to each node over all starts, Bellman-Ford per start."""
+    negated = PreparedGraph(graph.nodes, [(e, u, v, -w) for e, (u, v, w) in graph.edges.items()])
+    best = {n: 0.0 for n in graph.nodes}
+    for s in graph.nodes:
+        _, result = fake_bellman_ford(request(start_node_id=s, trace_level=TraceLevel.none), negated)
+        for n, d in zip(result.node_ids, result.distances):
+            if d is not None:
+                best[n] = max(best[n], -d)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_critical_path_with_cycle(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 12)
+    # negative weights only, so every cycle is bounded
+    edges = [(i, rng.randrange(1, n + 1), rng.randrange(1, n + 1), float(rng.randint(-9, -1))) for i in range(3 * n)]
+    edges.append((len(edges), 1, 1, -1.0))
+    graph = PreparedGraph(range(1, n + 1), edges)
+
+    steps, result = fake_dag(request(longest=True), graph)
+    best = longest_from_everywhere(graph)
+
+    assert result.engine == "bellmanford"
+    assert not result.has_negative_cycle
+    assert dict(zip(result.node_ids, result.distances)) == best
+    assert result.total_weight == max(best.values())
+    assert path_weight(graph, result.path_edges) == result.total_weight
+    assert "Critical path" in steps[-1].description
+
+
+def test_longest_from_start_is_not_called_critical():
+    graph = PreparedGraph(range(1, 5), [(0, 1, 2, 2.0), (1, 2, 3, 2.0), (2, 1, 3, 1.0), (3, 3, 4, 5.0)])
+    steps, result = fake_dag(request(longest=True, start_node_id=2), graph)
+
+    assert result.path == [2, 3, 4]
+    assert "Critical" not in steps[-1].description
+    assert "Longest path from node 2" in steps[-1].description
+
+
+def random_dag(rng: random.Random) -> PreparedGraph:
+    """Edges only go from a lower to a higher position of a shuffled order."""
+    n = rng.randint(2, 30)
+    order = rng.sample(range(1, n + 1), n)
+    edges = []
+    for i in range(rng.randint(0, 3 * n)):
+        a, b = sorted(rng.sample(range(n), 2))
+        edges.append((i, order[a], order[b], float(rng.randint(-9, 9))))
+    return PreparedGraph(range(1, n + 1), edges)
+
+
+@pytest.mark.parametrize("seed", range(30))
+@pytest.mark.parametrize("longest", [False, True])
+def test_dag_matches_bellman_ford(seed, longest):
+    rng = random.Random(seed)
+    graph = random_dag(rng)
+    start = rng.choice(graph.nodes)
+    target = rng.choice(graph.nodes)
+    reference = graph
+    if longest:
+        reference = PreparedGraph(graph.nodes, [(e, u, v, -w) for e, (u, v, w) in graph.edges.items()])
+
+    _, result = fake_dag(request(start_node_id=start, target_node_id=target, longest=longest), graph)
+    _, expected = fake_bellman_ford(request(start_node_id=start, trace_level=TraceLevel.none), reference)
+
+    sign = -1 if longest else 1
+    expected_distances = [None if d is None else sign * d for d in expected.distances]
+    assert result.engine != "bellmanford"
+    assert dict(zip(result.node_ids, result.distances)) == dict(zip(expected.node_ids, expected_distances))
+    distance = dict(zip(result.node_ids, result.distances))[target]
+    if distance is None:
+        assert result.path == []
+    else:
+        assert result.path[0] == start and result.path[-1] == target
+        assert path_weight(graph, result.path_edges) == distance
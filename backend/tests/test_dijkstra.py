@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, DijkstraEngine, GraphType, TraceLevel
+from app.services.algorithms.dijkstra import fake_dijkstra
+from app.services.graph_store import PreparedGraph
+
+# weight class -> (weight of an edge, engines that accept it)
+WEIGHTS = {
+    "uniform": (lambda rng: 2.0, [DijkstraEngine.bfs, DijkstraEngine.dial]),
+    "zero_one": (lambda rng: float(rng.randint(0, 1)), [DijkstraEngine.zero_one, DijkstraEngine.dial]),
+    "small_ints": (lambda rng: float(rng.randint(0, 40)), [DijkstraEngine.dial]),
+    "floats": (lambda rng: rng.uniform(0, 10), []),
+}
+
+
+def request(engine: DijkstraEngine, graph_type: GraphType, **fields) -> AlgorithmRunRequest:
+    return AlgorithmRunRequest(algorithm=AlgorithmName.dijkstra, graph_type=graph_type, engine=engine, **fields)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("weight_class", list(WEIGHTS))
+@pytest.mark.parametrize("graph_type", [GraphType.directed, GraphType.undirected])
+def test_engines_match_heap(seed, weight_class, graph_type):
+    rng = random.Random(seed)
+    weight, engines = WEIGHTS[weight_class]
+    n = rng.randint(1, 40)
+    graph = PreparedGraph(range(n), [(i, rng.randrange(n), rng.randrange(n), weight(rng)) for i in range(rng.randint(0, 4 * n))])
+    start, target = rng.randrange(n), rng.randrange(n)
+
+    _, expected = fake_dijkstra(request(DijkstraEngine.heap, graph_type, start_node_id=start, target_node_id=target, trace_level=TraceLevel.none), graph)
+    for engine in engines + [DijkstraEngine.auto]:
+        _, result = fake_dijkstra(request(engine, graph_type, start_node_id=start, target_node_id=target, trace_level=TraceLevel.none), graph)
+        assert result.distances == expected.distances
+        assert result.total_weight == expected.total_weight
+        if engine != DijkstraEngine.auto:
+            assert result.engine == engine.value
+
+
+def test_heap_is_the_default():
+    graph = PreparedGraph(range(3), [(0, 0, 1, 1.0), (1, 1, 2, 1.0)])
+    req = AlgorithmRunRequest(algorithm=AlgorithmName.dijkstra, graph_type=GraphType.directed, start_node_id=0)
+    steps, result = fake_dijkstra(req, graph)
+
+    assert result.engine == "heap"
+    assert steps[0].description == "Start Dijkstra's algorithm from node 0. Initialize distance to 0."
+    steps, result = fake_dijkstra(req.model_copy(update={"engine": DijkstraEngine.auto}), graph)
+    assert result.engine == "bfs"
+    assert "(bfs queue)" in steps[0].description
+
+
+@pytest.mark.parametrize("engine, weight", [
+    (DijkstraEngine.bfs, 0.5),
+    (DijkstraEngine.zero_one, 2.0),
+    (DijkstraEngine.dial, 1.5),
+])
+def test_engine_rejects_other_weights(engine, weight):
+    graph = PreparedGraph(range(3), [(0, 0, 1, 1.0), (1, 1, 2, weight)])
+    with pytest.raises(ValueError):
+        fake_dijkstra(request(engine, GraphType.directed, start_node_id=0), graph)
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithm_runner import run_algorithm
+from app.services.engine_selection import run_fast_path
+from app.services.graph_store import PreparedGraph
+
+# weight class -> (weight of an edge, acyclic)
+WEIGHTS = {
+    "uniform": (lambda rng: 3.0, False),
+    "zero_one": (lambda rng: float(rng.randint(0, 1)), False),
+    "small_ints": (lambda rng: float(rng.randint(0, 9)), False),
+    "floats": (lambda rng: rng.uniform(0, 100), False),
+    "negative_dag": (lambda rng: float(rng.randint(-9, 9)), True),
+    "negative_cycles": (lambda rng: float(rng.randint(-2, 9)), False),
+}
+
+ENGINES = {
+    "uniform": {"bfs"},
+    "zero_one": {"dag", "zero_one"},
+    "small_ints": {"dag", "dial"},
+    "floats": {"dag", "heap"},
+    "negative_dag": {"dag"},
+    "negative_cycles": {"bellmanford"},
+}
+
+
+def random_graph(rng: random.Random, weight_class: str) -> PreparedGraph:
+    weight, acyclic = WEIGHTS[weight_class]
+    n = rng.randint(2, 30)
+    edges = []
+    for i in range(rng.randint(n, 4 * n)):
+        u, v = rng.randint(1, n), rng.randint(1, n)
+        if acyclic:
+            if u == v:
+                continue
+            u, v = min(u, v), max(u, v)
+        edges.append((i, u, v, weight(rng)))
+    if weight_class == "negative_cycles":
+        # at least one directed cycle, so the DAG engine can't take it
+        edges += [(len(edges), 1, 2, 1.0), (len(edges) + 1, 2, 1, 1.0)]
+    return PreparedGraph(range(1, n + 1), edges)
+
+
+# Dijkstra has no defined answer with negative weights
+CASES = [
+    (weight_class, algorithm, graph_type)
+    for weight_class in WEIGHTS
+    for algorithm, graph_type in [
+        (AlgorithmName.dijkstra, GraphType.directed),
+        (AlgorithmName.dijkstra, GraphType.undirected),
+        (AlgorithmName.bellmanford, GraphType.directed),
+    ]
+    if algorithm == AlgorithmName.bellmanford or not weight_class.startswith("negative")
+]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("weight_class, algorithm, graph_type", CASES)
+def test_fast_path_matches_requested_algorithm(seed, weight_class, algorithm, graph_type):
+    rng = random.Random(seed)
+    graph = random_graph(rng, weight_class)
+    req = AlgorithmRunRequest(
+        algorithm=algorithm,
+        graph_type=graph_type,
+        start_node_id=rng.choice(graph.nodes),
+        target_node_id=rng.choice(graph.nodes),
+        trace_level=TraceLevel.none,
+    )
+
+    _, expected = run_algorithm(req, graph)
+    _, result = run_fast_path(req, graph)
+
+    if graph_type == GraphType.directed or weight_class == "uniform":
+        assert result.engine in ENGINES[weight_class]
+    assert result.algorithm == algorithm
+    assert result.has_negative_cycle == expected.has_negative_cycle
+    if expected.has_negative_cycle:
+        return
+    distances = dict(zip(result.node_ids, result.distances))
+    for node, distance in zip(expected.node_ids, expected.distances):
+        assert distances[node] == (None if distance is None else pytest.approx(distance))
+    assert result.total_weight == (None if expected.total_weight is None else pytest.approx(expected.total_weight))
@@ -0,0 +1,28 @@
+import gzip
+import io
+
+import pytest
+
+from app.schemas.graph import GraphFileFormat
+from app.services.graph_import import import_stream
+
+# SNAP temporal style: u v timestamp
+TEMPORAL = b"# comment\n1 2 1217567877\n2 3 1217573015\n3 1 1217606247\n"
+
+
+def test_edgelist_is_unweighted_by_default():
+    graph = import_stream(io.BytesIO(TEMPORAL), GraphFileFormat.edgelist)
+    assert sorted(graph.nodes) == [1, 2, 3]
+    assert [w for _, _, w in graph.edges.values()] == [1.0, 1.0, 1.0]
+
+
+def test_edgelist_weight_column():
+    data = gzip.compress(b"1 2 0.5 7\n2 3 1.5 8\n")
+    graph = import_stream(io.BytesIO(data), GraphFileFormat.edgelist, weight_column=3)
+    assert [w for _, _, w in graph.edges.values()] == [7.0, 8.0]
+
+
+@pytest.mark.parametrize("weight_column", [1, 3])
+def test_edgelist_bad_weight_column(weight_column):
+    with pytest.raises(ValueError):
+        import_stream(io.BytesIO(TEMPORAL), GraphFileFormat.edgelist, weight_column)
@@ -0,0 +1,226 @@
+import random
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    AlgorithmRunUpdateRequest,
+    AlgorithmName,
+    GraphType,
+    TraceLevel,
+    GraphEdit,
+    GraphEditOp,
+    Edge,
+    Node,
+)
+from app.services.algorithm_runner import (
+    create_algorithm_run,
+    update_algorithm_run,
+    get_run_result,
+    run_algorithm,
+)
+from app.services import algorithm_runner as runner
+from app.services.admission import Admission
+from app.services.graph_store import add_graph, get_graph, PreparedGraph
+
+
+def path_graph(n: int) -> PreparedGraph:
+    return PreparedGraph(range(n), [(i, i, i + 1, 1.0) for i in range(n - 1)])
+
+
+def dijkstra_run(graph_id: str) -> str:
+    return create_algorithm_run(AlgorithmRunRequest(
+        algorithm=AlgorithmName.dijkstra,
+        graph_type=GraphType.directed,
+        graph_id=graph_id,
+        start_node_id=0,
+    ))
+
+
+def test_invalid_edit_leaves_graph_unchanged():
+    graph_id = add_graph(path_graph(5))
+    graph = get_graph(graph_id)
+    run_id = dijkstra_run(graph_id)
+    version, content = graph.version, graph.content_hash
+
+    bad = AlgorithmRunUpdateRequest(previous_run_id=run_id, edits=[
+        GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=500, from_node=0, to_node=4, weight=1)),
+        GraphEdit(op=GraphEditOp.remove_edge, edge_id=9999),
+    ])
+    with pytest.raises(ValueError, match="Edit 1"):
+        update_algorithm_run(bad)
+
+    assert 500 not in graph.edges
+    assert (graph.version, graph.content_hash) == (version, content)
+
+    # the run is not stale, a valid update still works
+    good = AlgorithmRunUpdateRequest(previous_run_id=run_id, edits=bad.edits[:1])
+    new_run, incremental, _ = update_algorithm_run(good)
+    assert incremental
+    assert get_run_result(new_run).distances[4] == 1
+
+
+def update_in_thread(req: AlgorithmRunUpdateRequest) -> tuple[str, bool, int]:
+    """update_algorithm_run, failing instead of hanging the suite."""
+    out = []
+    thread = threading.Thread(target=lambda: out.append(update_algorithm_run(req)), daemon=True)
+    thread.start()
+    thread.join(10)
+    assert out, "update_algorithm_run did not finish"
+    return out[0]
+
+
+@pytest.mark.parametrize("graph_type, edits", [
+    # an undirected negative edge is a negative cycle by itself
+    (GraphType.undirected, [GraphEdit(op=GraphEditOp.update_edge, edge_id=1, weight=-5)]),
+    # 3 -> 1 closes 1 -> 2 -> 3 -> 1 with weight -1
+    (GraphType.directed, [GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=100, from_node=3, to_node=1, weight=-3))]),
+])
+def test_negative_weight_edit_is_recomputed(graph_type, edits):
+    graph_id = add_graph(path_graph(5))
+    req = AlgorithmRunRequest(algorithm=AlgorithmName.dijkstra, graph_type=graph_type, graph_id=graph_id, start_node_id=0)
+    run_id = create_algorithm_run(req)
+
+    new_run, incremental, _ = update_in_thread(AlgorithmRunUpdateRequest(previous_run_id=run_id, edits=edits))
+
+    assert not incremental
+    _, fresh = run_algorithm(req.model_copy(update={"trace_level": TraceLevel.none}), get_graph(graph_id))
+    assert get_run_result(new_run).distances == fresh.distances
+
+    # the graph keeps its negative weight, later updates recompute too
+    more = [GraphEdit(op=GraphEditOp.update_edge, edge_id=3, weight=0.5)]
+    _, incremental, _ = update_in_thread(AlgorithmRunUpdateRequest(previous_run_id=new_run, edits=more))
+    assert not incremental
+
+
+@pytest.mark.parametrize("edits, valid", [
+    # an edge added then removed with its node
+    ([
+        GraphEdit(op=GraphEditOp.add_node, node=Node(id=10)),
+        GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=20, from_node=10, to_node=0)),
+        GraphEdit(op=GraphEditOp.remove_node, node_id=10),
+        GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=20, from_node=1, to_node=2)),
+    ], True),
+    # removing a node removes its edges
+    ([
+        GraphEdit(op=GraphEditOp.remove_node, node_id=1),
+        GraphEdit(op=GraphEditOp.update_edge, edge_id=0, weight=3),
+    ], False),
+    ([GraphEdit(op=GraphEditOp.add_node, node=Node(id=3))], False),
+    ([GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=0, from_node=1, to_node=2))], False),
+    ([GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=9, from_node=1, to_node=99))], False),
+    ([GraphEdit(op=GraphEditOp.remove_edge)], False),
+])
+def test_check_edits_matches_apply(edits, valid):
+    checked = path_graph(5)
+    if valid:
+        checked.check_edits(edits)
+    else:
+        with pytest.raises(ValueError):
+            checked.check_edits(edits)
+    assert checked.version == 0
+
+    applied = path_graph(5)
+    try:
+        for edit in edits:
+            applied.apply_edit(edit)
+        assert valid
+    except ValueError:
+        assert not valid
+
+
+def random_edits(rng: random.Random, graph: PreparedGraph, start: int, count: int) -> list:
+    """Valid edits in order (tracked on a copy of the ids), never removing start."""
+    nodes = set(graph.nodes)
+    edges = {e: (u, v) for e, (u, v, _) in graph.edges.items()}
+    next_node = max(nodes) + 1
+    next_edge = max(edges, default=0) + 1
+    edits = []
+    for _ in range(count):
+        op = rng.choice(["add_edge", "add_edge", "remove_edge", "update_edge", "update_edge", "add_node", "remove_node"])
+        if op == "add_node":
+            edits.append(GraphEdit(op=GraphEditOp.add_node, node=Node(id=next_node)))
+            nodes.add(next_node)
+            next_node += 1
+        elif op == "remove_node" and len(nodes) > 2:
+            n = rng.choice(sorted(nodes - {start}))
+            edits.append(GraphEdit(op=GraphEditOp.remove_node, node_id=n))
+            nodes.discard(n)
+            edges = {e: uv for e, uv in edges.items() if n not in uv}
+        elif op == "add_edge":
+            u, v = rng.choice(sorted(nodes)), rng.choice(sorted(nodes))
+            edits.append(GraphEdit(op=GraphEditOp.add_edge, edge=Edge(id=next_edge, from_node=u, to_node=v, weight=rng.randint(1, 20))))
+            edges[next_edge] = (u, v)
+            next_edge += 1
+        elif edges:
+            e = rng.choice(sorted(edges))
+            if op == "remove_edge":
+                edits.append(GraphEdit(op=GraphEditOp.remove_edge, edge_id=e))
+                del edges[e]
+            else:
+                edits.append(GraphEdit(op=GraphEditOp.update_edge, edge_id=e, weight=rng.randint(1, 20)))
+    return edits
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("algorithm, graph_type", [
+    (AlgorithmName.bfs, GraphType.directed),
+    (AlgorithmName.dijkstra, GraphType.directed),
+    (AlgorithmName.dijkstra, GraphType.undirected),
+    (AlgorithmName.kruskal, GraphType.undirected),
+    (AlgorithmName.prim, GraphType.undirected),
+])
+def test_repair_matches_recompute(seed, algorithm, graph_type):
+    rng = random.Random(seed)
+    n = rng.randint(3, 25)
+    graph = PreparedGraph(range(1, n + 1), [
+        (i, rng.randint(1, n), rng.randint(1, n), float(rng.randint(1, 20)))
+        for i in range(rng.randint(n, 3 * n))
+    ])
+    if algorithm == AlgorithmName.prim:
+        # Prim spans the start component only, keep the graph connected
+        graph = PreparedGraph(graph.nodes, graph.edge_list() + [(1000 + i, i, i + 1, 20.0) for i in range(1, n)])
+    graph_id = add_graph(graph)
+    req = AlgorithmRunRequest(algorithm=algorithm, graph_type=graph_type, graph_id=graph_id, start_node_id=1)
+    run_id = create_algorithm_run(req)
+
+    for _ in range(3):
+        edits = random_edits(rng, graph, 1, rng.randint(1, 4))
+        run_id, incremental, _ = update_algorithm_run(AlgorithmRunUpdateRequest(previous_run_id=run_id, edits=edits))
+        if not incremental:
+            continue
+
+        repaired = get_run_result(run_id)
+        _, fresh = run_algorithm(req.model_copy(update={"trace_level": TraceLevel.none}), graph)
+        if algorithm in (AlgorithmName.bfs, AlgorithmName.dijkstra):
+            assert dict(zip(repaired.node_ids, repaired.distances)) == dict(zip(fresh.node_ids, fresh.distances))
+        else:
+            assert repaired.total_weight == fresh.total_weight
+            assert len(repaired.tree_edges) == len(fresh.tree_edges)
+
+
+def test_update_route_reports_trace_level_and_engine(monkeypatch):
+    config = settings.model_copy(update={"max_trace_bytes": 10_000, "trace_policy": "downgrade"})
+    monkeypatch.setattr(runner, "ADMISSION", Admission(config))
+    graph_id = add_graph(path_graph(200))
+    client = TestClient(app)
+    run_id = dijkstra_run(graph_id)
+
+    edit = {"op": "update_edge", "edge_id": 10, "weight": 0.5}
+    response = client.post("/api/algorithms/run/update", json={"previous_run_id": run_id, "edits": [edit]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["incremental"]
+    assert body["engine"] == "incremental"
+    assert body["trace_level"] == "summary"
+
+    # an unknown node in an edit is a bad edit, not a missing run
+    edit = {"op": "add_edge", "edge": {"id": 900, "from_node": 0, "to_node": 9999}}
+    response = client.post("/api/algorithms/run/update", json={"previous_run_id": body["run_id"], "edits": [edit]})
+    assert response.status_code == 400
+    response = client.post("/api/algorithms/run/update", json={"previous_run_id": "missing", "edits": [edit]})
+    assert response.status_code == 404
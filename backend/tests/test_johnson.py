@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithms.bellmanford import fake_bellman_ford
+from app.services.algorithms.johnson import fake_johnson
+from app.services.graph_store import PreparedGraph
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_johnson_matches_bellman_ford(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 15)
+    # w + p(v) - p(u) keeps negative weights without negative cycles
+    p = [rng.randint(0, 20) for _ in range(n)]
+    edges = []
+    for i in range(rng.randint(1, 4 * n)):
+        u, v = rng.randrange(n), rng.randrange(n)
+        edges.append((i, u + 1, v + 1, float(rng.randint(0, 9) + p[v] - p[u])))
+    graph = PreparedGraph(range(1, n + 1), edges)
+
+    req = AlgorithmRunRequest(
+        algorithm=AlgorithmName.johnson,
+        graph_type=GraphType.directed,
+        start_node_id=1,
+        target_node_id=n,
+        trace_level=TraceLevel.coarse,
+    )
+    _, johnson = fake_johnson(req, graph)
+    _, reference = fake_bellman_ford(req.model_copy(update={"algorithm": AlgorithmName.bellmanford}), graph)
+
+    assert johnson.distances == reference.distances
+    assert johnson.total_weight == reference.total_weight
+    assert bool(johnson.path) == bool(reference.path)
+    if johnson.path:
+        assert johnson.path[0] == 1 and johnson.path[-1] == n
+        assert sum(graph.edges[e][2] for e in johnson.path_edges) == johnson.total_weight
+
+
+def test_johnson_path_to_target():
+    graph = PreparedGraph(range(4), [(0, 0, 1, 1.0), (1, 1, 2, -1.0), (2, 2, 3, 1.0)])
+    req = AlgorithmRunRequest(
+        algorithm=AlgorithmName.johnson,
+        graph_type=GraphType.directed,
+        start_node_id=1,
+        target_node_id=3,
+    )
+    _, result = fake_johnson(req, graph)
+
+    assert result.path == [1, 2, 3]
+    assert result.total_weight == 0
@@ -0,0 +1,119 @@
+import json
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.graph_store import PreparedGraph, add_graph
+from app.services.layout import QuadTree, force_layout, initial_positions
+
+client = TestClient(app)
+
+
+def random_graph(seed: int, n: int = 200, m: int = 400) -> PreparedGraph:
+    rng = random.Random(seed)
+    return PreparedGraph(range(n), [(i, rng.randrange(n), rng.randrange(n), 1.0) for i in range(m)])
+
+
+def last_positions(graph: PreparedGraph, **options) -> np.ndarray:
+    pos = None
+    for _, pos in force_layout(graph, **options):
+        pass
+    return pos
+
+
+def exact_repulsion(pos: np.ndarray, k2: float) -> np.ndarray:
+    delta = pos[:, None, :] - pos[None, :, :]
+    d2 = np.einsum("ijk,ijk->ij", delta, delta)
+    # like the tree: no force from the point itself or an exact duplicate
+    d2[d2 == 0] = np.inf
+    return np.einsum("ijk,ij->ik", delta, k2 / d2)
+
+
+def test_fixed_seed_is_deterministic():
+    first = last_positions(random_graph(1), iterations=30, seed=7)
+    again = last_positions(random_graph(1), iterations=30, seed=7)
+    other = last_positions(random_graph(1), iterations=30, seed=8)
+
+    assert np.array_equal(first, again)
+    assert not np.allclose(first, other)
+
+
+def test_positions_are_stored():
+    graph = random_graph(2)
+    pos = last_positions(graph, iterations=10, seed=1)
+
+    assert list(graph.positions) == graph.nodes
+    assert np.array_equal(np.array([graph.positions[n] for n in graph.nodes]), pos)
+
+
+def test_refine_keeps_the_layout():
+    graph = random_graph(3)
+    laid_out = last_positions(graph, iterations=60, seed=1)
+    fresh = last_positions(random_graph(3), iterations=60, seed=2)
+
+    graph.add_node(1000)
+    graph.add_edge(5000, 1000, 0, 1.0)
+    refined = last_positions(graph, iterations=20, seed=3)[:-1]
+
+    # kept nodes settle, a fresh layout puts them somewhere else entirely
+    moved = np.linalg.norm(refined - laid_out, axis=1).mean()
+    elsewhere = np.linalg.norm(fresh - laid_out, axis=1).mean()
+    assert moved < 0.25 * elsewhere
+
+
+def test_new_nodes_start_next_to_placed_neighbors():
+    graph = random_graph(4, n=50, m=100)
+    last_positions(graph, iterations=20, seed=1)
+    graph.add_node(100)
+    graph.add_edge(1000, 100, 0, 1.0)
+    graph.add_edge(1001, 1, 100, 1.0)
+
+    pos, kept = initial_positions(graph, 50.0, np.random.default_rng(0), refine=True)
+    assert kept == 50
+    assert np.array_equal(pos[:50], np.array([graph.positions[n] for n in range(50)]))
+    neighbors = (np.array(graph.positions[0]) + np.array(graph.positions[1])) / 2
+    assert np.linalg.norm(pos[50] - neighbors) < 50.0
+
+    _, kept = initial_positions(graph, 50.0, np.random.default_rng(0), refine=False)
+    assert kept == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_barnes_hut_close_to_exact(seed):
+    rng = np.random.default_rng(seed)
+    # clusters and spread out points, a few exact duplicates
+    pos = np.concatenate([rng.normal(0, 1, (100, 2)), rng.normal(20, 5, (100, 2)), rng.uniform(-50, 50, (50, 2))])
+    pos[-1] = pos[0]
+    exact = exact_repulsion(pos, 4.0)
+
+    tree = QuadTree(pos)
+    assert np.allclose(tree.repulsion(pos, 0.0, 4.0), exact)
+    errors = []
+    for theta in (0.5, 0.8):
+        approx = tree.repulsion(pos, theta, 4.0)
+        errors.append(np.linalg.norm(approx - exact) / np.linalg.norm(exact))
+        # per point against the typical force, a point's own net force
+        # can nearly cancel out
+        per_point = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1).mean()
+        assert per_point.max() < 0.2
+    assert errors[0] < errors[1] < 0.02
+
+
+def test_layout_routes():
+    graph_id = add_graph(random_graph(5, n=30, m=60))
+    body = {"iterations": 15, "seed": 4, "refine": False}
+    first = client.post(f"/api/graphs/{graph_id}/layout", json=body).json()
+    again = client.post(f"/api/graphs/{graph_id}/layout", json=body).json()
+    stored = client.get(f"/api/graphs/{graph_id}/layout").json()
+
+    assert first["positions"] == again["positions"] == stored["positions"]
+    assert first["iterations"] == 15
+
+    lines = client.post(f"/api/graphs/{graph_id}/layout", json=body | {"stream_every": 5}).text.splitlines()
+    frames = [json.loads(line) for line in lines]
+    assert [f["iteration"] for f in frames] == [5, 10, 15]
+    assert frames[0]["node_ids"] == list(range(30)) and "node_ids" not in frames[1]
+    assert frames[-1]["done"] and frames[-1]["positions"] == first["positions"]
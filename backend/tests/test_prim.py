@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithms import prim
+from app.services.algorithms.kruskal import fake_kruskal
+from app.services.algorithms.prim import fake_prim, prim_array, prim_heap, select_engine, DENSE_PRIM_DEGREE
+from app.services.graph_store import PreparedGraph
+
+
+def request(graph_type: GraphType, **fields) -> AlgorithmRunRequest:
+    fields.setdefault("trace_level", TraceLevel.none)
+    return AlgorithmRunRequest(algorithm=AlgorithmName.prim, graph_type=graph_type, **fields)
+
+
+def random_graph(rng: random.Random, n: int, m: int, weight) -> PreparedGraph:
+    return PreparedGraph(range(n), [(i, rng.randrange(n), rng.randrange(n), weight(rng)) for i in range(m)])
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("graph_type", [GraphType.undirected, GraphType.directed])
+def test_array_matches_heap(seed, graph_type):
+    rng = random.Random(seed)
+    n = rng.randint(1, 40)
+    # ties only undirected: the directed greedy tree depends on how they break
+    weight = (lambda r: float(r.randint(1, 5))) if graph_type == GraphType.undirected else (lambda r: r.uniform(-10, 10))
+    graph = random_graph(rng, n, rng.randint(0, n * n), weight)
+    req = request(graph_type, start_node_id=rng.randrange(n))
+
+    _, expected = prim_heap(req, graph)
+    _, result = prim_array(req, graph)
+
+    assert result.total_weight == pytest.approx(expected.total_weight)
+    assert len(result.tree_edges) == len(expected.tree_edges)
+    assert result.engine == "array"
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_prim_matches_kruskal_when_connected(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 40)
+    graph = random_graph(rng, n, rng.randint(0, n * n), lambda r: float(r.randint(1, 9)))
+    graph = PreparedGraph(graph.nodes, graph.edge_list() + [(10_000 + i, i, i + 1, 9.0) for i in range(n - 1)])
+
+    _, expected = fake_kruskal(request(GraphType.undirected).model_copy(update={"algorithm": AlgorithmName.kruskal}), graph)
+    for run in (prim_heap, prim_array):
+        _, result = run(request(GraphType.undirected), graph)
+        assert result.total_weight == expected.total_weight
+        assert len(result.tree_edges) == n - 1
+
+
+def test_array_steps_match_heap_with_distinct_weights():
+    rng = random.Random(3)
+    weights = rng.sample(range(1000), 120)
+    graph = PreparedGraph(range(20), [(i, rng.randrange(20), rng.randrange(20), float(weights[i])) for i in range(120)])
+    req = request(GraphType.undirected, start_node_id=0, trace_level=TraceLevel.coarse)
+
+    heap_steps, heap_result = prim_heap(req, graph)
+    array_steps, array_result = prim_array(req, graph)
+
+    assert sorted(array_result.tree_edges) == sorted(heap_result.tree_edges)
+    assert array_steps[-1].visited_edges == heap_steps[-1].visited_edges
+
+
+def test_select_engine_thresholds(monkeypatch):
+    n = 200
+    edges = n * DENSE_PRIM_DEGREE // 2
+    dense = PreparedGraph(range(n), [(i, i % n, (i * 7 + 1) % n, 1.0) for i in range(edges)])
+    below = PreparedGraph(range(n), [(i, i % n, (i * 7 + 1) % n, 1.0) for i in range(edges - 1)])
+
+    assert select_engine(dense) == "array"
+    assert select_engine(below) == "heap"
+    assert select_engine(PreparedGraph([0], [])) == "heap"
+
+    _, result = fake_prim(request(GraphType.undirected), dense)
+    assert result.engine == "array"
+    _, result = fake_prim(request(GraphType.undirected), below)
+    assert result.engine == "heap"
+
+    # enough degree but too sparse for the V^2 scan
+    monkeypatch.setattr(prim, "DENSE_PRIM_DENSITY", edges / (n * (n - 1) / 2) * 1.01)
+    assert select_engine(dense) == "heap"
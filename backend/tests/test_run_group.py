@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.algorithm import (
+    AlgorithmRunRequest,
+    MultiAlgorithmRunRequest,
+    AlgorithmName,
+    GraphType,
+    Node,
+    Edge,
+)
+from app.services import worker_pool
+from app.services.algorithm_runner import create_run_group, run_algorithm, get_run_result, get_step
+from app.services.graph_store import PreparedGraph
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_group_runs_match_single_runs(monkeypatch, workers):
+    monkeypatch.setattr(settings, "worker_processes", 2)
+    rng = random.Random(3)
+    n = 60
+    nodes = [Node(id=i, x=float(i % 8) * 10, y=float(i // 8) * 10) for i in range(1, n + 1)]
+    edges = [
+        Edge(id=i, from_node=rng.randint(1, n), to_node=rng.randint(1, n), weight=float(rng.randint(1, 20)))
+        for i in range(4 * n)
+    ]
+    algorithms = [AlgorithmName.bfs, AlgorithmName.dijkstra, AlgorithmName.astar, AlgorithmName.prim, AlgorithmName.components]
+    req = MultiAlgorithmRunRequest(
+        algorithms=algorithms,
+        graph_type=GraphType.undirected,
+        nodes=nodes,
+        edges=edges,
+        start_node_id=1,
+        target_node_id=n,
+        workers=workers,
+    )
+    try:
+        group = create_run_group(req)
+    finally:
+        worker_pool.shutdown_pool()
+
+    graph = PreparedGraph.from_models(nodes, edges)
+    for algorithm, run in zip(algorithms, group.runs):
+        steps, result = run_algorithm(AlgorithmRunRequest(
+            algorithm=algorithm,
+            graph_type=GraphType.undirected,
+            start_node_id=1,
+            target_node_id=n,
+        ), graph)
+        assert run.algorithm == algorithm
+        assert run.total_steps == len(steps)
+        assert get_run_result(run.run_id) == result
+        assert [get_step(run.run_id, i) for i in range(len(steps))] == steps
@@ -0,0 +1,153 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.algorithm import AlgorithmName, StepHighlight
+from app.services.graph_store import PreparedGraph, add_graph
+from app.services.spatial import cluster_summary, viewport_step
+
+client = TestClient(app)
+
+
+def random_graph(rng: random.Random) -> PreparedGraph:
+    """Random positions, about a tenth of the nodes without one."""
+    n = rng.randint(1, 200)
+    graph = PreparedGraph(range(n), [(i, rng.randrange(n), rng.randrange(n), 1.0) for i in range(rng.randint(0, 3 * n))])
+    graph.positions = {x: (rng.uniform(-100, 100), rng.uniform(-100, 100)) for x in graph.nodes if rng.random() > 0.1}
+    return graph
+
+
+def inside(point, bbox) -> bool:
+    return bbox[0] <= point[0] <= bbox[2] and bbox[1] <= point[1] <= bbox[3]
+
+
+def segment_hits_box(a, b, bbox) -> bool:
+    """Liang-Barsky clipping of the segment a-b against the closed box."""
+    t0, t1 = 0.0, 1.0
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    for p, q in ((-dx, a[0] - bbox[0]), (dx, bbox[2] - a[0]), (-dy, a[1] - bbox[1]), (dy, bbox[3] - a[1])):
+        if p == 0:
+            if q < 0:
+                return False
+        elif p < 0:
+            t0 = max(t0, q / p)
+        else:
+            t1 = min(t1, q / p)
+    return t0 <= t1
+
+
+def full_step(graph: PreparedGraph) -> StepHighlight:
+    return StepHighlight(
+        step_index=0, total_steps=1, algorithm=AlgorithmName.bfs,
+        highlight_nodes=graph.nodes[:3], highlight_edges=list(graph.edges)[:3],
+        visited_nodes=graph.nodes, visited_edges=list(graph.edges),
+    )
+
+
+def random_bbox(rng: random.Random) -> tuple:
+    x0, x1 = sorted(rng.uniform(-120, 120) for _ in range(2))
+    y0, y1 = sorted(rng.uniform(-120, 120) for _ in range(2))
+    return (x0, y0, x1, y1)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_viewport_matches_brute_force(seed):
+    rng = random.Random(seed)
+    graph = random_graph(rng)
+    step = full_step(graph)
+    pos = graph.positions
+
+    for _ in range(5):
+        bbox = random_bbox(rng)
+        out = viewport_step(graph, step, bbox)
+
+        nodes = [n for n in graph.nodes if n in pos and inside(pos[n], bbox)]
+        edges = [
+            e for e, (u, v, _) in graph.edges.items()
+            if u in pos and v in pos and segment_hits_box(pos[u], pos[v], bbox)
+        ]
+        assert out.visited_nodes == nodes
+        assert out.visited_edges == edges
+        assert out.highlight_nodes == [n for n in step.highlight_nodes if n in nodes]
+        assert out.omitted_nodes == len(step.visited_nodes) + len(step.highlight_nodes) - len(out.visited_nodes) - len(out.highlight_nodes)
+        assert out.omitted_edges == len(step.visited_edges) + len(step.highlight_edges) - len(out.visited_edges) - len(out.highlight_edges)
+
+
+def test_crossing_edges_and_unplaced_nodes():
+    graph = PreparedGraph(range(5), [(0, 0, 1, 1.0), (1, 0, 2, 1.0), (2, 3, 4, 1.0), (3, 0, 3, 1.0)])
+    # 0 -> 1 crosses the box, 0 -> 2 passes by its corner (their bounding
+    # boxes overlap), node 4 has no position
+    graph.positions = {0: (-10.0, 5.0), 1: (20.0, 5.0), 2: (5.0, 20.0), 3: (5.0, 5.0)}
+    out = viewport_step(graph, full_step(graph), (0.0, 0.0, 10.0, 10.0))
+
+    assert out.visited_nodes == [3]
+    assert out.visited_edges == [0, 3]
+    assert out.omitted_nodes == 5 + 3 - 1
+    assert 4 not in out.highlight_nodes + out.visited_nodes
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("resolution", [1, 4, 32])
+def test_cluster_counts_add_up(seed, resolution):
+    rng = random.Random(seed)
+    graph = random_graph(rng)
+    step = full_step(graph)
+    bbox = random_bbox(rng) if seed % 2 else None
+    summary = cluster_summary(graph, resolution, bbox, step)
+
+    box = bbox or summary.bbox
+    placed = [n for n in graph.nodes if n in graph.positions and inside(graph.positions[n], box)]
+    assert summary.node_count == len(placed)
+    assert sum(c.node_count for c in summary.clusters) == summary.node_count
+    assert sum(c.visited_count for c in summary.clusters) == summary.node_count
+    assert sum(c.highlight_count for c in summary.clusters) == len([n for n in step.highlight_nodes if n in placed])
+    assert len({(c.cell_x, c.cell_y) for c in summary.clusters}) == len(summary.clusters)
+    assert all(0 <= c.cell_x < resolution and 0 <= c.cell_y < resolution for c in summary.clusters)
+
+    # grid cell of every node inside, then the clusters / links they make
+    width = max(box[2] - box[0], 1e-9) / resolution
+    height = max(box[3] - box[1], 1e-9) / resolution
+
+    def cell(n):
+        x, y = graph.positions[n]
+        return (min(int((x - box[0]) / width), resolution - 1), min(int((y - box[1]) / height), resolution - 1))
+
+    members = {}
+    for n in placed:
+        members.setdefault(cell(n), []).append(n)
+    assert {(c.cell_x, c.cell_y): c.node_count for c in summary.clusters} == {k: len(v) for k, v in members.items()}
+    for c in summary.clusters:
+        xs = [graph.positions[n][0] for n in members[(c.cell_x, c.cell_y)]]
+        assert c.x == pytest.approx(sum(xs) / len(xs))
+
+    between = [
+        (u, v) for u, v, _ in graph.edges.values()
+        if u in placed and v in placed and cell(u) != cell(v)
+    ]
+    assert all(link.source < link.target < len(summary.clusters) for link in summary.links)
+    assert sum(link.edge_count for link in summary.links) == len(between)
+    assert sum(link.visited_count for link in summary.links) == len(between)
+
+
+def test_viewport_and_cluster_routes():
+    graph = PreparedGraph(range(4), [(0, 0, 1, 1.0), (1, 1, 2, 1.0), (2, 2, 3, 1.0)])
+    graph.positions = {0: (0.0, 0.0), 1: (1.0, 0.0), 2: (10.0, 0.0), 3: (11.0, 0.0)}
+    graph_id = add_graph(graph)
+    run_id = client.post("/api/algorithms/run", json={
+        "algorithm": "bfs", "graph_type": "undirected", "graph_id": graph_id, "start_node_id": 0,
+    }).json()["run_id"]
+    last = client.get(f"/api/algorithms/run/{run_id}").json()["total_steps"] - 1
+
+    view = client.get(f"/api/algorithms/run/{run_id}/step/{last}/viewport", params={"min_x": -1, "min_y": -1, "max_x": 5, "max_y": 1}).json()
+    assert view["visited_nodes"] == [0, 1]
+    assert view["visited_edges"] == [0, 1]
+
+    summary = client.get(f"/api/algorithms/run/{run_id}/step/{last}/clusters", params={"resolution": 2}).json()
+    assert [c["node_count"] for c in summary["clusters"]] == [2, 2]
+    assert summary["links"] == [{"source": 0, "target": 1, "edge_count": 1, "visited_count": 1}]
+
+    response = client.get(f"/api/algorithms/run/{run_id}/step/{last}/clusters", params={"min_x": 0})
+    assert response.status_code == 400
+    assert client.get(f"/api/graphs/{graph_id}/clusters", params={"resolution": 1}).json()["node_count"] == 4
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmRunRequest, AlgorithmName, GraphType, TraceLevel
+from app.services.algorithm_runner import run_algorithm
+from app.services.graph_store import PreparedGraph
+
+LEVELS = [TraceLevel.none, TraceLevel.summary, TraceLevel.coarse, TraceLevel.verbose]
+
+
+def random_graph(rng: random.Random) -> PreparedGraph:
+    n = rng.randint(2, 30)
+    graph = PreparedGraph(range(1, n + 1), [
+        (i, rng.randint(1, n), rng.randint(1, n), float(rng.randint(1, 9)))
+        for i in range(rng.randint(n, 3 * n))
+    ])
+    graph.positions.update({x: (rng.uniform(0, 100), rng.uniform(0, 100)) for x in graph.nodes})
+    return graph
+
+
+# dag only takes directed graphs
+CASES = [
+    (algorithm, graph_type)
+    for algorithm in AlgorithmName
+    for graph_type in (GraphType.undirected, GraphType.directed)
+    if algorithm != AlgorithmName.dag or graph_type == GraphType.directed
+]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("algorithm, graph_type", CASES)
+def test_trace_levels_are_nested(seed, algorithm, graph_type):
+    rng = random.Random(seed)
+    graph = random_graph(rng)
+    req = AlgorithmRunRequest(
+        algorithm=algorithm,
+        graph_type=graph_type,
+        start_node_id=1,
+        target_node_id=rng.choice(graph.nodes),
+    )
+
+    runs = [run_algorithm(req.model_copy(update={"trace_level": level}), graph) for level in LEVELS]
+    counts = [len(steps) for steps, _ in runs]
+
+    assert counts[0] == 0
+    assert 1 <= counts[1] <= counts[2] <= counts[3]
+    # the trace level only changes the steps
+    assert all(result == runs[0][1] for _, result in runs)
+    last = [steps[-1] for steps, _ in runs[1:]]
+    assert all(s.visited_nodes == last[0].visited_nodes for s in last)
+    assert all(s.visited_edges == last[0].visited_edges for s in last)
+    for steps, _ in runs[1:]:
+        assert [s.step_index for s in steps] == list(range(len(steps)))
+        assert all(s.total_steps == len(steps) for s in steps)
+
+
+def test_dfs_coarse_skips_edge_scans():
+    # a triangle plus a tail: one edge leads back to a visited node
+    graph = PreparedGraph(range(1, 5), [(0, 1, 2, 1.0), (1, 2, 3, 1.0), (2, 3, 1, 1.0), (3, 3, 4, 1.0)])
+    req = AlgorithmRunRequest(algorithm=AlgorithmName.dfs, graph_type=GraphType.undirected, start_node_id=1)
+
+    coarse, _ = run_algorithm(req.model_copy(update={"trace_level": TraceLevel.coarse}), graph)
+    verbose, _ = run_algorithm(req, graph)
+
+    assert len(coarse) == len(graph.nodes)
+    assert len(verbose) > len(coarse)
+    assert not any("already visited" in s.description for s in coarse)
@@ -0,0 +1,82 @@
+import random
+import threading
+
+import pytest
+
+from app.schemas.algorithm import AlgorithmName, AlgorithmRunRequest, GraphType, StepHighlight
+from app.services.algorithm_runner import run_algorithm
+from app.services.graph_store import PreparedGraph
+from app.services.trace_store import ChunkCache, CompressedTrace, read_step
+
+
+def test_chunk_cache_shared_by_threads():
+    cache = ChunkCache(4)
+    errors = []
+
+    def read(seed: int):
+        rng = random.Random(seed)
+        try:
+            for _ in range(20000):
+                key = ("run", rng.randrange(8))
+                assert cache.get(key, lambda: [key]) == [key]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(cache.chunks) == 4
+
+
+def random_steps(rng: random.Random, count: int) -> list:
+    """Visited lists that grow / shrink like real traces, plus unsorted and short lists."""
+    visited = set()
+    steps = []
+    for i in range(count):
+        visited |= {rng.randrange(500) for _ in range(rng.randint(0, 6))}
+        if rng.random() < 0.1:
+            visited -= set(rng.sample(sorted(visited), len(visited) // 3))
+        edges = sorted(visited) if rng.random() < 0.8 else rng.sample(sorted(visited), len(visited))
+        steps.append(StepHighlight(
+            step_index=i,
+            total_steps=count,
+            algorithm=AlgorithmName.dijkstra,
+            description=f"step {i}" if rng.random() < 0.5 else None,
+            highlight_nodes=[rng.randrange(500) for _ in range(rng.randint(0, 3))],
+            highlight_edges=[rng.randrange(500) for _ in range(rng.randint(0, 20))],
+            visited_nodes=sorted(visited),
+            visited_edges=edges,
+        ))
+    return steps
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+@pytest.mark.parametrize("chunk_steps", [1, 7, 64])
+def test_compressed_steps_match_plain(seed, codec, chunk_steps):
+    rng = random.Random(seed)
+    steps = random_steps(rng, rng.randint(0, 200))
+    trace = CompressedTrace(steps, chunk_steps, codec)
+    cache = ChunkCache(2)
+
+    assert len(trace) == len(steps)
+    assert [s for i in range(len(trace.chunks)) for s in trace.chunk(i)] == steps
+    for i in rng.sample(range(len(steps)), len(steps)):
+        assert read_step(cache, "run", trace, i) == steps[i]
+
+
+@pytest.mark.parametrize("algorithm", [AlgorithmName.bfs, AlgorithmName.dijkstra, AlgorithmName.kruskal])
+def test_compressed_algorithm_trace_matches_plain(algorithm):
+    rng = random.Random(1)
+    n = 300
+    graph = PreparedGraph(range(n), [(i, rng.randrange(n), rng.randrange(n), float(rng.randint(1, 9))) for i in range(4 * n)])
+    req = AlgorithmRunRequest(algorithm=algorithm, graph_type=GraphType.undirected, start_node_id=0)
+    steps, _ = run_algorithm(req, graph)
+    trace = CompressedTrace(steps, 16)
+
+    assert trace.stored_size < trace.raw_size
+    assert [read_step(ChunkCache(4), "run", trace, i) for i in range(len(steps))] == steps